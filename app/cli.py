@@ -0,0 +1,190 @@
+# ------------------ app/cli.py ------------------
+"""
+Headless entry point for scheduled runs (cron, CI, workers).
+
+    python -m app.cli run_spec.json [--out DIR] [--backend local] [--concurrency 2]
+
+The run spec is a JSON (or YAML, if PyYAML is installed) object with the
+fields of `modules.search_jobs.SearchSpec`, plus an optional "backend"
+(ollama | openai | local) and "models" (per-task routes, see
+`modules.model_routing`):
+
+    {"platforms": ["indeedapi"], "locations": ["France"],
+     "terms": ["data engineer"], "hours_old": 72, "score_threshold": 7,
+     "generate_cl": false, "concurrency": 2, "backend": "local",
+     "models": {"score": "ollama:llama3.2:3b"}}
+
+Browsers run headless unless the spec says "headless": false (which
+needs a display). "max_documents": N (and/or "max_per_company": M) scores the whole grid
+first and only generates CV / CL for the N best matches of the run.
+
+Writes matches.json and summary.json (counts, failures, stage / LLM
+timings) into results/runs/<run_id>/ next to the LLM call report, and
+prints the summary. Exit code 1 when any scrape / generation failed.
+Streamlit is never imported.
+
+`--resume RUN_ID` continues an unfinished run from its checkpoint
+journal (the spec argument can then be left out).
+
+With `--queue URL` the grid is put on a shared work queue instead and
+run by `python -m app.worker` processes (any host); the CLI waits for
+them and merges the results into the same files.
+"""
+import argparse, json, logging, os, pathlib, sys, threading
+from dataclasses import asdict, fields
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent   # job_bot_multisite/
+
+log = logging.getLogger("job_bot.cli")
+
+
+def load_spec(path: str) -> dict:
+    text = pathlib.Path(path).read_text(encoding="utf-8")
+    if path.endswith((".yml", ".yaml")):
+        try:
+            import yaml
+        except ImportError:
+            sys.exit("PyYAML is not installed – use a JSON run spec or `pip install pyyaml`.")
+        return yaml.safe_load(text) or {}
+    return json.loads(text)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Run a job search without the dashboard.")
+    parser.add_argument("spec", nargs="?", help="run spec (.json / .yaml); optional with --resume")
+    parser.add_argument("--out", help="output directory (default: results/runs/<run_id>)")
+    parser.add_argument("--backend", choices=["ollama", "openai", "local"], help="overrides the spec / LLM_BACKEND")
+    parser.add_argument("--model", action="append", default=[], metavar="TASK=BACKEND:MODEL",
+                        help="route one task (score / keywords / cover_letter), e.g. score=ollama:llama3.2:3b")
+    parser.add_argument("--concurrency", type=int, help="platforms processed in parallel (overrides the spec)")
+    parser.add_argument("--resume", metavar="RUN_ID", help="continue an unfinished run from its journal")
+    parser.add_argument("--no-cache", action="store_true", help="always scrape, ignore the scrape cache")
+    parser.add_argument("--queue", nargs="?", const="", metavar="URL",
+                        help="run on queue workers (default URL: WORK_QUEUE_URL or the local SQLite queue)")
+    parser.add_argument("--timeout", type=float, help="with --queue: stop waiting after this many seconds")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    caller_cwd = pathlib.Path.cwd()                    # spec / --out paths are relative to it
+    os.chdir(ROOT)                                     # relative paths (results/, config/) as in the app
+    sys.path.insert(0, str(ROOT))
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    if args.spec:
+        raw = load_spec(str(caller_cwd / args.spec))
+    elif args.resume:
+        from modules.run_journal import RunJournal
+        raw = dict(RunJournal(args.resume).spec or {})
+        if not raw:
+            parser.error(f"no journal found for run {args.resume}")
+    else:
+        parser.error("a run spec is required (or --resume RUN_ID)")
+    if args.resume and args.queue is not None:
+        parser.error("--resume runs locally; it cannot be combined with --queue")
+    spec_backend = raw.pop("backend", None)
+    spec_models = raw.pop("models", None) or {}
+    backend = args.backend or spec_backend
+    if backend:
+        os.environ["LLM_BACKEND"] = backend
+    from modules import model_routing
+    try:
+        model_routing.set_env_routes([f"{t}={m}" for t, m in spec_models.items()] + args.model)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    # imported after LLM_BACKEND is settled
+    from modules.search_jobs import SearchSpec, run_grid
+    from modules.llm_metrics import METRICS
+
+    known = {f.name for f in fields(SearchSpec)}
+    unknown = set(raw) - known
+    if unknown:
+        parser.error(f"unknown run spec field(s): {', '.join(sorted(unknown))}")
+    spec = SearchSpec(**raw)
+    if args.concurrency:
+        spec.concurrency = args.concurrency
+    if args.no_cache:
+        spec.use_cache = False
+    if spec.budgeted and args.queue is not None:
+        parser.error("max_documents / max_per_company need the whole run's scores; not supported with --queue")
+
+    counts = {"scraped": 0, "scored": 0, "generated": 0, "failed": 0}
+    if spec.budgeted:
+        counts["shortlisted"] = 0
+    failures = []
+    lock = threading.Lock()
+
+    def progress(event, **data):
+        with lock:
+            if event in counts:
+                counts[event] += data.get("n", 1) if event == "scraped" else 1
+            if event == "failed":
+                failures.append(data)
+        if event == "unit_started":
+            log.info("▶ %s · %s · %s", data["platform"], data["location"], data["term"])
+        elif event == "generating":
+            log.info("▶ documents for the best %d of %d matches", data["n"], data["shortlisted"])
+        elif event == "failed":
+            log.warning("✗ %s failed: %s", data.get("stage"), data.get("error"))
+        elif event == "generated":
+            m = data["match"]
+            log.info("✓ %s @ %s (%s/10)", m["title"], m["company"], m["score"])
+
+    if args.queue is not None:
+        from modules.work_queue import open_queue
+        from modules import queue_runner
+
+        queue = open_queue(args.queue or None)
+        # the run's backend / models travel with its tasks; workers' own settings apply otherwise
+        pinned = None
+        if backend or spec_models or args.model:
+            pinned = {t: str(r) for t, r in model_routing.routes().items()}
+        run_id = queue_runner.enqueue_search(spec, queue, routes=pinned)
+        log.info("queued run %s (%d grid cells) – waiting for workers", run_id, len(spec.units))
+        finished = queue_runner.wait(queue, run_id, timeout_s=args.timeout)
+        matches, merged = queue_runner.merge(queue, run_id)
+        counts, failures = merged["counts"], merged["failures"]
+        if not finished:
+            open_tasks = queue_runner.pending(queue, run_id)
+            log.warning("timed out with %d task(s) still open", open_tasks)
+            failures.append({"stage": "wait", "error": f"timed out, {open_tasks} task(s) still open"})
+    else:
+        from modules.scraper_pool import POOL
+        try:
+            matches, run_id = run_grid(spec, progress, run_id=args.resume)
+        finally:
+            POOL.close_all()                           # while the scrapers' threads still take work
+
+    out = caller_cwd / args.out if args.out else pathlib.Path("results", "runs", run_id)
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "matches.json").write_text(
+        json.dumps(matches, indent=2, ensure_ascii=False, default=str), encoding="utf-8"
+    )
+    timings = METRICS.summary(run_id)
+    summary = {
+        "run_id": run_id,
+        "spec": asdict(spec),
+        "backend": os.getenv("LLM_BACKEND", "ollama"),
+        "routes": {t: str(r) for t, r in model_routing.routes().items()},
+        "matches": len(matches),
+        "counts": counts,
+        "failures": failures,
+        "wall_s": round(timings.get("wall_s", 0.0), 2),
+        "llm_seconds": round(timings["llm_seconds"], 2),
+        "stage_seconds": {k: round(v, 2) for k, v in timings["stage_seconds"].items()},
+        "by_task": timings["by_task"],
+        "output": str(out),
+    }
+    if args.queue is not None:
+        summary["queue_tasks"] = merged["tasks"]        # LLM timings live in the workers' processes
+    (out / "summary.json").write_text(json.dumps(summary, indent=2, default=str), encoding="utf-8")
+    print(json.dumps(summary, indent=2, default=str))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,51 +2,150 @@
 import streamlit as st
 import tempfile
 import os
-import pathlib, json
+import pathlib, json, time
 import pandas as pd
 
-from modules.job_processing import search_and_process_jobs
+from modules.job_processing import RESULTS_FOLDER
+from modules.llm_metrics import METRICS
+from modules import search_jobs, scrape_cache, model_routing
 from modules.utils import load_search_terms
 from modules.render_jobs import render_job_results
-from modules.history_tracker import LOG_PATH, update_application_status
-from config.profile_loader import load_profile
+from modules.history_tracker import (
+    count_history, history_platforms, query_history, update_statuses,
+)
+from modules import job_archive
+from config.profile_loader import active_profile, load_profile, list_profiles, use_profile
 
 from scrapers.registry import REGISTRY
 from streamlit_option_menu import option_menu
 
 
 
-@st.cache_data(show_spinner=True)
-def do_job_search(
-    platforms: list[str],
-    locations: list[str],
-    terms: list[str],
-    hours_old: int,
-    results_wanted: int,
-    score_threshold: int,
-    generate_cv: bool,
-    generate_cl: bool,
-    debug_mode: bool,
-    easy_apply: bool
-) -> list[dict]:
-    all_matches = []
-    idx = 0
-
-    for platform in platforms:
-        for location in locations:
-            for term in terms:
-                matches = search_and_process_jobs(
-                    platform, term, location, hours_old, results_wanted,
-                    score_threshold=score_threshold,
-                    generate_cv=generate_cv,
-                    generate_cl=generate_cl,
-                    debug=debug_mode,
-                    ea_application=easy_apply,
-                )
-                all_matches.extend(matches)
-                idx += 1
+POLL_S = 2           # progress refresh while a search job runs
+
+
+def _render_job_progress(job_id: str, live_results: bool = False):
+    """Progress of a background search; with `live_results`, new matches trigger a full rerun."""
+    job = search_jobs.get_job(job_id)
+    if job is None:
+        st.warning(f"Search job `{job_id}` not found.")
+        return
+
+    label = {"queued": "⏳ Queued", "running": "🔄 Running", "done": "✅ Done",
+             "failed": "❌ Failed", "cancelled": "⛔ Cancelled", "interrupted": "⚠️ Interrupted"}[job.status]
+    eta = job.eta_s
+    text = f"{label} – {job.units_done}/{job.units_total} searches"
+    if job.current and job.active:
+        text += f" · {job.current}"
+    if eta is not None:
+        text += f" · ETA {int(eta // 60)} min {int(eta % 60)} s"
+    st.progress(job.fraction if job.status != "done" else 1.0, text=text)
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Scraped", job.counts["scraped"])
+    c2.metric("Scored", job.counts["scored"])
+    c3.metric("Generated", job.counts["generated"])
+    if "shortlisted" in job.counts:             # document budget: matches waiting for the final ranking
+        c3.caption(f"{job.counts['shortlisted']} shortlisted")
+    c4.metric("Failed", job.counts["failed"])
+    if job.error:
+        st.error(job.error)
+    if job.events:
+        with st.expander("Latest events"):
+            for ev in reversed(job.events[-10:]):
+                details = ", ".join(f"{k}={v}" for k, v in ev.items() if k not in ("t", "event"))
+                st.caption(f"{time.strftime('%H:%M:%S', time.localtime(ev['t']))} · {ev['event']} · {details}")
+    if job.active and st.button("⛔ Cancel search", key=f"cancel_{job_id}"):
+        search_jobs.cancel(job_id)
+    if job.status in ("failed", "cancelled", "interrupted") and st.button(
+        "▶️ Resume search", key=f"resume_{job_id}",
+        help="Runs it again under the same id; finished searches, scores and documents are reused.",
+    ):
+        search_jobs.resume(job_id)
+        st.session_state.pop("job_seen", None)
+        st.rerun()
+
+    # hand new matches / the final state over to the rest of the page
+    seen = st.session_state.get("job_seen")
+    state = (job.id, job.counts["generated"], job.status)
+    st.session_state["job_seen"] = state
+    if seen is not None and seen != state and (live_results or not job.active):
+        st.rerun()
+
 
-    return all_matches
+def _render_history():
+    """History tab of the active profile."""
+    # SQLite history (legacy applied_jobs.json is migrated on first access)
+    if count_history() == 0:
+        return st.info("You haven’t marked any applications yet.")
+
+    statuses = ["Applied", "Interviewing", "Offered", "Rejected"]
+    PAGE_SIZE = 50
+
+    # Filters → evaluated in SQL, only one page is ever loaded
+    f1, f2, f3 = st.columns(3)
+    status_f = f1.multiselect("Status", statuses)
+    platform_f = f2.multiselect("Platform", history_platforms())
+    dates = f3.date_input("Applied between", value=(), format="YYYY-MM-DD")
+    since = dates[0] if len(dates) > 0 else None
+    until = dates[1] if len(dates) > 1 else None
+    filters = dict(status=status_f, platforms=platform_f, since=since, until=until)
+
+    total = count_history(**filters)
+    n_pages = max(1, -(-total // PAGE_SIZE))
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1)
+    st.caption(f"{total} application(s) match the filters")
+
+    page_df = pd.DataFrame(
+        query_history(**filters, limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE),
+        columns=["title", "company", "location", "platform", "timestamp", "status", "url"],
+    )
+
+    # One editable table; edits are collected and written in one transaction
+    with st.form("history_edit"):
+        edited = st.data_editor(
+            page_df,
+            column_config={
+                "title": "Title",
+                "company": "Company",
+                "location": "Location",
+                "platform": "Platform",
+                "timestamp": "Timestamp",
+                "status": st.column_config.SelectboxColumn("Status", options=statuses, required=True),
+                "url": st.column_config.LinkColumn("Link", display_text="View job"),
+            },
+            disabled=["title", "company", "location", "platform", "timestamp", "url"],
+            hide_index=True,
+            use_container_width=True,
+            key=f"hist_editor_{page}",
+        )
+        save = st.form_submit_button("💾 Save status changes")
+
+    if save:
+        changes = {
+            url: new for url, new, old in zip(edited["url"], edited["status"], page_df["status"])
+            if new != old
+        }
+        n = update_statuses(changes)
+        st.session_state.pop("history_csv", None)       # statuses changed
+        st.success(f"Updated {n} application(s)")
+        st.rerun()
+
+    # CSV download of the filtered history: it reads every matching row, so
+    # it is only built on request and kept until the filters / rows change
+    csv_key = (active_profile(), repr(filters), total)
+    cached = st.session_state.get("history_csv")
+    if cached is not None and cached[0] == csv_key:
+        st.download_button(
+            "⬇️ Download filtered history as CSV",
+            data=cached[1],
+            file_name="past_applications.csv",
+            mime="text/csv"
+        )
+    elif st.button("📄 Prepare CSV of the filtered history"):
+        df = pd.DataFrame(query_history(**filters))
+        st.session_state["history_csv"] = (csv_key, df.to_csv(index=False).encode("utf-8"))
+        st.rerun()
 
 
 ## THIS WILL BE THE MAIN DICTIONARY THAT WILL IMPLEMENT THE APP FUNCTIONALITIES ##
@@ -56,6 +155,15 @@ def run_dashboard():
     
     PROFILE = load_profile()             # None if not created yet
     st.session_state["PROFILE"] = PROFILE
+
+    # background search job: survives reloads through the ?job=<id> URL param
+    if "job_id" not in st.session_state and "job" in st.query_params:
+        st.session_state["job_id"] = st.query_params["job"]
+    job_id = st.session_state.get("job_id")
+    job = search_jobs.get_job(job_id) if job_id else None
+    if job is not None:
+        st.session_state["all_matches"] = job.matches_so_far()
+        st.session_state["run_id"] = job.run_id
     
     # 1) Sticky top menu CSS
     st.markdown("""
@@ -89,8 +197,8 @@ def run_dashboard():
         st.markdown('<div class="top-nav">', unsafe_allow_html=True)
         selected = option_menu(
             menu_title=None,
-            options=["Home","Search","Results","History","Manual Job Entry"],
-            icons=["house","search","table","envelope","clock-history","gear"],
+            options=["Home","Search","Results","History","Archive","Manual Job Entry"],
+            icons=["house","search","table","envelope","archive","clock-history","gear"],
             default_index=1,
             orientation="horizontal",
             styles={
@@ -164,13 +272,23 @@ def run_dashboard():
         
        # --- LLM engine & key -------------------------------------------------
         default_backend = "Ollama (local Llama3-8B)"
+        engines = [default_backend, "OpenAI API (gpt-3.5-turbo)", "Local scorer (no LLM)"]
         use_api = st.selectbox(
             "​Choose LLM engine:",
-            [default_backend, "OpenAI API (gpt-3.5-turbo)"],
-            index=0 if os.getenv("LLM_BACKEND", "ollama") == "ollama" else 1,
+            engines,
+            index={"ollama": 0, "openai": 1, "local": 2}.get(os.getenv("LLM_BACKEND", "ollama"), 0),
         )
         
-        if use_api.startswith("OpenAI"):
+        if use_api.startswith("Local"):
+            # ---------------- NO-LLM BACKEND -----------------
+            os.environ["LLM_BACKEND"] = "local"
+            st.info(
+                "Jobs are ranked by the built-in BM25 scorer (skills & experience vs. "
+                "description). Keywords are picked locally; cover letters are skipped."
+            )
+            st.session_state["LLM_READY"] = True
+
+        elif use_api.startswith("OpenAI"):
             os.environ["LLM_BACKEND"] = "openai"
         
             # -------------------- safe OpenAI key lookup --------------------
@@ -201,40 +319,91 @@ def run_dashboard():
         else:
             # ---------------- OLLAMA BACKEND -----------------
             os.environ["LLM_BACKEND"] = "ollama"
+            st.session_state["LLM_READY"] = True
+            # --------------------------------------------------
 
+        # ---------------- ROUTED BACKENDS ------------------
+        # Per-task routes may point at another backend than the engine above;
+        # whatever is missing (Ollama, a model, the OpenAI key) goes to the local scorer.
+        unavailable = []
+        wanted = model_routing.ollama_models(configured=True)
+        if wanted:
             import shutil, subprocess
 
             # 1) Is the Ollama CLI even on PATH?
             if shutil.which("ollama") is None:
-                st.error(
-                    "Ollama executable not found. Install Ollama first "
-                    "or select the OpenAI backend above."
+                st.warning(
+                    "Ollama executable not found – falling back to the local scorer "
+                    "(no LLM). Install Ollama or select the OpenAI backend above."
                 )
-                st.stop()
+                unavailable.append("ollama")
 
-            # 2) Does the user already have the llama3 model?
-            try:
-                res = subprocess.run(
-                    ["ollama", "list"], capture_output=True, text=True, timeout=5
-                )
-                has_llama3 = any("llama3" in line.lower() for line in res.stdout.splitlines())
-            except Exception as e:  # noqa: BLE001
-                st.error(f"Could not query Ollama models: {e}")
-                st.stop()
-
-            if not has_llama3:
-                st.error(
-                    "Ollama is installed but the *llama3* model isn’t. "
-                    "Run `ollama pull llama3` or switch to OpenAI above."
-                )
-                st.session_state["LLM_READY"] = False
-                st.stop()
+            # 2) Does the user already have the model(s) the tasks are routed to?
             else:
-                st.session_state["LLM_READY"] = True
-            # --------------------------------------------------
+                try:
+                    res = subprocess.run(
+                        ["ollama", "list"], capture_output=True, text=True, timeout=5
+                    )
+                    missing = [m for m in wanted
+                               if not any(m.lower() in line.lower() for line in res.stdout.splitlines())]
+                except Exception as e:  # noqa: BLE001
+                    st.error(f"Could not query Ollama models: {e}")
+                    st.stop()
+
+                if missing:
+                    st.warning(
+                        f"Ollama is installed but *{', '.join(missing)}* isn’t – falling back to "
+                        f"the local scorer. Run `ollama pull {missing[0]}`, change the per-task "
+                        "models below, or switch to OpenAI above."
+                    )
+                    unavailable += [f"ollama:{m}" for m in missing]
+                else:
+                    # 3) Is it already resident? (otherwise preloaded when the search starts)
+                    try:
+                        ps = subprocess.run(["ollama", "ps"], capture_output=True, text=True, timeout=5)
+                        warm = [m for m in wanted
+                                if any(m.lower() in line.lower() for line in ps.stdout.splitlines())]
+                    except Exception:  # noqa: BLE001
+                        warm = []
+                    cold = [m for m in wanted if m not in warm]
+                    st.caption(
+                        f"{', '.join(wanted)} loaded (warm)." if not cold else
+                        f"{', '.join(cold)} not loaded yet – preloaded when the search starts."
+                    )
+        openai_tasks = [t for t, r in model_routing.routes(configured=True).items() if r.backend == "openai"]
+        if openai_tasks and not os.getenv("OPENAI_API_KEY"):
+            st.warning(
+                f"{', '.join(openai_tasks)} routed to OpenAI but no OPENAI_API_KEY is set – "
+                "falling back to the local scorer."
+            )
+            unavailable.append("openai")
+        model_routing.set_unavailable(unavailable)
+        # --------------------------------------------------
         if not st.session_state.get("LLM_READY", True):
             st.warning("LLM backend is not ready. Fix the issue above, then refresh.")
             st.stop()
+
+        # --- per-task models (saved in the profile, see modules/model_routing.py) ---
+        with st.expander("Per-task models"):
+            st.caption(
+                "`backend:model` per task – e.g. a small `ollama:llama3.2:3b` for scoring and "
+                "keywords, `ollama:llama3` only for the cover letters of matches. "
+                "`local` = built-in scorer, empty = the engine above."
+            )
+            saved_routes = dict(st.session_state["PROFILE"].get("model_routing") or {})
+            with st.form("model_routing"):
+                new_routes = {
+                    task: st.text_input(label, value=saved_routes.get(task, ""))
+                    for task, label in (("score", "Job scoring"), ("keywords", "CV keywords"),
+                                        ("cover_letter", "Cover letter"))
+                }
+                if st.form_submit_button("Save routing"):
+                    prof = dict(st.session_state["PROFILE"])
+                    prof["model_routing"] = {t: v.strip() for t, v in new_routes.items() if v.strip()}
+                    with open("config/profile.json", "w", encoding="utf-8") as fh:
+                        json.dump(prof, fh, ensure_ascii=False, indent=2)
+                    st.rerun()
+            st.caption("In use: " + " · ".join(f"{t} → `{r}`" for t, r in model_routing.routes().items()))
         
 ## HERE, WE IMPORT THE KEYWORDS FOR THE FUTURE SCRAPING ON THE PLATFORMS ##       
         st.markdown("### Keywords")
@@ -329,41 +498,81 @@ def run_dashboard():
         results_wanted = st.slider("Results per search term", 1, 25, 10)
         score_threshold = st.slider("Match Score Threshold", 0, 10, 7)
         days_old = st.slider("Max job age (in days)", 1, 30, 10)
+        prefilter = 0
+        if model_routing.route("score").backend != "local":
+            prefilter = st.slider(
+                "Local pre-filter: skip the LLM below this local score (0 = off)", 0, 10, 0
+            )
 
 ## WE LET THE USER CHOSE RATHER IT WANTS OR NOT TO GENERATE THE TAILORED DOCUMENTS FOR THE JOB / ##
 ## SHOW THE REASONING OF THE LLM DURING ITS TAILORING ##
         st.markdown("---")
         gen_cv = st.checkbox("Generate Tailored CVs", value=True)
         gen_cl = st.checkbox("Generate Cover Letters", value=True)
+        with st.expander("Document budget"):
+            max_documents = st.number_input(
+                "Only generate documents for the N best matches of the run (0 = every match)",
+                min_value=0, max_value=500, value=0, step=1,
+                help="The whole search is scored first; CV / CL are then generated for the "
+                     "highest-scoring matches across all sites, locations and keywords.",
+            )
+            max_per_company = st.number_input(
+                "At most N of them per company (0 = no cap)", min_value=0, max_value=50, value=0, step=1,
+            )
         debug_mode = st.checkbox(
             "Show LLM reasoning and prompts",
             key="show_llm_prompts",          # store in session_state
             value=st.session_state.get("show_llm_prompts", False)
         )
+        use_cache = st.checkbox(
+            "Reuse recent scrape results (re-score without re-scraping)",
+            value=scrape_cache.ttl_seconds() > 0,
+            help="Cached per platform / keyword / location for SCRAPE_CACHE_TTL_H hours.",
+        )
+        profiles = []
+        if list_profiles():
+            profiles = st.multiselect(
+                "Profiles (multi-profile mode)", list_profiles(),
+                help="Profiles from config/profiles/. The postings are scraped once; every "
+                     "profile gets its own scores, documents (results/profiles/<name>/) and history. "
+                     "Leave empty to search for the default profile only.",
+            )
 
 ## WE RUN THE JOB SEARCH ##
-        run_button = st.button("🔍 Start Job Search")
+        run_button = st.button("🔍 Start Job Search", disabled=job is not None and job.active)
         if run_button:
             if not search_terms:
                 st.error("Please upload a valid keywords .txt file.")
             else:
-                # Call the cached function
-                hours_old = days_old * 24
-                matches = do_job_search(
-                    job_sites,
-                    locations,
-                    search_terms,
-                    hours_old,
-                    results_wanted,
-                    score_threshold,
-                    gen_cv,
-                    gen_cl,
-                    debug_mode,
-                    easy_apply
+                # Runs on a background worker; this page only polls its progress
+                spec = search_jobs.SearchSpec(
+                    platforms=job_sites,
+                    locations=locations,
+                    terms=search_terms,
+                    hours_old=days_old * 24,
+                    results_wanted=results_wanted,
+                    score_threshold=score_threshold,
+                    generate_cv=gen_cv,
+                    generate_cl=gen_cl,
+                    debug=debug_mode,
+                    easy_apply=easy_apply,
+                    prefilter=prefilter,
+                    use_cache=use_cache,
+                    headless=False,         # local app: the browser window stays visible, as before
+                    profiles=profiles,
+                    max_documents=int(max_documents),
+                    max_per_company=int(max_per_company),
                 )
-                # Store results and jump to the Results tab
-                st.session_state["all_matches"] = matches
+                new_id = search_jobs.submit(spec)
+                st.session_state["job_id"] = new_id
+                st.query_params["job"] = new_id
+                st.session_state.pop("applied_urls", None)      # new result set
+                st.session_state.pop("job_seen", None)
                 st.rerun()
+
+        if job is not None:
+            st.markdown("### Current search")
+            st.fragment(_render_job_progress, run_every=POLL_S if job.active else None)(job.id)
       
     # --- 2) RESULTS TAB ---
     elif selected == "Results":
@@ -371,11 +580,27 @@ def run_dashboard():
         if st.session_state["PROFILE"] is None:
             return st.warning("Create your profile in the **Home** tab first.")
         
+        if job is not None:
+            st.fragment(_render_job_progress, run_every=POLL_S if job.active else None)(job.id, live_results=True)
+
         saved = st.session_state.get("all_matches", None)
         if saved is None:
             st.info("Run a search first …")
         else:
-            st.success(f"✅ Found {len(saved)} job(s)!")
+            st.success(f"✅ Found {len(saved)} job(s)" + (" so far …" if job is not None and job.active else "!"))
+
+            run_id = st.session_state.get("run_id")
+            if run_id:
+                summary = METRICS.summary(run_id)
+                with st.expander(f"⏱️ Run {run_id} – LLM & stage timings"):
+                    c1, c2, c3, c4 = st.columns(4)
+                    c1.metric("Run wall time (s)", round(summary.get("wall_s", 0), 1))
+                    c2.metric("LLM time (s)", round(summary["llm_seconds"], 1))
+                    c3.metric("Scrape time (s)", round(summary["stage_seconds"].get("scrape", 0), 1))
+                    c4.metric("Model cold starts", sum(r["cold_starts"] for r in summary["by_task"]))
+                    if summary["by_task"]:
+                        st.dataframe(pd.DataFrame(summary["by_task"]), use_container_width=True)
+                    st.caption(f"Full report: `{os.path.join(RESULTS_FOLDER, 'runs', run_id)}`")
             render_job_results(saved, debug_mode=st.session_state.get("show_llm_prompts", False))       
 
    # ---------- 3) PAST APPLICATIONS TAB ----------
@@ -385,82 +610,39 @@ def run_dashboard():
         if st.session_state["PROFILE"] is None:
             return st.warning("Create your profile in the **Home** tab first.")
     
-        if not LOG_PATH.exists():
-            return st.info("You haven’t marked any applications yet.")
-    
-        raw = json.loads(LOG_PATH.read_text(encoding="utf-8"))
-    
-        # Legacy format → normalize to list of dicts
-        if raw and isinstance(raw[0], str):
-            raw = [
-                {
-                    "url": u,
-                    "title": "",
-                    "company": "",
-                    "location": "",
-                    "platform": "",
-                    "timestamp": None,
-                    "status": "Applied"
-                }
-                for u in raw
-            ]
-    
-        # Ensure every entry has all fields
-        for entry in raw:
-            entry.setdefault("title", "")
-            entry.setdefault("company", "")
-            entry.setdefault("location", "")
-            entry.setdefault("platform", "")
-            entry.setdefault("timestamp", None)
-            entry.setdefault("status", "Applied")
-    
-        statuses = ["Applied", "Interviewing", "Offered", "Rejected"]
-    
-        # Header row
-        cols = st.columns([2,2,1,1,1,1,1])
-        for header, col in zip(
-            ["Title","Company","Location","Platform","Timestamp","Status","Link"],
-            cols
-        ):
-            col.markdown(f"**{header}**")
-    
-        # One row per application
-        for i, entry in enumerate(raw):
-            c0, c1, c2, c3, c4, c5, c6 = st.columns([2,2,1,1,1,1,1])
-            c0.write(entry["title"])
-            c1.write(entry["company"])
-            c2.write(entry["location"])
-            c3.write(entry["platform"])
-            c4.write(entry["timestamp"] or "—")
-    
-            # Status dropdown
-            current = entry["status"]
-            new_status = c5.selectbox(
-                "Status",
-                statuses,
-                index=statuses.index(current),
-                key=f"hist_status_{i}"
-            )
-            if new_status != current:
-                update_application_status(entry["url"], new_status)
-                st.rerun()
-    
-            # Clickable link
-            c6.markdown(f"[View job]({entry['url']})", unsafe_allow_html=True)
-    
-        # CSV download of the raw data
-        df = pd.DataFrame(raw)
-        st.download_button(
-            "⬇️ Download full history as CSV",
-            data=df.to_csv(index=False).encode("utf-8"),
-            file_name="past_applications.csv",
-            mime="text/csv"
-        )
+        # multi-profile mode: every candidate has their own history
+        names = list_profiles()
+        hist_profile = st.selectbox(
+            "Profile", [None] + names, format_func=lambda n: n or "Default (config/profile.json)",
+        ) if names else None
+        with use_profile(hist_profile):
+            _render_history()
         
-    # ---------- 4) Manual Job Entry ----------
+    # ---------- 4) ARCHIVE (full-text search over every scraped posting) ----------
+    elif selected == "Archive":
+        st.header("Job archive")
+        st.caption(f"{job_archive.count()} posting(s) archived across all runs")
+
+        a1, a2, a3 = st.columns([3, 1, 1])
+        text = a1.text_input("Search title, company or description",
+                             placeholder="e.g. python data engineer")
+        platforms = a2.multiselect("Platform", job_archive.platforms())
+        limit = a3.number_input("Max hits", min_value=10, max_value=500, value=50, step=10)
+
+        if text.strip():
+            hits = job_archive.search(text, limit=int(limit), platforms=platforms)
+            st.caption(f"{len(hits)} hit(s)")
+            for hit in hits:
+                with st.expander(f"{hit['title']} — {hit['company']} ({hit['location'] or '?'}) · {hit['platform']}"):
+                    st.markdown(hit["snippet"] or "_no description_")
+                    st.caption(f"First seen {hit['first_seen']} · last seen {hit['last_seen']} · keyword: {hit['keyword']}")
+                    if hit["job_url"]:
+                        st.markdown(f"[View job]({hit['job_url']})")
+
+    # ---------- 5) Manual Job Entry ----------
     elif selected == "Manual Job Entry":
         from modules.utils import extract_keywords, sanitize_filename
-        from modules.cv_generator import insert_keywords_into_doc, convert_to_pdf_libreoffice
+        from modules.cv_generator import render_cv
         from modules.cl_generator import generate_cover_letter, save_to_pdf
         
         BASE_CV_PATH_EN = "assets/templates/template_cv.docx"
@@ -501,13 +683,12 @@ def run_dashboard():
                 os.makedirs(folder, exist_ok=True)
     
                 # Generate CV
-                cv_path = os.path.join(folder, "CV_Custom.docx")
-                insert_keywords_into_doc(template_cv, keywords, cv_path)
-                convert_to_pdf_libreoffice(cv_path, folder)
+                render_cv(template_cv, keywords, folder)
     
                 # Generate Cover Letter
                 cl_doc = generate_cover_letter(title, company, location)
-                save_to_pdf({}, cl_doc, folder)
+                if cl_doc is not None:
+                    save_to_pdf({}, cl_doc, folder)
     
                 # Save all values in session
                 st.session_state.manual_inputs.update({
@@ -0,0 +1,71 @@
+# ------------------ app/worker.py ------------------
+"""
+Queue worker: runs scrape / score / generate tasks of searches queued
+with `python -m app.cli spec.json --queue URL`.
+
+    python -m app.worker --queue redis://queue-host:6379/0 [--kinds score generate] [--backend ollama]
+
+Start as many as you like, on as many machines as share the queue (and
+results/, see `modules.queue_runner`). Stops on Ctrl-C / SIGTERM, or after
+--idle-exit seconds without work. Streamlit is never imported.
+--backend / --model are this worker's defaults; a run queued with a
+"backend" / "models" in its spec (or CLI flags) brings its own routes.
+"""
+import argparse, logging, os, pathlib, signal, sys, threading
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent   # job_bot_multisite/
+
+log = logging.getLogger("job_bot.worker")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="Process queued search tasks.")
+    parser.add_argument("--queue", help="queue URL (default: WORK_QUEUE_URL or the local SQLite queue)")
+    parser.add_argument("--kinds", nargs="+", choices=["scrape", "score", "generate"],
+                        help="task kinds to take (default: all)")
+    parser.add_argument("--backend", choices=["ollama", "openai", "local"], help="overrides LLM_BACKEND")
+    parser.add_argument("--model", action="append", default=[], metavar="TASK=BACKEND:MODEL",
+                        help="route one task (score / keywords / cover_letter), e.g. score=ollama:llama3.2:3b")
+    parser.add_argument("--poll", type=float, default=5.0, help="seconds between polls when idle")
+    parser.add_argument("--lease", type=float, default=300.0, help="lease length (s); renewed while a task runs")
+    parser.add_argument("--idle-exit", type=float, help="exit after this many idle seconds")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)                                     # relative paths (results/, config/) as in the app
+    sys.path.insert(0, str(ROOT))
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    if args.backend:
+        os.environ["LLM_BACKEND"] = args.backend
+    from modules import model_routing
+    try:
+        model_routing.set_env_routes(args.model)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    # imported after LLM_BACKEND is settled
+    from modules.work_queue import open_queue
+    from modules.queue_runner import run_worker
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    from modules.scraper_pool import POOL
+    try:
+        handled = run_worker(
+            open_queue(args.queue), args.kinds,
+            poll_s=args.poll, lease_s=args.lease, idle_exit_s=args.idle_exit, stop=stop,
+        )
+    finally:
+        POOL.close_all()                               # while the scrapers' threads still take work
+    log.info("worker stopped after %d task(s)", handled)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,101 @@
 # ── config/profile_loader.py ────────────────────────────────────────
 """
-Tiny utility to load the user-specific JSON profile exactly once
+Tiny utility to load the user-specific JSON profile on demand.
+
+The parsed profile is cached and re-read whenever its file changes on
+disk, so editing the profile takes effect without a restart.
+Nothing is read at import time.
+
+Multi-profile mode: extra candidates live in config/profiles/<name>.json.
+Inside `with use_profile(name):` every reader (prompts, local scorer,
+history, dedup index, job folders) sees that profile and its own data
+directory, results/profiles/<name>/ (`profile_home()`). Outside, or with
+name None, it is the single config/profile.json with results/ as before.
+The active profile is a context variable, so threads started with a
+copied context (search grid workers) keep it.
 """
 
-import json, pathlib
+import contextlib, contextvars, json, pathlib
 
 _PROFILE_FILE   = pathlib.Path("config/profile.json")
-_PROFILE_CACHE  = None      # lazy-loaded singleton
+PROFILES_DIR    = pathlib.Path("config/profiles")
+RESULTS_ROOT    = pathlib.Path("results")
+_CACHE: dict    = {}        # path → (stamp, profile); lazy-loaded, keyed on the file's mtime
+
+_ACTIVE: contextvars.ContextVar = contextvars.ContextVar("profile", default=None)
+
+
+def list_profiles() -> list[str]:
+    """Names of the profiles in config/profiles/ (the multi-profile mode candidates)."""
+    return sorted(p.stem for p in PROFILES_DIR.glob("*.json"))
+
+
+def active_profile():
+    """Name of the profile in use, None for the default config/profile.json."""
+    return _ACTIVE.get()
+
+
+@contextlib.contextmanager
+def use_profile(name):
+    """Make `name` (None = default profile) the active profile inside the block."""
+    if name is not None and not (PROFILES_DIR / f"{name}.json").is_file():
+        raise FileNotFoundError(f"No profile '{name}' in {PROFILES_DIR}/")
+    token = _ACTIVE.set(name)
+    try:
+        yield
+    finally:
+        _ACTIVE.reset(token)
+
 
+def profile_path(name=None) -> pathlib.Path:
+    name = name if name is not None else active_profile()
+    return _PROFILE_FILE if name is None else PROFILES_DIR / f"{name}.json"
 
-def load_profile(path: pathlib.Path = _PROFILE_FILE) -> dict:
-    """Return the cached profile dict, loading it on first call."""
-    global _PROFILE_CACHE
-    if _PROFILE_CACHE is None:
-        if not path.exists():
-            return None
+
+def profile_home(name=None) -> pathlib.Path:
+    """Where the profile's job folders, history and dedup index live."""
+    name = name if name is not None else active_profile()
+    return RESULTS_ROOT if name is None else RESULTS_ROOT / "profiles" / name
+
+
+def _stamp(path: pathlib.Path):
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def load_profile(path: pathlib.Path = None) -> dict:
+    """Return the cached profile dict, (re)loading it when the file changed."""
+    path = path or profile_path()
+    stamp = _stamp(path)
+    if stamp is None:
+        _CACHE.pop(str(path), None)
+        return None
+    hit = _CACHE.get(str(path))
+    if hit is None or hit[0] != stamp:
         with open(path, encoding="utf-8") as fh:
-            _PROFILE_CACHE = json.load(fh)
-    return _PROFILE_CACHE
+            hit = _CACHE[str(path)] = (stamp, json.load(fh))
+    return hit[1]
+
+
+def reload_profile(path: pathlib.Path = None) -> dict:
+    """Drop the cache and read the file again."""
+    _CACHE.pop(str(path or profile_path()), None)
+    return load_profile(path)
+
+
+def profile_version():
+    """Changes whenever the loaded profile does (for caches built from it)."""
+    path = profile_path()
+    load_profile(path)
+    hit = _CACHE.get(str(path))
+    return hit[0] if hit else None
 
 
 def profile_field(key: str, default=None):
     prof = load_profile()          # None until the user creates a profile
     if prof is None:
         return default
-    return prof.get(key, default)
\ No newline at end of file
+    return prof.get(key, default)
@@ -0,0 +1,234 @@
+# ------------------ modules/artifact_store.py ------------------
+"""
+Content-addressed store for generated documents (tailored CVs, cover letters).
+
+An artifact is identified by a hash of everything that determines it:
+the kind, RECIPE_VERSION, and the inputs passed by the caller (template
+digest + keyword list for a CV, letter text for a cover letter). Its files
+live once under
+
+    results/artifacts/blobs/<k[:2]>/<key>/CV_Custom.docx, CV_Custom.pdf …
+
+and are put into each job folder from there: documents the user edits
+by hand (.docx) as independent copies – a reflink where the filesystem
+supports it, so they cost no extra space until edited – everything else
+(the PDFs) as hard links to the read-only blob, so an edit can't change
+what other jobs share. A `manifest.json` next to them records which key
+every job uses, so `gc()` can drop blobs no job refers to any more.
+
+A blob is only marked complete when the build produced every `expected`
+file; a failed PDF conversion is retried by the next job instead of
+being cached.
+"""
+from __future__ import annotations
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+STORE_ROOT = Path("results/artifacts")
+MANIFEST = "manifest.json"
+RECIPE_VERSION = 1          # bump when the CV / CL rendering code changes output
+_COMPLETE = ".complete"     # written last: a blob dir without it is a crashed / partial build
+EDITABLE = (".docx",)       # copied (reflinked) into job folders rather than hard-linked
+_FICLONE = 0x40049409       # Linux ioctl: share the extents of another file (btrfs, XFS …)
+
+_digest_cache: dict[tuple, str] = {}
+_manifest_lock = threading.Lock()
+
+
+# --------------------------------------------------------------------- #
+#  keys
+# --------------------------------------------------------------------- #
+def file_digest(path: str | Path) -> str:
+    """sha256 of a file (the "template version"), memoised on mtime/size."""
+    st = os.stat(path)
+    memo = (str(path), st.st_mtime_ns, st.st_size)
+    if memo not in _digest_cache:
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 16), b""):
+                h.update(chunk)
+        _digest_cache[memo] = h.hexdigest()
+    return _digest_cache[memo]
+
+
+def artifact_key(kind: str, *inputs) -> str:
+    """Stable key for `kind` built from JSON-serialisable `inputs`."""
+    payload = json.dumps([kind, RECIPE_VERSION, *inputs], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def blob_dir(key: str, root: str | Path = STORE_ROOT) -> Path:
+    return Path(root) / "blobs" / key[:2] / key
+
+
+# --------------------------------------------------------------------- #
+#  build / link
+# --------------------------------------------------------------------- #
+def _reflink(src: Path, dst: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:                     # Windows
+        return False
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    except OSError as exc:
+        if exc.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.EPERM):
+            log.debug("reflink %s failed: %s", src, exc)
+        dst.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def _link(src: Path, dst: Path) -> None:
+    """
+    Put blob file `src` at `dst`, replacing atomically: editable documents
+    as a private (reflinked) copy, the rest as a hard link (copy as fallback).
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    if src.suffix.lower() in EDITABLE:
+        if not _reflink(src, tmp):
+            shutil.copyfile(src, tmp)
+        os.chmod(tmp, 0o644)
+    else:
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def materialize(
+    kind: str,
+    key: str,
+    build: Callable[[Path], None],
+    folder: str | Path,
+    *,
+    expected: tuple[str, ...] = (),
+    root: str | Path = STORE_ROOT,
+) -> list[Path]:
+    """
+    Make the artifact `key` available in `folder` and record it in the
+    folder's manifest. `build(tmp_dir)` writes the files into an empty
+    directory and is only called when the store doesn't have them yet.
+    If one of the `expected` file names is missing afterwards, this job
+    still gets what was built, but the blob stays incomplete (rebuilt next
+    time). Returns the linked paths.
+    """
+    blob = blob_dir(key, root)
+    if not (blob / _COMPLETE).exists():
+        staging = Path(root) / "tmp"
+        staging.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=staging) as tmp:
+            build(Path(tmp))
+            blob.mkdir(parents=True, exist_ok=True)
+            for f in Path(tmp).iterdir():
+                if f.is_file():
+                    os.chmod(f, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)   # shared: read-only
+                    if (blob / f.name).exists():                # rebuilding an incomplete blob
+                        os.chmod(blob / f.name, stat.S_IRUSR | stat.S_IWUSR)
+                    os.replace(f, blob / f.name)
+        missing = [name for name in expected if not (blob / name).is_file()]
+        if missing:
+            log.warning("artifact %s %s is missing %s – not cached", kind, key[:12], ", ".join(missing))
+        else:
+            (blob / _COMPLETE).touch()
+    else:
+        log.debug("artifact %s %s reused", kind, key[:12])
+
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    files = sorted(p for p in blob.iterdir() if p.name != _COMPLETE)
+    for f in files:
+        _link(f, folder / f.name)
+    _record(folder, kind, key, [f.name for f in files])
+    return [folder / f.name for f in files]
+
+
+# --------------------------------------------------------------------- #
+#  manifests
+# --------------------------------------------------------------------- #
+def read_manifest(folder: str | Path) -> dict:
+    path = Path(folder) / MANIFEST
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"artifacts": {}}
+
+
+def _write_manifest(folder: Path, data: dict) -> None:
+    tmp = folder / f".{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, folder / MANIFEST)
+
+
+def _record(folder: Path, kind: str, key: str, files: list[str]) -> None:
+    with _manifest_lock:
+        data = read_manifest(folder)
+        data.setdefault("artifacts", {})[kind] = {"key": key, "files": files}
+        data["updated"] = datetime.now().isoformat(timespec="seconds")
+        _write_manifest(folder, data)
+
+
+def annotate(folder: str | Path, **job) -> None:
+    """Store job metadata (title, company, url, job_key …) in the manifest."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    with _manifest_lock:
+        data = read_manifest(folder)
+        data.setdefault("job", {}).update(job)
+        _write_manifest(folder, data)
+
+
+# --------------------------------------------------------------------- #
+#  garbage collection
+# --------------------------------------------------------------------- #
+def referenced_keys(results_root: str | Path) -> set[str]:
+    keys = set()
+    for manifest in Path(results_root).rglob(MANIFEST):
+        for entry in read_manifest(manifest.parent).get("artifacts", {}).values():
+            keys.add(entry.get("key"))
+    return keys
+
+
+def gc(results_root: str | Path = "results", *, root: str | Path = STORE_ROOT,
+       grace_s: float = 3600, dry_run: bool = False) -> tuple[int, int]:
+    """
+    Delete blobs no manifest under `results_root` refers to (older than
+    `grace_s`, so in-flight builds survive). Returns (blobs removed,
+    bytes freed – files still hard-linked from job folders don't count).
+    """
+    live = referenced_keys(results_root)
+    now = time.time()
+    removed = freed = 0
+    for blob in Path(root).glob("blobs/*/*"):
+        if blob.name in live or now - blob.stat().st_mtime < grace_s:
+            continue
+        for f in blob.iterdir():
+            st = f.stat()
+            if st.st_nlink == 1:
+                freed += st.st_size
+        if not dry_run:
+            for f in blob.iterdir():
+                os.chmod(f, stat.S_IRUSR | stat.S_IWUSR)     # blob files are read-only (Windows)
+            shutil.rmtree(blob, ignore_errors=True)
+        removed += 1
+    if removed:
+        log.info("artifact gc: %d blob(s), %.1f MB", removed, freed / 1e6)
+    return removed, freed
@@ -5,10 +5,15 @@ Handles cover letter generation by filling blank-based .docx templates and conve
 import os
 import subprocess
 import re
+from pathlib import Path
 from docx import Document
 
-from modules.prompts import COVER_LETTER_PROMPT
+from modules import artifact_store
+
+from modules.prompts import cover_letter_messages
 from modules.utils import llm_chat
+from modules.model_routing import route
+from config.profile_loader import profile_field
 
 # Paths to blank-based templates
 TEMPLATE_EN_DOCX = "assets/templates/template_motivation.docx"
@@ -41,9 +46,15 @@ def _cleanup_filled_text(text: str) -> str:
 def generate_cover_letter(job_title, company, location):
     """
     Load the appropriate blank-template, instruct LLaMA 3 to fill in blanks, return a Document.
+    Returns None when no LLM is available (cover letters routed to "local").
     """
-    # Choose template
-    template_path = TEMPLATE_EN_DOCX
+    r = route("cover_letter")
+    if r.backend == "local":
+        print("⚠️ Cover letters need an LLM backend – skipped in local mode.")
+        return None
+
+    # Choose template (a profile can bring its own)
+    template_path = profile_field("cl_template", TEMPLATE_EN_DOCX)
     try:
         tpl_doc = Document(template_path)
     except Exception as e:
@@ -54,17 +65,16 @@ def generate_cover_letter(job_title, company, location):
     template_lines = [p.text for p in tpl_doc.paragraphs]
     template_text = "\n".join(template_lines)
 
-    # Prepare prompt
-    prompt = COVER_LETTER_PROMPT.format(
-    job_title=job_title,
-    company=company,
-    location=location,
-    template_text=template_text
-    )
+    # Prepare prompt (template + profile first, the job last – see modules.prompts)
+    messages = cover_letter_messages(job_title, company, location, template_text)
     
     try:
-        model = "gpt-3.5-turbo" if os.getenv("LLM_BACKEND")=="openai" else "llama3"
-        resp = llm_chat(messages=[{"role": "user", "content": prompt}], model=model)
+        resp = llm_chat(
+            messages=messages,
+            model=r.model,
+            task="cover_letter",
+            backend=r.backend,
+        )
         filled = resp['message']['content'].strip()
     except Exception as e:
         print(f"⚠️ Letter filling failed: {e}")
@@ -82,15 +92,23 @@ def generate_cover_letter(job_title, company, location):
 
 def save_to_pdf(job_info, letter_doc, folder):
     """
-    Save a Document object to PDF in the given folder using LibreOffice headless.
+    Save a Document object to .docx + PDF in the given folder using LibreOffice headless.
+    Rendered once per letter text in the artifact store, then copied / linked into `folder`.
     """
-    os.makedirs(folder, exist_ok=True)
-    temp_docx = os.path.join(folder, "Cover_Letter.docx")
-    letter_doc.save(temp_docx)
-    try:
-        subprocess.run([
-            'libreoffice', '--headless', '--convert-to', 'pdf', temp_docx,
-            '--outdir', folder
-        ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except Exception as e:
-        print(f"⚠️ PDF conversion failed: {e}")
+    text = "\n".join(p.text for p in letter_doc.paragraphs)
+    key = artifact_store.artifact_key("cover_letter", text)
+
+    def build(tmp: Path) -> None:
+        temp_docx = str(tmp / "Cover_Letter.docx")
+        letter_doc.save(temp_docx)
+        try:
+            subprocess.run([
+                'libreoffice', '--headless', '--convert-to', 'pdf', temp_docx,
+                '--outdir', str(tmp)
+            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception as e:
+            print(f"⚠️ PDF conversion failed: {e}")
+
+    artifact_store.materialize("cover_letter", key, build, folder,
+                               expected=("Cover_Letter.docx", "Cover_Letter.pdf"))
+    return key
@@ -20,6 +20,7 @@ from __future__ import annotations
 
 import os, shutil, subprocess, logging
 from typing import List, Optional
+from pathlib import Path
 
 try:
     from docx import Document
@@ -31,6 +32,8 @@ try:
 except ImportError:
     fitz = None
 
+from modules import artifact_store
+
 log = logging.getLogger(__name__)
 
 
@@ -103,6 +106,24 @@ def insert_keywords_into_doc(
             log.warning("CV still exceeds 1 page after retry.")
 
 
+# ────────────────────────────────────────────────────────────────────
+def render_cv(template_cv: str, keywords: List[str], folder: str) -> str:
+    """
+    CV_Custom.docx / .pdf for `keywords` in `folder`, via the artifact store:
+    the same template + keyword list is rendered once and copied / linked
+    into every job folder that needs it. Returns the artifact key.
+    """
+    key = artifact_store.artifact_key("cv", artifact_store.file_digest(template_cv), list(keywords))
+
+    def build(tmp: Path) -> None:
+        docx = str(tmp / "CV_Custom.docx")
+        insert_keywords_into_doc(template_cv, keywords, docx)
+        convert_to_pdf_libreoffice(docx, str(tmp))
+
+    artifact_store.materialize("cv", key, build, folder, expected=("CV_Custom.docx", "CV_Custom.pdf"))
+    return key
+
+
 # ────────────────────────────────────────────────────────────────────
 def _inject_keywords(
     docx_path: str,
@@ -0,0 +1,276 @@
+# ------------------ modules/dedup.py ------------------
+"""
+Near-duplicate posting detection, run right after scraping.
+
+The same role shows up under several keywords / locations and as reposts
+with a fresh job_id. Every posting gets a MinHash signature over its
+normalised description (word 5-gram shingles); LSH banding finds
+candidates, which count as duplicates when their estimated Jaccard
+similarity is ≥ SIM_THRESHOLD *and* the normalised company agrees. Postings
+sharing a `job_identity` key (same company / title / city, close SimHash)
+are duplicates too – that is what catches one job on Indeed *and* LinkedIn.
+
+Duplicates collapse into one canonical posting that keeps every source
+URL. The index lives in SQLite (results/dedup_index.sqlite), so it
+persists across runs:
+• a duplicate of another posting in the *same batch* is dropped (its URL
+  joins the kept one's `source_urls`);
+• a duplicate of something seen before – in an earlier run, an earlier
+  cell of this run, or an attempt that crashed – is kept but carries the
+  stored score (`prior_score`), so the LLM is not asked twice – as long as
+  the score's stamp (scoring route + profile version, `utils.score_stamp`)
+  is still the current one. Matches found by two cells of one run are
+  merged by `search_jobs.run_grid` (same job_key → one match).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.job_identity import (
+    FP_MAX_DISTANCE, hamming, job_key as make_job_key, fingerprint,
+    normalize_text, normalize_title, normalize_company,
+)
+from config.profile_loader import active_profile, profile_home
+
+INDEX_PATH = Path("results/dedup_index.sqlite")
+
+NUM_PERM = 128
+BANDS = 16                      # 16 bands × 8 rows → candidates from ~0.7 similarity
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+SIM_THRESHOLD = 0.8
+
+_PRIME = np.uint64(4294967291)  # largest 32-bit prime: a·x + b stays < 2**64
+_rng = np.random.default_rng(20240601)                   # fixed → stable signatures
+_A = _rng.integers(1, int(_PRIME), NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), NUM_PERM, dtype=np.uint64)
+
+
+# --------------------------------------------------------------------- #
+#  signatures
+# --------------------------------------------------------------------- #
+def _shingle_hashes(text: str) -> np.ndarray:
+    words = normalize_text(text).split()
+    if len(words) < SHINGLE:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = {" ".join(words[i:i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little") for g in grams],
+        dtype=np.uint64,
+    )
+
+
+def minhash(text: str) -> np.ndarray | None:
+    """uint64[NUM_PERM] signature, or None for an empty description."""
+    x = _shingle_hashes(text)
+    if x.size == 0:
+        return None
+    return ((_A[:, None] * x[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def _band_keys(sig: np.ndarray) -> list[int]:
+    return [
+        int.from_bytes(hashlib.blake2b(sig[b * ROWS:(b + 1) * ROWS].tobytes(), digest_size=8).digest(),
+                       "little", signed=True)
+        for b in range(BANDS)
+    ]
+
+
+# --------------------------------------------------------------------- #
+#  persistent index
+# --------------------------------------------------------------------- #
+class DedupIndex:
+    """SQLite-backed MinHash/LSH index of canonical postings."""
+
+    def __init__(self, path: str | Path = INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS postings (
+                id         INTEGER PRIMARY KEY,
+                title      TEXT,
+                company    TEXT,
+                signature  BLOB,
+                urls       TEXT NOT NULL DEFAULT '[]',
+                first_seen TEXT,
+                last_run   TEXT,
+                score      INTEGER,
+                reasoning  TEXT,
+                job_key    TEXT,
+                desc_fp    TEXT,
+                score_stamp TEXT
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band       INTEGER NOT NULL,
+                bucket     INTEGER NOT NULL,
+                posting_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_bands ON bands(band, bucket);
+            CREATE INDEX IF NOT EXISTS ix_postings_tc ON postings(title, company);
+        """)
+        cols = {r[1] for r in self._db.execute("PRAGMA table_info(postings)")}
+        for col in ("job_key", "desc_fp", "score_stamp"):
+            if col not in cols:                 # index created before identity keys / stamps existed
+                self._db.execute(f"ALTER TABLE postings ADD COLUMN {col} TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_postings_key ON postings(job_key)")
+
+    # ---------------- lookup ----------------
+    def _find(self, title: str, company: str, sig: np.ndarray | None,
+              key: str | None = None, fp: str | None = None) -> int | None:
+        # 1) same platform-independent identity (cross-platform duplicates)
+        if key:
+            for pid, other_fp in self._db.execute(
+                "SELECT id, desc_fp FROM postings WHERE job_key = ?", (key,)
+            ):
+                if not fp or not other_fp or hamming(fp, other_fp) <= FP_MAX_DISTANCE:
+                    return pid
+
+        if sig is None:
+            # no description to compare: fall back to exact title + company
+            if not (title and company):
+                return None
+            row = self._db.execute(
+                "SELECT id FROM postings WHERE title = ? AND company = ? LIMIT 1", (title, company)
+            ).fetchone()
+            return row[0] if row else None
+
+        candidates: set[int] = set()
+        for band, bucket in enumerate(_band_keys(sig)):
+            candidates.update(
+                r[0] for r in self._db.execute(
+                    "SELECT posting_id FROM bands WHERE band = ? AND bucket = ?", (band, bucket)
+                )
+            )
+        best, best_sim = None, SIM_THRESHOLD
+        for pid in candidates:
+            other_company, blob = self._db.execute(
+                "SELECT company, signature FROM postings WHERE id = ?", (pid,)
+            ).fetchone()
+            if company and other_company and company != other_company:
+                continue
+            sim = float(np.mean(np.frombuffer(blob, dtype=np.uint64) == sig))
+            if sim >= best_sim:
+                best, best_sim = pid, sim
+        return best
+
+    def _insert(self, title, company, sig, url, run_id, key=None, fp=None) -> int:
+        cur = self._db.execute(
+            "INSERT INTO postings (title, company, signature, urls, first_seen, last_run, job_key, desc_fp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (title, company, sig.tobytes() if sig is not None else None,
+             json.dumps([url] if url else []), datetime.now().isoformat(timespec="seconds"), run_id,
+             key, fp),
+        )
+        pid = cur.lastrowid
+        if sig is not None:
+            self._db.executemany(
+                "INSERT INTO bands (band, bucket, posting_id) VALUES (?, ?, ?)",
+                [(b, k, pid) for b, k in enumerate(_band_keys(sig))],
+            )
+        return pid
+
+    # ---------------- public API ----------------
+    def collapse(self, df: pd.DataFrame, run_id: str, stamp: str | None = None) -> pd.DataFrame:
+        """
+        Return the canonical postings of `df`, one per duplicate group of
+        the batch, with extra columns `canonical_id`, `source_urls`,
+        `prior_score`, `prior_reasoning`. A stored score only becomes the
+        prior when it carries `stamp`. Calling it again with the same batch
+        (a resumed run, a retried task) returns the same postings.
+        """
+        if df.empty:
+            return df
+
+        keep, canonical, sources, prior_s, prior_r = [], [], [], [], []
+        kept: dict[int, int] = {}               # canonical id → position in this batch's output
+        with self._lock, self._db:
+            for i, row in enumerate(df.itertuples(index=False)):
+                title = normalize_title(getattr(row, "title", ""))
+                company = normalize_company(getattr(row, "company", ""))
+                url = getattr(row, "job_url", None)
+                desc = getattr(row, "description", "") or ""
+                sig = minhash(desc)
+                key = getattr(row, "job_key", None) or make_job_key(
+                    row.title, row.company, getattr(row, "location", "")
+                )
+                fp = getattr(row, "desc_fp", None) or fingerprint(desc)
+
+                pid = self._find(title, company, sig, key, fp)
+                if pid in kept:                     # duplicate within this batch
+                    urls = sources[kept[pid]]
+                    if url and url not in urls:
+                        urls.append(url)
+                        self._db.execute("UPDATE postings SET urls = ? WHERE id = ?", (json.dumps(urls), pid))
+                    continue
+                if pid is None:
+                    pid = self._insert(title, company, sig, url, run_id, key, fp)
+                    kept[pid] = len(keep)
+                    keep.append(i)
+                    canonical.append(pid)
+                    sources.append([url] if url else [])
+                    prior_s.append(None)
+                    prior_r.append(None)
+                    continue
+
+                urls_json, score, reasoning, score_stamp = self._db.execute(
+                    "SELECT urls, score, reasoning, score_stamp FROM postings WHERE id = ?", (pid,)
+                ).fetchone()
+                if score_stamp != stamp:        # scored for another profile version / model
+                    score = reasoning = None
+                urls = json.loads(urls_json)
+                if url and url not in urls:
+                    urls.append(url)
+                self._db.execute(
+                    "UPDATE postings SET urls = ?, last_run = ? WHERE id = ?",
+                    (json.dumps(urls), run_id, pid),
+                )
+                kept[pid] = len(keep)
+                keep.append(i)
+                canonical.append(pid)
+                sources.append(urls)
+                prior_s.append(score)
+                prior_r.append(reasoning)
+
+        out = df.iloc[keep].reset_index(drop=True)
+        out["canonical_id"] = canonical
+        out["source_urls"] = sources
+        out["prior_score"] = prior_s
+        out["prior_reasoning"] = prior_r
+        return out
+
+    def record_score(self, canonical_id: int, score: int, reasoning: str, stamp: str | None = None) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE postings SET score = ?, reasoning = ?, score_stamp = ? WHERE id = ?",
+                (int(score), reasoning, stamp, int(canonical_id)),
+            )
+
+
+_INDEXES: dict[str, DedupIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_index() -> DedupIndex:
+    """
+    Process-wide index of the active profile, opened on first use. Scores
+    are per candidate, so a named profile has its own index under
+    results/profiles/<name>/.
+    """
+    name = active_profile()
+    path = INDEX_PATH if name is None else profile_home(name) / INDEX_PATH.name
+    with _INDEX_LOCK:
+        if str(path) not in _INDEXES:
+            _INDEXES[str(path)] = DedupIndex(path)
+        return _INDEXES[str(path)]
@@ -1,19 +1,176 @@
 # modules/history_tracker.py
+"""
+Application history on SQLite (WAL mode, safe across Streamlit sessions).
+
+Lookups go through indexes on `url` (unique) and on the platform-independent
+`job_key`; status changes are single atomic UPDATEs. The old
+`applied_jobs.json` is imported once on first use and renamed to
+`applied_jobs.json.migrated` (left in place, with a warning, if it can't
+be parsed). Rows without a `job_key` get one from their title / company /
+location, so the cross-platform check covers the old history too.
+
+A named profile (multi-profile mode, `config.profile_loader.use_profile`)
+has its own history in results/profiles/<name>/applied_jobs.db.
+"""
 import json
+import logging
+import sqlite3
+import threading
 from pathlib import Path
 from datetime import datetime
 
-LOG_PATH = Path("applied_jobs.json")
+from modules.job_identity import IdentityIndex, job_key as make_job_key
+from config.profile_loader import active_profile, profile_home
+
+log = logging.getLogger(__name__)
+
+DB_PATH = Path("applied_jobs.db")
+LOG_PATH = Path("applied_jobs.json")       # legacy store, migrated once
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialised: set[str] = set()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id        INTEGER PRIMARY KEY,
+    url       TEXT NOT NULL UNIQUE,
+    title     TEXT NOT NULL DEFAULT '',
+    company   TEXT NOT NULL DEFAULT '',
+    location  TEXT NOT NULL DEFAULT '',
+    platform  TEXT NOT NULL DEFAULT '',
+    timestamp TEXT,
+    status    TEXT NOT NULL DEFAULT 'Applied',
+    job_key   TEXT,
+    desc_fp   TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_applications_job_key ON applications(job_key);
+CREATE INDEX IF NOT EXISTS ix_applications_status ON applications(status);
+CREATE INDEX IF NOT EXISTS ix_applications_timestamp ON applications(timestamp);
+"""
+_COLUMNS = ("timestamp", "title", "company", "location", "platform", "url", "status", "job_key", "desc_fp")
+
+
+def _db_path() -> Path:
+    return DB_PATH if active_profile() is None else profile_home() / DB_PATH.name
+
+
+def _connect() -> sqlite3.Connection:
+    """One connection per thread and database; schema + JSON migration on first use."""
+    path = _db_path()
+    key = str(path.resolve())
+    conn = getattr(_local, "conns", {}).get(key)
+    if conn is not None:
+        return conn
+
+    path.parent.mkdir(exist_ok=True, parents=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with _init_lock:
+        if key not in _initialised:
+            conn.executescript(_SCHEMA)
+            if path == DB_PATH:
+                _migrate_json(conn)
+            _backfill_keys(conn)
+            _initialised.add(key)
+    _local.__dict__.setdefault("conns", {})[key] = conn
+    return conn
 
-def _ensure_log():
-    LOG_PATH.parent.mkdir(exist_ok=True, parents=True)
+
+def _migrate_json(conn: sqlite3.Connection) -> None:
+    """Import the legacy applied_jobs.json (list of dicts or of bare URLs) once."""
     if not LOG_PATH.exists():
-        LOG_PATH.write_text("[]", encoding="utf-8")
+        return
+    try:
+        data = json.loads(LOG_PATH.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        log.error("%s is not valid JSON (%s) – history not imported, file left in place", LOG_PATH, exc)
+        return
+    rows = []
+    for item in data:
+        if isinstance(item, str):
+            item = {"url": item}
+        if not isinstance(item, dict) or not item.get("url"):
+            continue
+        rows.append((
+            item.get("timestamp"), item.get("title") or "", item.get("company") or "",
+            item.get("location") or "", item.get("platform") or "", item["url"],
+            item.get("status") or "Applied", item.get("job_key") or _legacy_key(item), item.get("desc_fp"),
+        ))
+    with conn:
+        conn.executemany(
+            f"INSERT OR IGNORE INTO applications ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            rows,
+        )
+    LOG_PATH.rename(LOG_PATH.with_name(LOG_PATH.name + ".migrated"))
+
+
+def _legacy_key(item) -> str | None:
+    """Identity key of a row stored without one; None when title / company are unknown."""
+    if not (item.get("title") and item.get("company")):
+        return None
+    return make_job_key(item["title"], item["company"], item.get("location") or "")
+
+
+def _backfill_keys(conn: sqlite3.Connection) -> None:
+    rows = conn.execute(
+        "SELECT id, title, company, location FROM applications "
+        "WHERE job_key IS NULL AND title != '' AND company != ''"
+    ).fetchall()
+    if rows:
+        with conn:
+            conn.executemany(
+                "UPDATE applications SET job_key = ? WHERE id = ?",
+                [(_legacy_key(dict(r)), r["id"]) for r in rows],
+            )
+
+
+# --------------------------------------------------------------------- #
+#  public API (signatures unchanged from the JSON version)
+# --------------------------------------------------------------------- #
+def has_already_applied(url: str, job_key: str | None = None, desc_fp: str | None = None) -> bool:
+    """
+    True if this URL – or, when `job_key` is given, the same job on any
+    platform (see `modules.job_identity`) – is already in the history.
+    """
+    conn = _connect()
+    if conn.execute("SELECT 1 FROM applications WHERE url = ?", (url,)).fetchone():
+        return True
+    if not job_key:
+        return False
+    stored = conn.execute(
+        "SELECT job_key, desc_fp FROM applications WHERE job_key = ?", (job_key,)
+    ).fetchall()
+    return IdentityIndex((r["job_key"], r["desc_fp"]) for r in stored).contains(job_key, desc_fp)
+
+
+def filter_applied(urls, job_keys=None, desc_fps=None) -> set[str]:
+    """
+    Bulk applied-check: the subset of `urls` already in the history, by exact
+    URL or – when `job_keys` (and `desc_fps`) are given, aligned with `urls` –
+    by cross-platform identity. The history is read once for the whole batch.
+    """
+    urls = list(urls)
+    conn = _connect()
+    known = {r[0] for r in conn.execute("SELECT url FROM applications")}
+    applied = {u for u in urls if u in known}
+    if job_keys is not None:
+        keys = list(job_keys)
+        fps = list(desc_fps) if desc_fps is not None else [None] * len(keys)
+        hits = applied_identities().contains_many(keys, fps)
+        applied.update(u for u, hit in zip(urls, hits) if hit)
+    return applied
+
+
+def applied_identities() -> IdentityIndex:
+    """Identity index over the whole history, for batch applied-checks."""
+    rows = _connect().execute(
+        "SELECT job_key, desc_fp FROM applications WHERE job_key IS NOT NULL"
+    )
+    return IdentityIndex((r["job_key"], r["desc_fp"]) for r in rows)
 
-def has_already_applied(url: str) -> bool:
-    _ensure_log()
-    data = json.loads(LOG_PATH.read_text(encoding="utf-8"))
-    return any(item["url"] == url for item in data)
 
 def log_application(
     url: str,
@@ -21,42 +178,96 @@ def log_application(
     company: str,
     location: str,
     platform: str,
-    status: str = "Applied",       
-    timestamp: str | None = None
+    status: str = "Applied",
+    timestamp: str | None = None,
+    job_key: str | None = None,
+    desc_fp: str | None = None,
 ):
-    _ensure_log()
-    data = json.loads(LOG_PATH.read_text(encoding="utf-8"))
     if timestamp is None:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    if not any(item["url"] == url for item in data):
-        data.append({
-            "timestamp": timestamp,
-            "title": title,
-            "company": company,
-            "location": location,
-            "platform": platform,
-            "url": url,
-            "status": status,
-        })
-        LOG_PATH.write_text(json.dumps(data, indent=2), encoding="utf-8")
-        
-def _load_data():
-    _ensure_log()
-    try:
-        return json.loads(LOG_PATH.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        LOG_PATH.write_text("[]", encoding="utf-8")
-        return []        
-        
+    conn = _connect()
+    with conn:
+        conn.execute(
+            f"INSERT OR IGNORE INTO applications ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            (timestamp, title or "", company or "", location or "", platform or "",
+             url, status, job_key, desc_fp),
+        )
+
+
+def load_history() -> list[dict]:
+    """Every entry, oldest first, as plain dicts."""
+    rows = _connect().execute(
+        f"SELECT {', '.join(_COLUMNS)} FROM applications ORDER BY id"
+    )
+    return [dict(r) for r in rows]
+
+
+_load_data = load_history      # old private name
+
+
+def _where(status=None, platforms=None, since=None, until=None) -> tuple[str, list]:
+    """WHERE clause for the History tab filters (dates are 'YYYY-MM-DD')."""
+    clauses, params = [], []
+    if status:
+        clauses.append(f"status IN ({', '.join('?' * len(status))})")
+        params += list(status)
+    if platforms:
+        clauses.append(f"platform IN ({', '.join('?' * len(platforms))})")
+        params += list(platforms)
+    if since:
+        clauses.append("substr(timestamp, 1, 10) >= ?")
+        params.append(str(since))
+    if until:
+        clauses.append("substr(timestamp, 1, 10) <= ?")
+        params.append(str(until))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def query_history(
+    *,
+    status=None,
+    platforms=None,
+    since=None,
+    until=None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[dict]:
+    """Filtered page of the history, newest first."""
+    where, params = _where(status, platforms, since, until)
+    sql = f"SELECT {', '.join(_COLUMNS)} FROM applications{where} ORDER BY id DESC"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [int(limit), int(offset)]
+    return [dict(r) for r in _connect().execute(sql, params)]
+
+
+def count_history(*, status=None, platforms=None, since=None, until=None) -> int:
+    where, params = _where(status, platforms, since, until)
+    return _connect().execute(f"SELECT COUNT(*) FROM applications{where}", params).fetchone()[0]
+
+
+def history_platforms() -> list[str]:
+    rows = _connect().execute("SELECT DISTINCT platform FROM applications WHERE platform != '' ORDER BY 1")
+    return [r[0] for r in rows]
+
+
+def update_statuses(changes: dict[str, str]) -> int:
+    """Apply {url: new_status} in one transaction; returns the number of rows changed."""
+    if not changes:
+        return 0
+    conn = _connect()
+    with conn:
+        cur = conn.executemany(
+            "UPDATE applications SET status = ? WHERE url = ?",
+            [(status, url) for url, status in changes.items()],
+        )
+    return cur.rowcount
+
+
 def update_application_status(url: str, new_status: str):
     """
-    Find the entry with this URL, update its 'status' field, write file.
+    Find the entry with this URL and update its 'status' field (atomic).
     """
-    data = _load_data()
-    changed = False
-    for entry in data:
-        if isinstance(entry, dict) and entry.get("url") == url:
-            entry["status"] = new_status
-            changed = True
-    if changed:
-        LOG_PATH.write_text(json.dumps(data, indent=2), encoding="utf-8")
\ No newline at end of file
+    conn = _connect()
+    with conn:
+        conn.execute("UPDATE applications SET status = ? WHERE url = ?", (new_status, url))
@@ -0,0 +1,194 @@
+# ------------------ modules/job_archive.py ------------------
+"""
+Full-text archive of every scraped posting, matched or not.
+
+One row per `job_identity` key in SQLite (results/job_archive.sqlite) with
+an FTS5 index over title, company and description, kept in sync by
+triggers. Ingest is an UPSERT on the job key, so re-ingesting the same
+batch is a no-op apart from `last_seen`. `search()` returns BM25-ranked
+hits with a highlighted snippet.
+"""
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from modules.job_identity import job_key as make_job_key
+
+ARCHIVE_PATH = Path("results/job_archive.sqlite")
+
+# bm25() column weights: title, company, description
+_WEIGHTS = (10.0, 5.0, 1.0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_key     TEXT PRIMARY KEY,
+    title       TEXT,
+    company     TEXT,
+    location    TEXT,
+    platform    TEXT,
+    job_url     TEXT,
+    keyword     TEXT,
+    description TEXT,
+    first_seen  TEXT,
+    last_seen   TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, company, description,
+    content='jobs', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, title, company, description)
+    VALUES (new.rowid, new.title, new.company, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF title, company, description ON jobs
+WHEN old.title IS NOT new.title OR old.company IS NOT new.company
+  OR old.description IS NOT new.description
+BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description);
+    INSERT INTO jobs_fts(rowid, title, company, description)
+    VALUES (new.rowid, new.title, new.company, new.description);
+END;
+CREATE INDEX IF NOT EXISTS ix_jobs_last_seen ON jobs(last_seen);
+"""
+
+_lock = threading.Lock()
+
+
+def _connect(path: str | Path = ARCHIVE_PATH) -> sqlite3.Connection:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _clean(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return str(value)
+
+
+def ingest(df: pd.DataFrame, *, platform: str, keyword: str | None = None,
+           path: str | Path = ARCHIVE_PATH) -> int:
+    """
+    Upsert a scraped batch by job key; returns the number of rows touched.
+    The FTS trigger only fires when the indexed text actually changed, so
+    re-ingesting a batch does not rewrite the index.
+    """
+    if df.empty:
+        return 0
+    now = datetime.now().isoformat(timespec="seconds")
+    rows = []
+    for r in df.itertuples(index=False):
+        key = getattr(r, "job_key", None) or make_job_key(r.title, r.company, getattr(r, "location", ""))
+        rows.append((
+            key, _clean(r.title), _clean(r.company), _clean(getattr(r, "location", None)),
+            platform, _clean(getattr(r, "job_url", None)), keyword,
+            _clean(getattr(r, "description", None)), now, now,
+        ))
+    with _lock:
+        conn = _connect(path)
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO jobs (job_key, title, company, location, platform, job_url,
+                                      keyword, description, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(job_key) DO UPDATE SET
+                        last_seen   = excluded.last_seen,
+                        job_url     = COALESCE(excluded.job_url, jobs.job_url),
+                        description = COALESCE(excluded.description, jobs.description)
+                """, rows)
+        finally:
+            conn.close()
+    return len(rows)
+
+
+def _fts_query(text: str) -> str:
+    """Free text → safe FTS5 query: every word quoted, last one as a prefix."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return ""
+    quoted = [f'"{w}"' for w in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search(
+    text: str,
+    *,
+    limit: int = 25,
+    platforms: list[str] | None = None,
+    since: str | None = None,
+    raw: bool = False,
+    path: str | Path = ARCHIVE_PATH,
+) -> list[dict]:
+    """
+    BM25-ranked postings matching `text` (title hits weigh most).
+    `raw=True` passes `text` to FTS5 unchanged (AND/OR/NEAR, column filters).
+    """
+    query = text if raw else _fts_query(text)
+    if not query:
+        return []
+    sql = f"""
+        SELECT j.job_key, j.title, j.company, j.location, j.platform, j.job_url,
+               j.keyword, j.first_seen, j.last_seen,
+               snippet(jobs_fts, 2, '**', '**', ' … ', 16) AS snippet,
+               bm25(jobs_fts, {', '.join(map(str, _WEIGHTS))}) AS rank
+        FROM jobs_fts JOIN jobs j ON j.rowid = jobs_fts.rowid
+        WHERE jobs_fts MATCH ?
+    """
+    params: list = [query]
+    if platforms:
+        sql += f" AND j.platform IN ({', '.join('?' * len(platforms))})"
+        params += list(platforms)
+    if since:
+        sql += " AND j.last_seen >= ?"
+        params.append(str(since))
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(int(limit))
+
+    conn = _connect(path)
+    try:
+        return [dict(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def get_description(job_key: str, path: str | Path = ARCHIVE_PATH) -> str | None:
+    conn = _connect(path)
+    try:
+        row = conn.execute("SELECT description FROM jobs WHERE job_key = ?", (job_key,)).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def platforms(path: str | Path = ARCHIVE_PATH) -> list[str]:
+    conn = _connect(path)
+    try:
+        return [r[0] for r in conn.execute("SELECT DISTINCT platform FROM jobs ORDER BY 1")]
+    finally:
+        conn.close()
+
+
+def count(path: str | Path = ARCHIVE_PATH) -> int:
+    conn = _connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,148 @@
+# ------------------ modules/job_identity.py ------------------
+"""
+Platform-independent job identity.
+
+Indeed and LinkedIn rows use different id / URL schemes, so the same job
+found on both looks like two jobs. Every posting gets:
+
+• `job_key`  – 16-hex digest of normalised company | title | location
+               (city part only: "Paris, IDF, FR" == "Paris, Île-de-France,
+               France (Hybrid)").
+• `desc_fp`  – 64-bit SimHash of the description (16-hex string) that tells
+               apart two different openings sharing company/title/location.
+
+Two postings are the same job when their keys are equal and their
+fingerprints are within FP_MAX_DISTANCE bits (or one has no description).
+`IdentityIndex` answers that for thousands of candidates in one batch:
+a dict lookup per key, then a vectorised Hamming check on the few
+fingerprints stored under it.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+FP_MAX_DISTANCE = 12            # of 64 bits
+_FP_SHINGLE = 3
+
+_COMPANY_SUFFIXES = re.compile(
+    r"\b(inc|ltd|llc|gmbh|ag|sa|sas|sarl|bv|nv|plc|corp|corporation|co|group|limited)\b\.?"
+)
+_GENDER_TAGS = re.compile(r"\((?:m|f|w|h|d|x)(?:\s*/\s*(?:m|f|w|h|d|x))+\)|\b[mfwhdx](?:/[mfwhdx])+\b")
+_WORK_MODE = re.compile(r"\((?:hybrid|remote|on-?site|hybride|télétravail)\)", re.I)
+
+
+# --------------------------------------------------------------------- #
+#  normalisation
+# --------------------------------------------------------------------- #
+def _fold(text) -> str:
+    """Lower-case, strip accents, non-strings → ''."""
+    text = text if isinstance(text, str) else ""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def normalize_text(text) -> str:
+    text = re.sub(r"[^\w\s]", " ", _fold(text))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def normalize_title(title) -> str:
+    return normalize_text(_GENDER_TAGS.sub(" ", _fold(title)))
+
+
+def normalize_company(company) -> str:
+    return normalize_text(_COMPANY_SUFFIXES.sub(" ", normalize_text(company)))
+
+
+def normalize_location(location) -> str:
+    """City (first comma-separated part) without work-mode suffixes."""
+    loc = _WORK_MODE.sub(" ", _fold(location))
+    return normalize_text(loc.split(",")[0])
+
+
+# --------------------------------------------------------------------- #
+#  keys & fingerprints
+# --------------------------------------------------------------------- #
+def job_key(title, company, location) -> str:
+    raw = "|".join((normalize_company(company), normalize_title(title), normalize_location(location)))
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def fingerprint(description) -> str | None:
+    """64-bit SimHash over word 3-grams as 16-hex, None when there is no text."""
+    words = normalize_text(description).split()
+    if not words:
+        return None
+    grams = {" ".join(words[i:i + _FP_SHINGLE]) for i in range(max(1, len(words) - _FP_SHINGLE + 1))}
+    h = np.array(
+        [int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "little") for g in grams],
+        dtype=np.uint64,
+    )
+    bits = (h[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = (2 * bits.astype(np.int64) - 1).sum(axis=0)
+    value = int(((votes > 0).astype(np.uint64) << np.arange(64, dtype=np.uint64)).sum())
+    return f"{value:016x}"
+
+
+def hamming(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def add_identity(df: pd.DataFrame) -> pd.DataFrame:
+    """Add `job_key` and `desc_fp` columns to a scraped batch."""
+    if df.empty:
+        return df
+    df = df.copy()
+    df["job_key"] = [
+        job_key(t, c, l) for t, c, l in zip(df["title"], df["company"], df["location"])
+    ]
+    df["desc_fp"] = [fingerprint(d) for d in df.get("description", pd.Series([None] * len(df)))]
+    return df
+
+
+# --------------------------------------------------------------------- #
+#  batch resolver
+# --------------------------------------------------------------------- #
+class IdentityIndex:
+    """In-memory job_key → fingerprints map for batch "seen before?" checks."""
+
+    def __init__(self, items: Iterable[tuple[str, str | None]] = ()):
+        self._fps: dict[str, list[int]] = {}
+        self._bare: set[str] = set()            # keys stored without a description
+        for key, fp in items:
+            self.add(key, fp)
+
+    def __len__(self) -> int:
+        return len(self._fps) + len(self._bare - self._fps.keys())
+
+    def add(self, key: str | None, fp: str | None) -> None:
+        if not key:
+            return
+        if fp:
+            self._fps.setdefault(key, []).append(int(fp, 16))
+        else:
+            self._bare.add(key)
+
+    def contains(self, key: str | None, fp: str | None) -> bool:
+        return bool(self.contains_many([key], [fp])[0])
+
+    def contains_many(self, keys: list[str | None], fps: list[str | None]) -> np.ndarray:
+        """bool[n]: is candidate i the same job as something in the index?"""
+        out = np.zeros(len(keys), dtype=bool)
+        for i, (key, fp) in enumerate(zip(keys, fps)):
+            if not key:
+                continue
+            stored = self._fps.get(key)
+            if key in self._bare or (stored and not fp):
+                out[i] = True
+            elif stored:
+                diff = np.array(stored, dtype=np.uint64) ^ np.uint64(int(fp, 16))
+                dist = np.unpackbits(diff.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+                out[i] = bool((dist <= FP_MAX_DISTANCE).any())
+        return out
@@ -7,6 +7,7 @@ generates tailored CV / cover-letters.
 from __future__ import annotations
 
 import os
+import uuid
 from typing import List, Dict
 
 import pandas as pd
@@ -14,147 +15,552 @@ from scrapers.registry import REGISTRY
 from modules.utils import (
     sanitize_filename,
     score_job_match,
+    score_stamp,
     extract_keywords,
 )
-from modules.cv_generator import insert_keywords_into_doc, convert_to_pdf_libreoffice
+from modules.local_scorer import score_batch, score_profiles
+from modules.model_routing import route
+from modules.llm_metrics import METRICS
+from modules.dedup import get_index as get_dedup_index
+from modules.job_identity import add_identity, normalize_company
+from modules import job_archive, scrape_cache
+from modules.scraper_pool import POOL as SCRAPERS
+from modules.cv_generator import render_cv
+from modules import artifact_store
 from modules.cl_generator import generate_cover_letter, save_to_pdf
-from config.profile_loader import load_profile
-from modules.history_tracker import has_already_applied
+from modules.history_tracker import filter_applied
+from config.profile_loader import use_profile, active_profile, profile_home, profile_field, load_profile
 
-PROFILE = load_profile()
 BASE_CV_PATH_EN = "assets/templates/template_cv.docx"
 RESULTS_FOLDER = "results"
 
-# keep one scraper instance per platform
-_SCRAPER_CACHE: dict[str, object] = {}
-
 
 # --------------------------------------------------------------------------- #
 def _ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Guarantee columns later code expects."""
-    for col in ("description", "emails", "easy_apply"):
+    for col in ("description", "emails"):
         if col not in df.columns:
             df[col] = None
+    if "easy_apply" not in df.columns:
+        df["easy_apply"] = False
     return df
 
 
 # --------------------------------------------------------------------------- #
-def search_and_process_jobs(
+def _emit(progress, event: str, **data) -> None:
+    if progress is not None:
+        progress(event, **data)
+
+
+# --------------------------------------------------------------------------- #
+#  STAGE 1 – scrape (or reuse a cached batch)
+# --------------------------------------------------------------------------- #
+def scrape_postings(
     platform: str,
     search_term: str,
     location: str,
     hours_old: int,
     results_wanted: int = 10,
-    score_threshold: int = 7,
-    generate_cv: bool = True,
-    generate_cl: bool = True,
-    headless: bool = False,         ## -----------------> HEADLESS OPTION INSTATIATED HERE (FALSE for now)
-    debug: bool = False,
+    headless: bool = False,
     ea_application: bool = False,
-) -> List[Dict]:
+    use_cache: bool = True,
+) -> pd.DataFrame:
     """
-    1. Scrape the specified platform via its Playwright scraper.
-    2. Score each description with `score_job_match`.
-    3. For matches, generate customised CV / cover letters (if selceted in Dashboard) and return a summary.
+    Raw batch for one platform / keyword / location (see `modules.scrape_cache`).
+    The scraper is leased from `modules.scraper_pool` for the duration of the scrape.
     """
-    os.makedirs(RESULTS_FOLDER, exist_ok=True)
-
-    ScraperCls = REGISTRY.get(platform.lower())
-    if ScraperCls is None:
+    if platform.lower() not in REGISTRY:
         raise ValueError(f"No scraper registered for platform '{platform}'")
 
-    scraper = _SCRAPER_CACHE.get(platform.lower())
-    if scraper is None:
-        scraper = ScraperCls(headless=headless)
-        _SCRAPER_CACHE[platform.lower()] = scraper
-        
+    cache_args = (platform, search_term, location, hours_old, ea_application)
+    if use_cache:
+        cached = scrape_cache.get(*cache_args, limit=results_wanted)
+        if cached is not None:
+            print(f"Using cached {platform} results for '{search_term}' in '{location}'")
+            return cached
+
     scrape_kwargs = {
         "keyword": search_term,
         "location": location,
         "limit": results_wanted,
         "hours_old": hours_old,
     }
-    
+
     if platform == "linkedin":
         scrape_kwargs["ea_application"] = ea_application
 
-    # -------------- SCRAPE -----------------
-    try:
+    with SCRAPERS.lease(platform, headless=headless) as scraper, METRICS.stage("scrape", platform=platform):
         jobs_df = scraper.scrape(**scrape_kwargs)
+
+    if use_cache and not jobs_df.empty:
+        scrape_cache.put(jobs_df, *cache_args, limit=results_wanted)
+    return jobs_df
+
+
+# --------------------------------------------------------------------------- #
+#  STAGE 2 – identity, archive, applied filter, near-duplicates
+# --------------------------------------------------------------------------- #
+def prepare_postings(
+    jobs_df: pd.DataFrame,
+    platform: str,
+    search_term: str,
+    dedup: bool = True,
+) -> pd.DataFrame:
+    """Postings still worth scoring in this run."""
+    if jobs_df.empty:
+        return jobs_df
+    jobs_df = add_identity(_ensure_columns(jobs_df))
+
+    # ---------------- ARCHIVE (every posting, matched or not) ------------------
+    try:
+        job_archive.ingest(jobs_df, platform=REGISTRY[platform.lower()].platform, keyword=search_term)
     except Exception as exc:
-        print(f"{platform} scrape failed: {exc}")
-        return []
+        print(f"⚠️ Archive ingest failed: {exc}")
+
+    # ---------------- ALREADY APPLIED (one history read) ------------------
+    applied = filter_applied(jobs_df["job_url"], jobs_df["job_key"], jobs_df["desc_fp"])
+    if applied:
+        print(f"Skipping {len(applied)} job(s) already applied to")
+        jobs_df = jobs_df[~jobs_df["job_url"].isin(applied)].reset_index(drop=True)
 
+    # ---------------- NEAR-DUPLICATES ------------------
+    if dedup and not jobs_df.empty:
+        run_id = METRICS.current_run() or uuid.uuid4().hex
+        with METRICS.stage("dedup"):
+            jobs_df = get_dedup_index().collapse(jobs_df, run_id=run_id, stamp=score_stamp())
+    return jobs_df
+
+
+# --------------------------------------------------------------------------- #
+#  STAGE 3 – score, then generate documents for the matches
+# --------------------------------------------------------------------------- #
+def iter_scores(
+    jobs_df: pd.DataFrame,
+    prefilter: int = 0,
+    debug: bool = False,
+    dedup: bool = True,
+    progress=None,
+    journal=None,
+):
+    """
+    Yield (row, description, score, reasoning, llm_prompt) for every posting
+    that gets a score; rows stopped by the local `prefilter` are skipped.
+    Scores are stored (dedup index, `journal`) with `score_stamp()`, except
+    local fallbacks for a failed LLM call – those are asked again next time.
+    """
     if jobs_df.empty:
-        print(f"⚠️ No jobs for '{search_term}' in '{location}'")
-        return []
+        return
+    stamp = score_stamp()
+
+    descriptions = [d if isinstance(d, str) else "" for d in jobs_df["description"]]
+
+    # ---------------- LOCAL SCORING (whole batch at once) ------------------
+    local_mode = route("score").backend == "local"
+    local_scores = local_reasons = None
+    if (local_mode or prefilter > 0) and "local_score" in jobs_df.columns:
+        # precomputed for every profile of a multi-profile run
+        local_scores, local_reasons = jobs_df["local_score"].to_numpy(), list(jobs_df["local_reason"])
+    elif local_mode or prefilter > 0:
+        local_scores, local_reasons = score_batch(descriptions)
+
+    for i, row in enumerate(jobs_df.itertuples(index=False)):
+        desc: str = descriptions[i]
+        prior = getattr(row, "prior_score", None)
+        fell_back = False
+        if local_mode:
+            score, reasoning, llm_prompt = int(local_scores[i]), local_reasons[i], ""
+        elif prior is not None and not pd.isna(prior):
+            # same posting was scored in an earlier run (or attempt), with the same stamp
+            score, reasoning, llm_prompt = int(prior), row.prior_reasoning, ""
+        elif local_scores is not None and local_scores[i] < prefilter:
+            _emit(progress, "scored", title=row.title, company=row.company, score=int(local_scores[i]))
+            continue
+        else:
+            score, reasoning, llm_prompt, fell_back = score_job_match(desc, debug=debug)
+            if dedup and not fell_back:
+                get_dedup_index().record_score(row.canonical_id, score, reasoning, stamp)
+        if journal is not None and not fell_back:
+            journal.record_score(row.job_key, score, reasoning, stamp)
+        _emit(progress, "scored", title=row.title, company=row.company, score=score)
+        yield row, desc, score, reasoning, llm_prompt
+
 
-    jobs_df = _ensure_columns(jobs_df)
+def process_postings(
+    jobs_df: pd.DataFrame,
+    platform: str,
+    score_threshold: int = 7,
+    generate_cv: bool = True,
+    generate_cl: bool = True,
+    debug: bool = False,
+    ea_application: bool = False,
+    prefilter: int = 0,
+    dedup: bool = True,
+    progress=None,
+    journal=None,
+    defer_generation: bool = False,
+) -> List[Dict]:
+    """
+    Score every posting and build CV / CL for those above `score_threshold`.
+    With a `journal` (`modules.run_journal`) scores and matches are
+    checkpointed, and ones journaled by an earlier attempt are reused.
 
+    With `defer_generation` nothing is generated: postings above the
+    threshold come back as shortlist entries (`shortlist_entry()`) for
+    `select_top()` / `generate_shortlisted()` once the whole run is scored.
+    """
+    if jobs_df.empty:
+        return []
+    platform_name = REGISTRY[platform.lower()].platform
     matched: List[Dict] = []
+    if journal is not None:
+        jobs_df = journal.apply_scores(jobs_df, score_stamp())
 
     # ---------------- MATCH / GENERATE ------------------
-    for row in jobs_df.itertuples(index=False):
-        desc: str = getattr(row, "description") or ""
-        score, reasoning, llm_prompt = score_job_match(desc, debug=debug)
+    for row, desc, score, reasoning, llm_prompt in iter_scores(
+        jobs_df, prefilter=prefilter, debug=debug, dedup=dedup, progress=progress, journal=journal
+    ):
         if score < score_threshold:
             continue
 
+        match = journal.match(row.job_key) if journal is not None else None
+        if match is not None:
+            matched.append(match)
+            _emit(progress, "generated", match=match)
+            continue
+        if defer_generation:
+            entry = shortlist_entry(row, score, reasoning, llm_prompt, platform_name)
+            if journal is not None:
+                journal.record_match(entry)
+            matched.append(entry)
+            _emit(progress, "shortlisted", title=row.title, company=row.company, score=score)
+            continue
+        try:
+            match = generate_documents(row, desc, score, reasoning, llm_prompt, platform_name,
+                                       generate_cv, generate_cl, debug, ea_application)
+        except Exception as exc:
+            print(f"⚠️ Document generation failed for {row.title} @ {row.company}: {exc}")
+            _emit(progress, "failed", stage="generate", title=row.title, company=row.company, error=str(exc))
+            continue
+        if journal is not None:
+            journal.record_match(match)
+        matched.append(match)
+        _emit(progress, "generated", match=match)
+
+    return matched
+
+
+def generate_documents(row, desc, score, reasoning, llm_prompt, platform_name,
+                       generate_cv, generate_cl, debug, ea_application) -> Dict:
+    """Job folder, description, CV and CL for one scored posting; returns the match dict."""
+    cv_template = profile_field("cv_template", BASE_CV_PATH_EN)
+    keywords = extract_keywords(desc, debug=debug)
+    # one folder per posting (same title/company at two places don't collide),
+    # under the active profile's results directory
+    folder = os.path.join(
+        str(profile_home()), sanitize_filename(f"{row.title}_{row.company}_{row.job_key[:8]}")
+    )
+    os.makedirs(folder, exist_ok=True)
+    artifact_store.annotate(
+        folder, title=row.title, company=row.company, location=row.location,
+        url=row.job_url, job_key=row.job_key, platform=platform_name,
+    )
+
+    easy_apply = ea_application
+
+    # ---------- dump description ----------------
+    desc_file = os.path.join(folder, "description.txt")
+    with open(desc_file, "w", encoding="utf-8") as fp:
+        fp.write(desc)
+    # -------------------------------------------------
 
-        cv_template = BASE_CV_PATH_EN
-        keywords = extract_keywords(desc, debug=debug)
-        folder = os.path.join(
-            RESULTS_FOLDER, sanitize_filename(f"{row.title}_{row.company}")
+    # -------- CV -------
+    if generate_cv:
+        with METRICS.stage("cv_render"):
+            render_cv(cv_template, keywords, folder)
+
+    # -------- CL -------
+    if generate_cl:
+        cl_text = generate_cover_letter(
+            row.title,
+            row.company,
+            row.location,
         )
-        os.makedirs(folder, exist_ok=True)
-		
-        easy_apply = ea_application
-	
-        # ---------- dump description ----------------
-        desc_file = os.path.join(folder, "description.txt")
-        with open(desc_file, "w", encoding="utf-8") as fp:
-            fp.write(desc)
-        # -------------------------------------------------
-        
-        # -------- CV -------
-        if generate_cv:
-            cv_docx = os.path.join(folder, "CV_Custom.docx")
-            insert_keywords_into_doc(cv_template, keywords, cv_docx)
-            convert_to_pdf_libreoffice(cv_docx, folder)
-
-        # -------- CL -------
-        if generate_cl:
-            cl_text = generate_cover_letter(
-                row.title,
-                row.company,
-                row.location,
+        if cl_text is not None:
+            with METRICS.stage("cl_render"):
+                save_to_pdf(row._asdict(), cl_text, folder)
+
+    return match_record(row, folder, score, reasoning, llm_prompt, platform_name, debug, easy_apply)
+
+
+def match_record(row, folder, score, reasoning, llm_prompt, platform_name, debug, easy_apply) -> Dict:
+    """The match dict of a scored posting; `folder` None = no documents generated."""
+    return {
+        "title": row.title,
+        "company": row.company,
+        "location": row.location,
+        "folder": folder,
+        "score": score,
+        "platform": platform_name,
+        "email": (
+            row.emails[0]
+            if isinstance(row.emails, list) and row.emails
+            else None
+        ),
+        "easy_apply": easy_apply,
+        "llm_reasoning": reasoning,
+        "llm_prompt": llm_prompt,
+        "show_reasoning": debug,
+        "url": row.job_url,
+        "source_urls": getattr(row, "source_urls", None) or [row.job_url],
+        "job_key": row.job_key,
+        "desc_fp": row.desc_fp,
+        "profile": active_profile(),
+    }
+
+
+# --------------------------------------------------------------------------- #
+def search_and_process_jobs(
+    platform: str,
+    search_term: str,
+    location: str,
+    hours_old: int,
+    results_wanted: int = 10,
+    score_threshold: int = 7,
+    generate_cv: bool = True,
+    generate_cl: bool = True,
+    headless: bool = False,         ## -----------------> HEADLESS OPTION INSTATIATED HERE (FALSE for now)
+    debug: bool = False,
+    ea_application: bool = False,
+    prefilter: int = 0,
+    dedup: bool = True,
+    use_cache: bool = True,
+    progress=None,
+    journal=None,
+    profiles=None,
+    defer_generation: bool = False,
+) -> List[Dict]:
+    """
+    1. Scrape the specified platform via its Playwright scraper – or reuse
+       the batch from `modules.scrape_cache` when `use_cache` and it is fresh.
+    2. Score each description with `score_job_match` (or, with
+       scoring routed to "local", with the batched local scorer). When `prefilter`
+       > 0, jobs whose local score is below it never reach the LLM.
+       With `dedup`, near-duplicate postings are collapsed first (see
+       `modules.dedup`); reposts from earlier runs reuse their old score.
+    3. For matches, generate customised CV / cover letters (if selceted in Dashboard) and return a summary.
+
+    `progress(event, **data)` is called with "scraped" (n), "scored"
+    (title, company, score), "generated" (match) and "failed" (stage, error).
+
+    With a `journal` the grid cell is checkpointed: its prepared batch,
+    every score and every match. The cell is only marked finished when
+    nothing in it failed, so a resumed run retries exactly the rest.
+
+    `profiles` (names in config/profiles/) turns on multi-profile mode: the
+    batch is scraped once, then filtered (history, duplicates), scored and
+    turned into documents per profile, each in its own results directory
+    (`config.profile_loader.use_profile`). Local scores for all profiles
+    are computed in one pass over the batch.
+
+    With `defer_generation` step 3 is left out and the shortlist entries
+    are returned instead (see `process_postings`).
+    """
+    os.makedirs(RESULTS_FOLDER, exist_ok=True)
+
+    if platform.lower() not in REGISTRY:
+        raise ValueError(f"No scraper registered for platform '{platform}'")
+
+    profiles = list(profiles) if profiles else [None]
+    raw = None                      # scraped once, shared by every profile
+    local = {}                      # profile → precomputed local (scores, reasons) of `raw`
+    matched: List[Dict] = []
+
+    for profile in profiles:
+        with use_profile(profile):
+            unit = (platform, location, search_term) + ((profile,) if profile else ())
+
+            done = journal.unit_matches(unit) if journal is not None else None
+            if done is not None:                    # finished before the run was resumed
+                for match in done:
+                    if match.get("deferred"):
+                        _emit(progress, "shortlisted", title=match["title"],
+                              company=match["company"], score=match["score"])
+                    else:
+                        _emit(progress, "generated", match=match)
+                matched.extend(done)
+                continue
+
+            jobs_df = journal.batch(unit) if journal is not None else None
+
+            # -------------- SCRAPE -----------------
+            if jobs_df is None:
+                if raw is None:
+                    try:
+                        raw = scrape_postings(
+                            platform, search_term, location, hours_old, results_wanted,
+                            headless=headless, ea_application=ea_application, use_cache=use_cache,
+                        )
+                    except Exception as exc:
+                        print(f"{platform} scrape failed: {exc}")
+                        _emit(progress, "failed", stage="scrape", platform=platform, error=str(exc))
+                        return matched
+                    if len(profiles) > 1 and not raw.empty:
+                        local = _local_scores_by_profile(raw, profiles, prefilter)
+                jobs_df = raw
+                if profile in local:
+                    jobs_df = raw.assign(local_score=local[profile][0], local_reason=local[profile][1])
+                if not jobs_df.empty:
+                    jobs_df = prepare_postings(jobs_df, platform, search_term, dedup=dedup)
+                if journal is not None:
+                    journal.save_batch(unit, jobs_df)
+            else:
+                print(f"Resuming '{search_term}' in '{location}' on {platform} from its checkpoint")
+
+            _emit(progress, "scraped", n=len(jobs_df), profile=profile)
+            if jobs_df.empty:
+                print(f"⚠️ Nothing new to score for '{search_term}' in '{location}'")
+                if journal is not None:
+                    journal.finish_unit(unit, [])
+                continue
+
+            failures = []
+
+            def track(event, **data):
+                if event == "failed":
+                    failures.append(data)
+                _emit(progress, event, **data)
+
+            found = process_postings(
+                jobs_df, platform,
+                score_threshold=score_threshold,
+                generate_cv=generate_cv,
+                generate_cl=generate_cl,
+                debug=debug,
+                ea_application=ea_application,
+                prefilter=prefilter,
+                dedup=dedup,
+                progress=track,
+                journal=journal,
+                defer_generation=defer_generation,
             )
-            save_to_pdf(row._asdict(), cl_text, folder)
+            if journal is not None and not failures:
+                journal.finish_unit(unit, found)
+            matched.extend(found)
+    return matched
+
+
+def _local_scores_by_profile(raw: pd.DataFrame, profiles: list, prefilter: int) -> dict:
+    """
+    Local scores of one scraped batch for every profile that uses them
+    (local scoring or the pre-filter), computed together; {} if none does.
+    """
+    wanted = {}
+    for profile in profiles:
+        with use_profile(profile):
+            if prefilter > 0 or route("score").backend == "local":
+                wanted[profile] = load_profile() or {}
+    if not wanted:
+        return {}
+    descriptions = [d if isinstance(d, str) else "" for d in raw["description"]]
+    with METRICS.stage("local_score"):
+        return score_profiles(descriptions, wanted)
 
-        if has_already_applied(row.job_url):
-            print(f"Skipping {row.job_url} — already applied")
+
+# --------------------------------------------------------------------------- #
+#  STAGE 4 – budgeted generation (CV / CL for the best matches of a whole run)
+# --------------------------------------------------------------------------- #
+def shortlist_entry(row, score, reasoning, llm_prompt, platform_name) -> Dict:
+    """A scored match whose documents are not generated yet (JSON-serialisable)."""
+    return {
+        "deferred": True,
+        "title": row.title,
+        "company": row.company,
+        "location": row.location,
+        "score": score,
+        "platform": platform_name,
+        "url": row.job_url,
+        "job_key": row.job_key,
+        "profile": active_profile(),
+        "llm_reasoning": reasoning,
+        "llm_prompt": llm_prompt,
+        "row": {k: (None if not isinstance(v, list) and pd.isna(v) else v)
+                for k, v in row._asdict().items()},
+    }
+
+
+def select_top(entries: List[Dict], max_documents: int = 0, max_per_company: int = 0) -> List[Dict]:
+    """
+    The best `max_documents` entries per profile (0 = no limit), at most
+    `max_per_company` of them (0 = no cap) for one company. Highest score
+    first; ties keep the order the run found them in.
+    """
+    ranked = sorted(entries, key=lambda e: -e["score"])
+    chosen: List[Dict] = []
+    taken: dict = {}                # profile → number selected
+    per_company: dict = {}          # (profile, company) → number selected
+    seen = set()
+    for entry in ranked:
+        profile = entry.get("profile")
+        key = (profile, entry["job_key"])
+        company = (profile, normalize_company(entry["company"]))
+        if key in seen:
             continue
-        
-        matched.append(
-            {
-                "title": row.title,
-                "company": row.company,
-                "location": row.location,
-                "folder": folder,
-                "score": score,
-                "platform": ScraperCls.platform,
-                "email": (
-                    row.emails[0]
-                    if isinstance(row.emails, list) and row.emails
-                    else None
-                ),
-                "easy_apply": easy_apply,
-                "llm_reasoning": reasoning,
-                "llm_prompt": llm_prompt,
-                "show_reasoning": debug,
-                "url": row.job_url,
-            }
-        )
+        if max_documents and taken.get(profile, 0) >= max_documents:
+            continue
+        if max_per_company and per_company.get(company, 0) >= max_per_company:
+            continue
+        seen.add(key)
+        taken[profile] = taken.get(profile, 0) + 1
+        per_company[company] = per_company.get(company, 0) + 1
+        chosen.append(entry)
+    return chosen
+
 
+def generate_shortlisted(
+    entries: List[Dict],
+    generate_cv: bool = True,
+    generate_cl: bool = True,
+    debug: bool = False,
+    ea_application: bool = False,
+    progress=None,
+    journal=None,
+) -> List[Dict]:
+    """
+    Generate the documents of selected shortlist entries; returns the
+    matches (entries generated by an earlier attempt are passed through).
+    """
+    matched: List[Dict] = []
+    for entry in entries:
+        if not entry.get("deferred"):
+            matched.append(entry)
+            continue
+        row = next(pd.DataFrame([entry["row"]]).itertuples(index=False))
+        desc = row.description if isinstance(row.description, str) else ""
+        with use_profile(entry.get("profile")):
+            try:
+                match = generate_documents(
+                    row, desc, entry["score"], entry["llm_reasoning"], entry["llm_prompt"],
+                    entry["platform"], generate_cv, generate_cl, debug, ea_application,
+                )
+            except Exception as exc:
+                print(f"⚠️ Document generation failed for {row.title} @ {row.company}: {exc}")
+                _emit(progress, "failed", stage="generate", title=row.title, company=row.company, error=str(exc))
+                continue
+            if journal is not None:
+                journal.record_match(match)
+        matched.append(match)
+        _emit(progress, "generated", match=match)
     return matched
 
+
+def without_documents(entry: Dict, debug: bool = False, ea_application: bool = False) -> Dict:
+    """
+    A shortlist entry left out by `select_top()` as a match: same fields
+    as a generated one, with `folder` None and `deferred` kept True.
+    """
+    row = next(pd.DataFrame([entry["row"]]).itertuples(index=False))
+    with use_profile(entry.get("profile")):
+        match = match_record(row, None, entry["score"], entry["llm_reasoning"], entry["llm_prompt"],
+                             entry["platform"], debug, ea_application)
+    match["deferred"] = True
+    return match
@@ -0,0 +1,266 @@
+# ------------------ modules/llm_limits.py ------------------
+"""
+Rate limiting, retries and circuit breaking for the LLM back-ends.
+
+• One `BackendGuard` per backend (shared by every thread of the process):
+  a token bucket for request pacing plus a circuit breaker.
+• The bucket adapts: OpenAI's x-ratelimit-* headers set the rate and pause
+  it until the reset when the quota is used up; a 429 / retry-after halves
+  the rate and blocks everyone until the hint has elapsed; successes grow
+  it back towards the ceiling.
+• `retrying(backend)` wraps a call with tenacity: jittered exponential
+  backoff (or the server's retry-after), retryable errors only.
+• After `fail_threshold` consecutive retryable failures (the backend is
+  down or overloaded – not a 400 / "model not found" of one task) the
+  breaker opens and calls fail fast with `BackendUnavailable` until
+  `cooldown_s` has passed.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+
+from tenacity import (
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+log = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class BackendUnavailable(RuntimeError):
+    """Raised while a backend's circuit breaker is open."""
+
+
+# --------------------------------------------------------------------- #
+#  Token bucket
+# --------------------------------------------------------------------- #
+class TokenBucket:
+    """Blocking token bucket whose rate can be re-tuned at runtime."""
+
+    def __init__(self, rate_per_min: float, *, burst: int | None = None):
+        self.ceiling = float(rate_per_min)          # never go above this
+        self.rate = float(rate_per_min) / 60.0      # tokens per second
+        self.capacity = float(burst or max(1, int(rate_per_min // 60) or 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, cost: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                wait = max(
+                    self._blocked_until - now,
+                    (cost - self._tokens) / self.rate if self.rate > 0 else 1.0,
+                )
+            time.sleep(min(max(wait, 0.01), 5.0))
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for `seconds` (retry-after, exhausted quota)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def throttle(self, factor: float = 0.5) -> None:
+        with self._lock:
+            self.rate = max(self.rate * factor, 1 / 60.0)
+
+    def relax(self, step_per_min: float = 1.0) -> None:
+        with self._lock:
+            self.rate = min(self.rate + step_per_min / 60.0, self.ceiling / 60.0)
+
+    def update_from_headers(self, headers) -> None:
+        """Follow OpenAI-style x-ratelimit-* headers (requests and tokens)."""
+        if not headers:
+            return
+        limit = _int(headers.get("x-ratelimit-limit-requests"))
+        if limit:
+            with self._lock:
+                self.ceiling = float(limit)
+                self.rate = min(self.rate, limit / 60.0) if self.rate else limit / 60.0
+        for kind in ("requests", "tokens"):
+            remaining = _int(headers.get(f"x-ratelimit-remaining-{kind}"))
+            if remaining is not None and remaining <= 1:
+                self.pause(parse_duration(headers.get(f"x-ratelimit-reset-{kind}")) or 1.0)
+
+
+# --------------------------------------------------------------------- #
+#  Circuit breaker
+# --------------------------------------------------------------------- #
+class CircuitBreaker:
+    """closed → open after N consecutive failures → half-open after cooldown."""
+
+    def __init__(self, fail_threshold: int = 5, cooldown_s: float = 30.0):
+        self.fail_threshold = fail_threshold
+        self.cooldown_s = cooldown_s
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.cooldown_s:
+                return "half-open"
+            return "open"
+
+    def check(self, backend: str) -> None:
+        if self.state == "open":
+            raise BackendUnavailable(
+                f"{backend} circuit open after {self._failures} consecutive failures"
+            )
+
+    def success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.fail_threshold:
+                if self._opened_at is None:
+                    log.warning("LLM circuit opened after %d failures", self._failures)
+                self._opened_at = time.monotonic()
+
+
+# --------------------------------------------------------------------- #
+#  Per-backend guard
+# --------------------------------------------------------------------- #
+class BackendGuard:
+    def __init__(self, name: str, rate_per_min: float):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_min)
+        self.breaker = CircuitBreaker()
+
+    def before_call(self) -> None:
+        self.breaker.check(self.name)
+        self.bucket.acquire()
+
+    def on_success(self, headers=None) -> None:
+        self.breaker.success()
+        self.bucket.update_from_headers(headers)
+        self.bucket.relax()
+
+    def on_failure(self, exc: BaseException) -> None:
+        if not is_retryable(exc):         # a bad request says nothing about the backend's health
+            return
+        self.breaker.failure()
+        if _status(exc) == 429:
+            self.bucket.throttle()
+            self.bucket.pause(retry_after(exc) or 1.0)
+
+
+GUARDS: dict[str, BackendGuard] = {
+    "openai": BackendGuard("openai", float(os.getenv("OPENAI_RPM", "500"))),
+    "ollama": BackendGuard("ollama", float(os.getenv("OLLAMA_RPM", "600"))),
+}
+
+
+def guard_for(backend: str) -> BackendGuard:
+    return GUARDS.setdefault(backend, BackendGuard(backend, 600))
+
+
+# --------------------------------------------------------------------- #
+#  Retry policy
+# --------------------------------------------------------------------- #
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, BackendUnavailable):
+        return False
+    if _status(exc) in RETRYABLE_STATUS:
+        return True
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        import httpx
+        if isinstance(exc, (httpx.TimeoutException, httpx.TransportError)):
+            return True
+    except ImportError:
+        pass
+    # openai wraps transport errors in its own classes
+    return type(exc).__name__ in {"APITimeoutError", "APIConnectionError", "InternalServerError"}
+
+
+class _WaitRetryAfter:
+    """Use the server's retry-after hint when present, jittered backoff otherwise."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def __call__(self, retry_state) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        hint = retry_after(exc) if exc else None
+        return hint if hint is not None else self.fallback(retry_state)
+
+
+def retrying(backend: str, *, attempts: int = 5, max_wait_s: float = 30.0) -> Retrying:
+    """tenacity controller for one LLM call: `for attempt in retrying(b): with attempt: ...`"""
+    return Retrying(
+        stop=stop_after_attempt(attempts),
+        wait=_WaitRetryAfter(wait_random_exponential(multiplier=1, max=max_wait_s)),
+        retry=retry_if_exception(is_retryable),
+        before_sleep=lambda rs: log.warning(
+            "%s call failed (%s) – retry %d", backend, rs.outcome.exception(), rs.attempt_number
+        ),
+        reraise=True,
+    )
+
+
+# --------------------------------------------------------------------- #
+#  helpers
+# --------------------------------------------------------------------- #
+def _int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _status(exc: BaseException | None) -> int | None:
+    return getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def parse_duration(value) -> float | None:
+    """'20ms', '1s', '6m0s', '1h2m3.5s' or plain seconds → seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total, matched = 0.0, False
+    for num, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        matched = True
+        total += float(num) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total if matched else None
+
+
+def retry_after(exc: BaseException | None) -> float | None:
+    """Seconds to wait according to the error's retry-after(-ms) header."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms is not None:
+        return (_int(ms) or 0) / 1000.0
+    return parse_duration(headers.get("retry-after"))
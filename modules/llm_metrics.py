@@ -0,0 +1,178 @@
+# ------------------ modules/llm_metrics.py ------------------
+"""
+Per-call LLM accounting.
+
+Every `llm_chat` call ends up here as one `LLMCall` (backend, model, task,
+tokens, time-to-first-token, latency, cache status …). Calls are tagged
+with the current run id so a whole search can be summarised, and pipeline
+stages (scrape, generate …) can be timed next to them to see where the
+wall-clock time actually goes.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+# Ollama load_duration above this means the model was not resident (cold start)
+COLD_LOAD_S = 0.5
+
+_CURRENT_RUN: contextvars.ContextVar[str | None] = contextvars.ContextVar("llm_run_id", default=None)
+
+
+@dataclass(slots=True)
+class LLMCall:
+    """One LLM round-trip."""
+
+    backend: str
+    model: str
+    task: str | None
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    cached_tokens: int | None = None        # prompt tokens served from the backend's cache (OpenAI, measured)
+    cached_tokens_est: int | None = None    # Ollama: guessed from the previous prompt – not measured
+    ttft_s: float | None = None             # time to first token
+    latency_s: float = 0.0
+    load_s: float | None = None             # Ollama: model load time (cold start)
+    prompt_eval_s: float | None = None      # Ollama: prompt processing time
+    eval_s: float | None = None             # Ollama: generation time
+    estimated: bool = False                 # token counts estimated (stream cut early)
+    stopped_early: bool = False
+    error: str | None = None
+    run_id: str | None = None
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+
+    @property
+    def cache_hit(self) -> bool:
+        return bool(self.cached_tokens)
+
+
+class MetricsSink:
+    """Thread-safe in-memory store of LLM calls and stage timings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: list[LLMCall] = []
+        self._stages: list[dict] = []
+        self._runs: dict[str, dict] = {}
+
+    # ---------------- runs ----------------
+    @contextmanager
+    def run(self, run_id: str | None = None):
+        """Tag every call made inside the block with `run_id` (yielded)."""
+        run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        token = _CURRENT_RUN.set(run_id)
+        t0 = time.perf_counter()
+        with self._lock:
+            self._runs[run_id] = {"started": datetime.now().isoformat(timespec="seconds")}
+        try:
+            yield run_id
+        finally:
+            with self._lock:
+                self._runs[run_id]["wall_s"] = time.perf_counter() - t0
+            _CURRENT_RUN.reset(token)
+
+    @staticmethod
+    def current_run() -> str | None:
+        return _CURRENT_RUN.get()
+
+    # ---------------- recording ----------------
+    def record(self, call: LLMCall) -> LLMCall:
+        if call.run_id is None:
+            call.run_id = _CURRENT_RUN.get()
+        with self._lock:
+            self._calls.append(call)
+        return call
+
+    @contextmanager
+    def stage(self, name: str, **tags):
+        """Time a non-LLM pipeline stage (e.g. "scrape", "generate")."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._stages.append(
+                    {"stage": name, "seconds": time.perf_counter() - t0,
+                     "run_id": _CURRENT_RUN.get(), **tags}
+                )
+
+    # ---------------- querying ----------------
+    def query(self, **filters) -> list[LLMCall]:
+        """Calls whose attributes equal every given filter, e.g. query(task="score")."""
+        with self._lock:
+            calls = list(self._calls)
+        return [c for c in calls if all(getattr(c, k) == v for k, v in filters.items())]
+
+    def summary(self, run_id: str | None = None) -> dict:
+        """
+        Aggregate one run (or everything): per backend/model/task rows plus
+        stage totals and the run's wall-clock time.
+        """
+        calls = self.query(run_id=run_id) if run_id else self.query()
+        groups: dict[tuple, list[LLMCall]] = {}
+        for c in calls:
+            groups.setdefault((c.backend, c.model, c.task), []).append(c)
+
+        rows = []
+        for (backend, model, task), cs in sorted(groups.items(), key=lambda kv: str(kv[0])):
+            lat = sorted(c.latency_s for c in cs)
+            ttft = [c.ttft_s for c in cs if c.ttft_s is not None]
+            cold = [c for c in cs if (c.load_s or 0) > COLD_LOAD_S]
+            warm = [c.latency_s for c in cs if (c.load_s or 0) <= COLD_LOAD_S]
+            rows.append({
+                "backend": backend,
+                "model": model,
+                "task": task,
+                "calls": len(cs),
+                "errors": sum(c.error is not None for c in cs),
+                "prompt_tokens": sum(c.prompt_tokens or 0 for c in cs),
+                "completion_tokens": sum(c.completion_tokens or 0 for c in cs),
+                "cached_tokens": sum(c.cached_tokens or 0 for c in cs),
+                "cached_tokens_est": sum(c.cached_tokens_est or 0 for c in cs),
+                "cache_hits": sum(c.cache_hit for c in cs),
+                "stopped_early": sum(c.stopped_early for c in cs),
+                "total_latency_s": round(sum(lat), 3),
+                "mean_latency_s": round(sum(lat) / len(lat), 3),
+                "p95_latency_s": round(lat[min(len(lat) - 1, int(0.95 * len(lat)))], 3),
+                "mean_ttft_s": round(sum(ttft) / len(ttft), 3) if ttft else None,
+                "cold_starts": len(cold),
+                "mean_cold_latency_s": round(sum(c.latency_s for c in cold) / len(cold), 3) if cold else None,
+                "mean_warm_latency_s": round(sum(warm) / len(warm), 3) if warm else None,
+            })
+
+        with self._lock:
+            stages = [s for s in self._stages if run_id is None or s["run_id"] == run_id]
+            run_info = dict(self._runs.get(run_id, {})) if run_id else {}
+        stage_totals: dict[str, float] = {}
+        for s in stages:
+            stage_totals[s["stage"]] = stage_totals.get(s["stage"], 0.0) + s["seconds"]
+
+        return {
+            "run_id": run_id,
+            **run_info,
+            "llm_seconds": round(sum(r["total_latency_s"] for r in rows), 3),
+            "stage_seconds": {k: round(v, 3) for k, v in stage_totals.items()},
+            "by_task": rows,
+        }
+
+    def write_report(self, run_id: str, out_dir: str | Path) -> Path:
+        """Dump the run's calls (JSONL) and summary (JSON) into `out_dir`."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with open(out_dir / "llm_calls.jsonl", "w", encoding="utf-8") as fh:
+            for c in self.query(run_id=run_id):
+                fh.write(json.dumps(asdict(c)) + "\n")
+        summary_path = out_dir / "llm_summary.json"
+        summary_path.write_text(json.dumps(self.summary(run_id), indent=2), encoding="utf-8")
+        return summary_path
+
+
+# process-wide sink used by `llm_chat`
+METRICS = MetricsSink()
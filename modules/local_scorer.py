@@ -0,0 +1,180 @@
+# ------------------ modules/local_scorer.py ------------------
+"""
+Deterministic relevance scorer that needs no LLM at all.
+
+BM25-weighted overlap between the profile (skills, experience bullets,
+background, objective) and each job description, computed with NumPy over
+the whole batch and mapped onto the same 0-10 scale as `score_job_match`.
+`score_profiles()` scores one batch for several candidate profiles at once.
+
+IDF is left out on purpose: it would make a posting's score depend on what
+else was scraped with it, while the 0-10 scale is compared against a fixed
+threshold. The document-length normalisation uses a fixed reference length
+for the same reason.
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+import numpy as np
+
+from config.profile_loader import load_profile
+
+# BM25 knobs
+K1 = 1.2
+B = 0.75
+REF_DOC_LEN = 350           # tokens in a "typical" posting
+
+# weighted coverage (0-1) that already counts as a perfect 10
+FULL_MATCH = 0.35
+
+# profile field → weight of each of its terms
+FIELD_WEIGHTS = {
+    "skills": 2.0,
+    "experience_bullets": 1.0,
+    "background": 0.5,
+    "objective": 0.5,
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can
+could did do does doing for from had has have having he her here his how i if in
+into is it its itself just me more most my no nor not now of off on once only or
+other our out over own per same she should so some such than that the their them
+then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours
+la le les de des du et en un une pour avec dans sur au aux par ou der die das und
+mit für von zu im
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word tokens, stop-words and 1-char tokens removed."""
+    return [
+        t for t in _TOKEN_RE.findall((text or "").lower())
+        if len(t) > 1 and t not in _STOPWORDS
+    ]
+
+
+def _profile_terms(profile: dict) -> tuple[list[str], np.ndarray, list[str], list[list[int]]]:
+    """
+    Returns (terms, weights, skills, skill_term_idx):
+    one weight per distinct term (max over the fields it appears in), plus
+    the term indices of every skill for the reasoning string.
+    """
+    weights: dict[str, float] = {}
+    for field, w in FIELD_WEIGHTS.items():
+        value = profile.get(field) or []
+        chunks = [value] if isinstance(value, str) else value
+        for chunk in chunks:
+            for t in tokenize(chunk):
+                weights[t] = max(weights.get(t, 0.0), w)
+
+    terms = list(weights)
+    index = {t: i for i, t in enumerate(terms)}
+    skills = [s for s in profile.get("skills", []) if tokenize(s)]
+    skill_idx = [[index[t] for t in dict.fromkeys(tokenize(s))] for s in skills]
+    return terms, np.array([weights[t] for t in terms], dtype=np.float32), skills, skill_idx
+
+
+def _term_matrix(docs: list[list[str]], index: dict[str, int]) -> tuple[np.ndarray, np.ndarray]:
+    """(tf[n_docs, n_terms], doc_len[n_docs]) of tokenized docs, restricted to the indexed terms."""
+    rows, lengths = [], []
+    n_terms = len(index)
+    for toks in docs:
+        lengths.append(len(toks))
+        hits = [index[t] for t in toks if t in index]
+        rows.append(np.bincount(hits, minlength=n_terms) if hits else np.zeros(n_terms, dtype=np.int64))
+    if not rows:
+        return np.zeros((0, n_terms), dtype=np.float32), np.zeros(0, dtype=np.float32)
+    return np.vstack(rows).astype(np.float32), np.array(lengths, dtype=np.float32)
+
+
+def _score(tf: np.ndarray, doc_len: np.ndarray, weights: np.ndarray,
+           skills: list[str], skill_idx: list[list[int]]) -> tuple[np.ndarray, list[str]]:
+    """Scores + reasoning from a tf matrix whose columns are the profile's terms."""
+    # BM25 saturation, length-normalised against a fixed reference length
+    norm = K1 * (1 - B + B * doc_len[:, None] / REF_DOC_LEN)
+    sat = tf * (K1 + 1) / (tf + norm)                       # [n_docs, n_terms]
+    coverage = (sat @ weights) / (weights.sum() * (K1 + 1))  # 0-1
+
+    scores = np.rint(10 * np.clip(coverage / FULL_MATCH, 0, 1)).astype(np.int64)
+
+    # human-readable reasoning: which skills are (mostly) present
+    present = tf > 0
+    reasons = []
+    for d in range(len(scores)):
+        hit = [
+            s for s, idx in zip(skills, skill_idx)
+            if present[d, idx].mean() >= 0.5
+        ]
+        reasons.append(
+            f"{scores[d]} – Local BM25 match"
+            + (f" on skills: {', '.join(hit)}." if hit else ", no profile skill found.")
+        )
+    return scores, reasons
+
+
+def score_batch(
+    descriptions: list[str],
+    profile: dict | None = None,
+) -> tuple[np.ndarray, list[str]]:
+    """
+    Score every description against the profile.
+    Returns (scores int[n] in 0-10, reasoning str[n]).
+    """
+    profile = profile if profile is not None else (load_profile() or {})
+    return score_profiles(descriptions, {None: profile})[None]
+
+
+def score_profiles(
+    descriptions: list[str],
+    profiles: dict,
+) -> dict:
+    """
+    Score every description against several profiles ({name: profile}) at
+    once: the batch is tokenized once and counted into one term matrix over
+    the union of the profiles' terms, each profile reads its own columns.
+    Returns {name: (scores, reasoning)}.
+    """
+    n = len(descriptions)
+    prepared = {name: _profile_terms(prof or {}) for name, prof in profiles.items()}
+    union: dict[str, int] = {}
+    for terms, *_ in prepared.values():
+        for t in terms:
+            union.setdefault(t, len(union))
+    tf, doc_len = _term_matrix([tokenize(d) for d in descriptions], union)
+
+    out = {}
+    for name, (terms, weights, skills, skill_idx) in prepared.items():
+        if not terms or n == 0:
+            out[name] = (np.zeros(n, dtype=np.int64), ["Local scorer: empty profile"] * n)
+            continue
+        cols = [union[t] for t in terms]
+        out[name] = _score(tf[:, cols], doc_len, weights, skills, skill_idx)
+    return out
+
+
+def local_score(job_desc: str, profile: dict | None = None) -> tuple[int, str]:
+    """Single-description convenience wrapper → (score, reasoning)."""
+    scores, reasons = score_batch([job_desc], profile)
+    return int(scores[0]), reasons[0]
+
+
+def local_keywords(job_desc: str, limit: int = 15) -> list[str]:
+    """
+    LLM-free stand-in for `extract_keywords`: the most frequent
+    non-trivial terms of the description, in their original casing.
+    """
+    counts: dict[str, int] = {}
+    casing: dict[str, str] = {}
+    for raw in re.findall(r"[A-Za-z0-9][A-Za-z0-9+#]*(?:\.[A-Za-z0-9]+)*", job_desc or ""):
+        low = raw.lower()
+        if len(low) < 3 or low in _STOPWORDS or low.isdigit():
+            continue
+        counts[low] = counts.get(low, 0) + 1
+        casing.setdefault(low, raw)
+    ranked = sorted(counts, key=lambda t: (-counts[t], t))
+    return [casing[t] for t in ranked[:limit]]
@@ -0,0 +1,153 @@
+# ------------------ modules/model_routing.py ------------------
+"""
+Backend + model per LLM task.
+
+Scoring and keyword extraction return a few tokens for every posting, so a
+small fast model is enough; the cover letter (matches only) can go to a
+larger one. A route is written "backend:model" – "ollama:llama3.2:3b",
+"openai:gpt-4o-mini", "local" (built-in scorer / keywords, no LLM) – or
+just "model" for the default backend.
+
+Where a task's route comes from (first hit wins):
+
+0. routes pinned for a run (`use_routes`: resolved once by `run_grid`,
+   or carried by the tasks of a queued run)
+1. env LLM_ROUTE_<TASK>          (CLI / worker: --model score=ollama:llama3.2:3b)
+2. profile "model_routing"       {"score": "ollama:llama3.2:3b", ...}
+                                 (edited in the dashboard, Search ▸ Per-task models)
+3. LLM_BACKEND with its default model (llama3 / gpt-3.5-turbo) – as before.
+
+Whatever the source, a route that was found unavailable (`set_unavailable`:
+a backend like "openai", or one "ollama:model") resolves to "local" – how
+the dashboard falls back to the local scorer when Ollama, a model or the
+OpenAI key is missing. Pinned routes are final: `snapshot()` has already
+applied that fallback, and a run keeps its routes when another dashboard
+session changes the engine or the availability afterwards.
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import os
+from dataclasses import dataclass
+
+from config.profile_loader import active_profile, profile_field, use_profile
+
+TASKS = ("score", "keywords", "cover_letter")
+BACKENDS = ("ollama", "openai", "local")
+DEFAULT_MODELS = {"ollama": "llama3", "openai": "gpt-3.5-turbo", "local": None}
+
+_PINNED: contextvars.ContextVar = contextvars.ContextVar("pinned_routes", default=None)
+
+
+@dataclass(frozen=True)
+class Route:
+    backend: str
+    model: str | None
+
+    def __str__(self) -> str:
+        return self.backend if self.model is None else f"{self.backend}:{self.model}"
+
+
+def parse(spec: str, default_backend: str | None = None) -> Route:
+    """"ollama:llama3.2:3b" / "local" / "gpt-4o-mini" → Route."""
+    spec = spec.strip()
+    backend, _, model = spec.partition(":")
+    if backend not in BACKENDS:
+        backend, model = default_backend or default_backend_name(), spec
+    if backend == "local":
+        return Route("local", None)
+    return Route(backend, model or DEFAULT_MODELS[backend])
+
+
+def default_backend_name() -> str:
+    return os.getenv("LLM_BACKEND", "ollama")
+
+
+def _env_key(task: str) -> str:
+    return f"LLM_ROUTE_{task.upper()}"
+
+
+@contextlib.contextmanager
+def use_routes(pinned: dict | None):
+    """
+    Inside the block, tasks in `pinned` ({"score": "ollama:llama3.2:3b"})
+    take that route; `pinned["by_profile"]` ({profile: {task: route}}, see
+    `snapshot`) comes first for the active profile.
+    """
+    token = _PINNED.set(pinned or None)
+    try:
+        yield
+    finally:
+        _PINNED.reset(token)
+
+
+def _pinned(task: str) -> str | None:
+    pinned = _PINNED.get()
+    if not pinned:
+        return None
+    by_profile = (pinned.get("by_profile") or {}).get(active_profile() or "") or {}
+    return by_profile.get(task) or pinned.get(task)
+
+
+def _configured(task: str) -> Route:
+    pinned = _pinned(task)
+    if pinned:
+        return parse(pinned)
+    spec = os.getenv(_env_key(task)) or (profile_field("model_routing") or {}).get(task)
+    if spec:
+        return parse(spec)
+    backend = default_backend_name()
+    return Route(backend, DEFAULT_MODELS.get(backend, DEFAULT_MODELS["ollama"]))
+
+
+def unavailable() -> set[str]:
+    return {u for u in os.getenv("LLM_UNAVAILABLE", "").split(",") if u}
+
+
+def set_unavailable(items) -> None:
+    """Backends ("openai") / routes ("ollama:llama3") that must not be called; they go local."""
+    os.environ["LLM_UNAVAILABLE"] = ",".join(dict.fromkeys(items))
+
+
+def route(task: str, *, configured: bool = False) -> Route:
+    """The route `task` takes; with `configured`, before the unavailable → local fallback."""
+    r = _configured(task)
+    if not configured and _pinned(task) is None and (r.backend in unavailable() or str(r) in unavailable()):
+        return Route("local", None)
+    return r
+
+
+def routes(tasks=TASKS, *, configured: bool = False) -> dict[str, Route]:
+    return {t: route(t, configured=configured) for t in tasks}
+
+
+def snapshot(tasks=TASKS, profiles=None) -> dict[str, object]:
+    """
+    The routes of `tasks` as they resolve now (unavailable ones already
+    "local"), for `use_routes`; with `profiles`, per profile as well.
+    """
+    pinned: dict[str, object] = {t: str(r) for t, r in routes(tasks).items()}
+    if profiles:
+        by_profile = {}
+        for name in profiles:
+            with use_profile(name):
+                by_profile[name or ""] = {t: str(r) for t, r in routes(tasks).items()}
+        pinned["by_profile"] = by_profile
+    return pinned
+
+
+def ollama_models(tasks=TASKS, *, configured: bool = False) -> list[str]:
+    """Ollama models the given tasks will call (to preload them)."""
+    return list(dict.fromkeys(
+        r.model for r in routes(tasks, configured=configured).values() if r.backend == "ollama"
+    ))
+
+
+def set_env_routes(pairs: list[str]) -> None:
+    """Apply "task=backend:model" pairs (CLI flags) for this process."""
+    for pair in pairs:
+        task, sep, spec = pair.partition("=")
+        if not sep or task not in TASKS:
+            raise ValueError(f"expected TASK=BACKEND:MODEL with TASK in {', '.join(TASKS)}, got {pair!r}")
+        os.environ[_env_key(task)] = str(parse(spec))
@@ -0,0 +1,142 @@
+# ------------------ modules/ollama_runtime.py ------------------
+"""
+Ollama model lifecycle for a search run.
+
+• `start_session()` preloads the model before the first job is scored and
+  sets `keep_alive` for the expected length of the run, so only the warm-up
+  pays the multi-second load.
+• `num_ctx_for()` sizes the context window from the per-task prompt +
+  answer budget (`TASK_CTX`: 2048 for score / keywords, 4096 for cover
+  letters). Ollama reloads the runner whenever `num_ctx` changes, so the
+  run uses one window (the largest budget of the tasks it routes to
+  Ollama) and only grows it when a prompt really does not fit.
+• `end_session()` hands the model back to Ollama's default idle timeout.
+  Sessions of concurrent runs nest: the models, window and keep_alive are
+  merged, and only the last run to end releases them.
+• `shared_prefix_tokens()` guesses how much of a prompt Ollama can take
+  from its KV cache (Ollama doesn't report it) – see `modules.prompts`.
+  It compares with the model's last prompt in this process, so concurrent
+  runs / interleaved tasks make it meaningless; it is recorded apart from
+  measured values, as `LLMCall.cached_tokens_est`.
+
+Warm-up calls are recorded in METRICS (task="warmup") with their load time,
+so cold and warm latency show up in the run summary.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+from modules.llm_metrics import METRICS, LLMCall, COLD_LOAD_S
+
+log = logging.getLogger(__name__)
+
+# prompt + completion budget per task (tokens), rounded up to a power of two;
+# the answer part is the task's MAX_TOKENS (modules.utils)
+TASK_CTX = {
+    "score": 2048,           # profile snapshot (~350) + job description (~1300) + 60
+    "keywords": 2048,        # instructions (~80) + job description (~1300) + 120
+    "cover_letter": 4096,    # profile + experience + template (~2500) + 900 of letter
+}
+MIN_CTX = 2048
+DEFAULT_KEEP_ALIVE = "5m"    # Ollama's own default
+
+_lock = threading.Lock()
+_state = {"keep_alive": None, "num_ctx": None, "models": set(), "last_prompt": {}, "sessions": 0}
+
+
+def _round_up(tokens: int) -> int:
+    ctx = MIN_CTX
+    while ctx < tokens:
+        ctx *= 2
+    return ctx
+
+
+def num_ctx_for(task: str | None, messages: list[dict], max_tokens: int | None) -> int:
+    """Context window for one call: the run's window unless the prompt needs more."""
+    prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 3   # conservative
+    need = _round_up(prompt_tokens + (max_tokens or 512))
+    with _lock:
+        base = _state["num_ctx"] or TASK_CTX.get(task, MIN_CTX)
+        if need > base and _state["num_ctx"]:
+            # grow the run's window once instead of flip-flopping (→ reloads)
+            log.info("num_ctx %d too small for %s prompt – growing to %d", base, task, need)
+            _state["num_ctx"] = need
+        return max(base, need)
+
+
+def shared_prefix_tokens(model: str, messages: list[dict]) -> int:
+    """
+    Rough count (~4 chars per token) of the prompt prefix this call shares
+    with the previous prompt sent to `model` – what Ollama can serve from
+    the KV cache it kept. Remembers `messages` for the next call.
+    """
+    text = "\n".join(f"{m.get('role')}:{m.get('content', '')}" for m in messages)
+    with _lock:
+        last = _state["last_prompt"].get(model, "")
+        _state["last_prompt"][model] = text
+    n = len(os.path.commonprefix([last, text]))
+    return n // 4
+
+
+def keep_alive() -> str | None:
+    """keep_alive to send with each request (None → Ollama default)."""
+    return _state["keep_alive"]
+
+
+def warm_up(model: str, *, num_ctx: int | None = None) -> LLMCall:
+    """Load `model` with the run's settings; an empty prompt only loads it."""
+    import ollama
+
+    options = {"num_ctx": num_ctx} if num_ctx else {}
+    call = LLMCall(backend="ollama", model=model, task="warmup")
+    t0 = time.perf_counter()
+    try:
+        resp = ollama.generate(model=model, prompt="", keep_alive=keep_alive(), options=options)
+        call.load_s = (resp.get("load_duration") or 0) / 1e9
+    except Exception as exc:
+        call.error = str(exc)
+        log.warning("Ollama warm-up of %s failed: %s", model, exc)
+    call.latency_s = time.perf_counter() - t0
+    METRICS.record(call)
+    log.info(
+        "Ollama %s %s in %.2fs", model,
+        "cold-loaded" if (call.load_s or 0) > COLD_LOAD_S else "already warm",
+        call.latency_s,
+    )
+    return call
+
+
+def start_session(models: list[str], *, tasks=("score", "keywords", "cover_letter"),
+                  expected_minutes: float = 30) -> list[LLMCall]:
+    """Pin keep_alive/num_ctx for the run and preload every model it will use."""
+    with _lock:
+        minutes = max(int(expected_minutes), 5)
+        if _state["sessions"]:                  # another run is going: widen its session
+            minutes = max(minutes, int(_state["keep_alive"][:-1]))
+        _state["sessions"] += 1
+        _state["keep_alive"] = f"{minutes}m"
+        _state["num_ctx"] = max([_state["num_ctx"] or 0] + [TASK_CTX.get(t, MIN_CTX) for t in tasks])
+        _state["models"] |= set(models)
+        num_ctx = _state["num_ctx"]
+    return [warm_up(m, num_ctx=num_ctx) for m in dict.fromkeys(models)]
+
+
+def end_session() -> None:
+    """Give the models back to Ollama's default idle timeout."""
+    with _lock:
+        _state["sessions"] = max(0, _state["sessions"] - 1)
+        if _state["sessions"]:
+            return
+        models, num_ctx = list(_state["models"]), _state["num_ctx"]
+        _state.update(keep_alive=None, num_ctx=None, models=set())
+    import ollama
+
+    for model in models:
+        try:
+            options = {"num_ctx": num_ctx} if num_ctx else {}
+            ollama.generate(model=model, prompt="", keep_alive=DEFAULT_KEEP_ALIVE, options=options)
+        except Exception as exc:
+            log.debug("Ollama keep_alive reset for %s failed: %s", model, exc)
@@ -1,31 +1,62 @@
 # ── modules/prompts.py  ─────────────────────────────────────────────
 """
 Strict and detailed prompts.
-All personal data is filled at runtime from `config/profile.json`.
+All personal data is filled at runtime from `config/profile.json`:
+the profile-dependent templates are built on first use and rebuilt when
+the profile changes (`cover_letter_prompt()`, `score_job_match_prompt()`,
+and the `*_messages()` helpers the LLM calls use).
+The old module constants still resolve, lazily, through `__getattr__`.
 """
 
 from textwrap import dedent
-from config.profile_loader import profile_field
+from config.profile_loader import profile_field, profile_version, active_profile
+
+_CACHE: dict[tuple, tuple] = {}      # (template, profile) → (profile version, text)
+
 
 # -------------------------------------------------------------------
 # Helper strings built from the JSON profile
-NAME        = profile_field("name", "")
-BACKGROUND  = profile_field("background", "")
-SKILLS      = ", ".join(profile_field("skills", []))
-EXPERIENCE  = "• " + "\n• ".join(profile_field("experience_bullets", []))
-OBJECTIVE   = profile_field("objective", "")
-INDUSTRIES  = ", ".join(profile_field("preferred_industries", []))
+def _profile_strings() -> dict:
+    return {
+        "NAME":       profile_field("name", ""),
+        "BACKGROUND": profile_field("background", ""),
+        "SKILLS":     ", ".join(profile_field("skills", [])),
+        "EXPERIENCE": "• " + "\n• ".join(profile_field("experience_bullets", [])),
+        "OBJECTIVE":  profile_field("objective", ""),
+        "INDUSTRIES": ", ".join(profile_field("preferred_industries", [])),
+    }
+
+
+def _cached(name: str, build):
+    version, key = profile_version(), (name, active_profile())
+    hit = _CACHE.get(key)
+    if hit is None or hit[0] != version:
+        hit = _CACHE[key] = (version, build(**_profile_strings()))
+    return hit[1]
+
+
+# -------------------------------------------------------------------
+# Layout: everything that is the same for every job (instructions,
+# profile, template) comes first, the job itself last. Ollama reuses the
+# KV cache of a matching prefix and OpenAI caches prompt prefixes, so the
+# static part is only processed once per run instead of once per posting.
+# The `*_messages()` helpers return it as [system (static), user (job)].
+def _messages(static: str, job: str) -> list[dict]:
+    return [{"role": "system", "content": static}, {"role": "user", "content": job}]
+
+
+def prompt_text(messages: list[dict]) -> str:
+    """Messages as one text (debug display, `llm_prompt` of a match)."""
+    return "\n\n".join(m["content"] for m in messages)
+
 
 # -------------------------------------------------------------------
 # COVER-LETTER PROMPT
-COVER_LETTER_PROMPT = dedent(f"""
+def _build_cover_letter(NAME, BACKGROUND, SKILLS, EXPERIENCE, **_) -> str:
+    return dedent(f"""
 You are filling a cover-letter template whose blanks are runs of
-three or more underscores (e.g. `__________`).
-
-────────────── JOB CONTEXT ──────────────
-Company  : {{company}}
-Job title: {{job_title}}
-Location : {{location}}
+three or more underscores (e.g. `__________`), for the job given in
+JOB CONTEXT at the end.
 
 ───────── CANDIDATE PROFILE ─────────
 Name       : {NAME}
@@ -50,27 +81,54 @@ Experience :
 
 ──────── TEMPLATE START ────────
 {{template_text}}
+──────── TEMPLATE END ────────
 """).strip()
 
 
+_COVER_LETTER_JOB = dedent("""
+────────────── JOB CONTEXT ──────────────
+Company  : {company}
+Job title: {job_title}
+Location : {location}
+""").strip()
+
+
+def cover_letter_prompt() -> str:
+    """Cover-letter template (fields: company, job_title, location, template_text)."""
+    return _cached("cover_letter", _build_cover_letter) + "\n\n" + _COVER_LETTER_JOB
+
+
+def cover_letter_messages(job_title: str, company: str, location: str, template_text: str) -> list[dict]:
+    static = _cached("cover_letter", _build_cover_letter).format(template_text=template_text)
+    return _messages(static, _COVER_LETTER_JOB.format(company=company, job_title=job_title, location=location))
+
+
 # -------------------------------------------------------------------
 # KEYWORD-EXTRACTION PROMPT  
-CV_KEYWORD_EXTRACTION_PROMPT = dedent("""
+_KEYWORDS_STATIC = dedent("""
 You are a technical assistant analysing a job description.
 
 Extract the **10–15 most precise technical keywords** (tools, methods, domains, technologies).  
 • Exclude soft skills and duplicates.  
 • Keep acronyms and exact casing.  
 • Return **one** comma-separated line, sorted by importance.
-
-Job Description:  
-{{job_desc}}
 """).strip()
 
+_KEYWORDS_JOB = "Job Description:  \n{job_desc}"
+
+CV_KEYWORD_EXTRACTION_PROMPT = _KEYWORDS_STATIC + "\n\n" + _KEYWORDS_JOB
+
+
+def keyword_messages(job_desc: str) -> list[dict]:
+    return _messages(_KEYWORDS_STATIC, _KEYWORDS_JOB.format(job_desc=job_desc))
+
+
 # -------------------------------------------------------------------
 # JOB-MATCH SCORING PROMPT
-SCORE_JOB_MATCH_PROMPT = dedent(f"""
+def _build_score(BACKGROUND, SKILLS, OBJECTIVE, INDUSTRIES, **_) -> str:
+    return dedent(f"""
 You are a recruiter assistant rating how well a job matches the candidate.
+The job description follows at the end.
 
 **Candidate Snapshot**  
 • Background : {BACKGROUND}  
@@ -78,9 +136,6 @@ You are a recruiter assistant rating how well a job matches the candidate.
 • Objective  : {OBJECTIVE}  
 • Preferred industries: {INDUSTRIES}
 
-**Job Description**  
-{{job_desc}}
-
 **Instructions**  
 1. Return exactly **one integer 1-10**.  
 2. Add **one concise sentence** justifying the score (no lists, no headings).  
@@ -94,4 +149,30 @@ You are a recruiter assistant rating how well a job matches the candidate.
 **Format Example**  
 7 – Uses Python and CFD tools the candidate knows, but the role focuses on IT infrastructure rather than physical simulation.
 """).strip()
+
+
+_SCORE_JOB = "**Job Description**  \n{job_desc}"
+
+
+def score_job_match_prompt() -> str:
+    """Scoring template (field: job_desc)."""
+    return _cached("score", _build_score) + "\n\n" + _SCORE_JOB
+
+
+def score_job_match_messages(job_desc: str) -> list[dict]:
+    return _messages(_cached("score", _build_score), _SCORE_JOB.format(job_desc=job_desc))
+
+
+_LAZY = {
+    "COVER_LETTER_PROMPT": cover_letter_prompt,
+    "SCORE_JOB_MATCH_PROMPT": score_job_match_prompt,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return _LAZY[name]()
+    if name in ("NAME", "BACKGROUND", "SKILLS", "EXPERIENCE", "OBJECTIVE", "INDUSTRIES"):
+        return _profile_strings()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 # ────────────────────────────────────────────────────────────────────
\ No newline at end of file
@@ -0,0 +1,244 @@
+# ------------------ modules/queue_runner.py ------------------
+"""
+A search grid as tasks on a `modules.work_queue`, so several workers
+(processes or machines) share one run.
+
+    enqueue_search(spec, queue)   → one "scrape" task per grid cell
+                                    (`routes` pinned on every task of the run)
+    scrape   → scrape + identity/archive/applied/dedup, then "score" tasks
+               (SCORE_CHUNK postings each; per profile in multi-profile runs)
+    score    → LLM / local scores, then one "generate" task per match
+    generate → job folder, CV, CL; the task result is the match dict
+    merge(queue, run_id) → all matches of the run, on any host
+
+Workers write the documents under results/ as usual – for workers on
+several machines results/ has to be shared storage (NFS, a synced
+volume …), otherwise each host keeps the folders it generated.
+Tasks are retried on another worker when one dies (lease expiry), so a
+handler may run twice. Child tasks have ids derived from their parent's
+(`work_queue.task_id`), so a retried scrape / score task doesn't queue
+its children again; generation is idempotent anyway (same folder,
+content-addressed blobs) and `merge()` keeps one match per (profile, job_key).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict
+
+import pandas as pd
+
+from config.profile_loader import use_profile
+from modules.llm_metrics import METRICS
+from modules.model_routing import use_routes
+from modules.search_jobs import SearchSpec
+from modules.work_queue import LEASE_S, task_id
+
+log = logging.getLogger(__name__)
+
+SCORE_CHUNK = 10        # postings per score task
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    """JSON-friendly rows (descriptions decoded, categoricals as plain values)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _row(record: dict):
+    """Namedtuple row as `iter_scores()` / `generate_documents()` expect it."""
+    return next(pd.DataFrame([record]).itertuples(index=False))
+
+
+# --------------------------------------------------------------------- #
+#  producer
+# --------------------------------------------------------------------- #
+def enqueue_search(spec: SearchSpec, queue, *, run_id: str | None = None,
+                   routes: dict[str, str] | None = None) -> str:
+    """
+    Put one scrape task per platform × location × keyword; returns the run id.
+    `routes` ({task: "backend:model"}, e.g. from the run spec's "backend" /
+    "models") are used by the workers for this run instead of their own.
+    """
+    run_id = run_id or uuid.uuid4().hex[:12]
+    for platform, location, term in spec.units:
+        queue.put(run_id, "scrape", {
+            "spec": asdict(spec), "platform": platform, "location": location, "term": term,
+            "routes": routes,
+        }, task_id=task_id(run_id, "scrape", platform, location, term))
+    return run_id
+
+
+# --------------------------------------------------------------------- #
+#  handlers – each returns the task result
+# --------------------------------------------------------------------- #
+def handle_scrape(queue, task) -> dict:
+    from modules.job_processing import scrape_postings, prepare_postings
+
+    p, spec = task.payload, SearchSpec(**task.payload["spec"])
+    jobs_df = scrape_postings(
+        p["platform"], p["term"], p["location"], spec.hours_old, spec.results_wanted,
+        headless=spec.headless, ea_application=spec.easy_apply, use_cache=spec.use_cache,
+    )
+    if jobs_df.empty:
+        return {"scraped": 0}
+    scraped = 0
+    for profile in spec.profiles or [None]:
+        with use_profile(profile):
+            records = _records(prepare_postings(jobs_df, p["platform"], p["term"]))
+        scraped += len(records)
+        for i in range(0, len(records), SCORE_CHUNK):
+            queue.put(task.run_id, "score", {
+                "spec": p["spec"], "platform": p["platform"], "profile": profile,
+                "rows": records[i:i + SCORE_CHUNK], "routes": p.get("routes"),
+            }, task_id=task_id(task.run_id, "score", task.id, profile, i))
+    return {"scraped": scraped}
+
+
+def handle_score(queue, task) -> dict:
+    from modules.job_processing import iter_scores
+    from scrapers.registry import REGISTRY
+
+    p, spec = task.payload, SearchSpec(**task.payload["spec"])
+    platform_name = REGISTRY[p["platform"].lower()].platform
+    scored = matched = 0
+    with use_profile(p.get("profile")):
+        for row, _desc, score, reasoning, llm_prompt in iter_scores(
+            pd.DataFrame(p["rows"]), prefilter=spec.prefilter, debug=spec.debug
+        ):
+            scored += 1
+            if score < spec.score_threshold:
+                continue
+            matched += 1
+            queue.put(task.run_id, "generate", {
+                "spec": p["spec"], "platform_name": platform_name, "profile": p.get("profile"),
+                "row": row._asdict(), "score": score, "reasoning": reasoning, "llm_prompt": llm_prompt,
+                "routes": p.get("routes"),
+            }, task_id=task_id(task.run_id, "generate", p.get("profile"), row.job_key))
+    return {"scored": scored, "matched": matched}
+
+
+def handle_generate(queue, task) -> dict:
+    from modules.job_processing import generate_documents
+
+    p, spec = task.payload, SearchSpec(**task.payload["spec"])
+    row = _row(p["row"])
+    desc = row.description if isinstance(row.description, str) else ""
+    with use_profile(p.get("profile")):
+        return generate_documents(
+            row, desc, p["score"], p["reasoning"], p["llm_prompt"], p["platform_name"],
+            spec.generate_cv, spec.generate_cl, spec.debug, spec.easy_apply,
+        )
+
+
+HANDLERS = {"scrape": handle_scrape, "score": handle_score, "generate": handle_generate}
+
+
+# --------------------------------------------------------------------- #
+#  worker
+# --------------------------------------------------------------------- #
+def _keep_alive(queue, task, worker: str, lease_s: float, done: threading.Event) -> None:
+    while not done.wait(lease_s / 3):
+        if not queue.heartbeat(task.id, worker, lease_s):
+            log.warning("lost the lease on %s task %s", task.kind, task.id)
+            return
+
+
+def run_task(queue, task, worker: str, lease_s: float = LEASE_S) -> bool:
+    """Run one claimed task under a heartbeat; True when it completed."""
+    done = threading.Event()
+    beat = threading.Thread(target=_keep_alive, args=(queue, task, worker, lease_s, done), daemon=True)
+    beat.start()
+    try:
+        with METRICS.run(task.run_id), use_routes(task.payload.get("routes")):
+            result = HANDLERS[task.kind](queue, task)
+    except Exception as exc:            # noqa: BLE001 – recorded on the task, retried elsewhere
+        log.exception("%s task %s failed (attempt %d)", task.kind, task.id, task.attempts)
+        queue.fail(task.id, worker, f"{type(exc).__name__}: {exc}")
+        return False
+    finally:
+        done.set()
+        beat.join()
+    return queue.complete(task.id, worker, result)
+
+
+def run_worker(
+    queue,
+    kinds: list[str] | None = None,
+    *,
+    worker: str | None = None,
+    poll_s: float = 5.0,
+    lease_s: float = LEASE_S,
+    idle_exit_s: float | None = None,
+    stop: threading.Event | None = None,
+) -> int:
+    """
+    Claim and run tasks until `stop` is set (or nothing arrived for
+    `idle_exit_s`). `kinds` restricts the worker, e.g. ["score",
+    "generate"] on a GPU box. Returns the number of tasks handled.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    stop = stop or threading.Event()
+    handled, idle_since = 0, time.monotonic()
+    log.info("worker %s polling for %s", worker, ", ".join(kinds or HANDLERS))
+    while not stop.is_set():
+        task = queue.claim(worker, kinds, lease_s)
+        if task is None:
+            if idle_exit_s is not None and time.monotonic() - idle_since >= idle_exit_s:
+                break
+            stop.wait(poll_s)
+            continue
+        log.info("▶ %s task %s (run %s)", task.kind, task.id, task.run_id)
+        run_task(queue, task, worker, lease_s)
+        handled += 1
+        idle_since = time.monotonic()
+    return handled
+
+
+# --------------------------------------------------------------------- #
+#  central merge
+# --------------------------------------------------------------------- #
+def pending(queue, run_id: str) -> int:
+    return sum(n for by_status in queue.counts(run_id).values()
+               for status, n in by_status.items() if status in ("pending", "leased"))
+
+
+def wait(queue, run_id: str, *, poll_s: float = 5.0, timeout_s: float | None = None) -> bool:
+    """Block until no task of the run is pending or leased; False on timeout."""
+    deadline = None if timeout_s is None else time.monotonic() + timeout_s
+    while pending(queue, run_id):
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_s)
+    return True
+
+
+def merge(queue, run_id: str) -> tuple[list[dict], dict]:
+    """
+    (matches, summary) of a run: one match per (profile, job_key) from the
+    finished generate tasks, plus task counts and the failed tasks' errors.
+    """
+    matches, seen = [], set()
+    for task in queue.tasks(run_id, "generate", "done"):
+        match = task.result or {}
+        key = (match.get("profile"), match.get("job_key"))
+        if key in seen:
+            continue
+        seen.add(key)
+        matches.append(match)
+
+    scraped = sum((t.result or {}).get("scraped", 0) for t in queue.tasks(run_id, "scrape", "done"))
+    scored = sum((t.result or {}).get("scored", 0) for t in queue.tasks(run_id, "score", "done"))
+    failures = [
+        {"stage": t.kind, "task": t.id, "attempts": t.attempts, "error": t.error}
+        for t in queue.tasks(run_id, status="failed")
+    ]
+    summary = {
+        "tasks": queue.counts(run_id),
+        "counts": {"scraped": scraped, "scored": scored, "generated": len(matches), "failed": len(failures)},
+        "failures": failures,
+    }
+    return matches, summary
@@ -1,132 +1,195 @@
 # ------------------ modules/render_jobs.py ------------------
 import streamlit as st
 import pandas as pd
-import tempfile
 import os
 import datetime
 from modules.email_sender import send_application_email
-from config.profile_loader import load_profile
-from modules.history_tracker import has_already_applied, log_application
+from config.profile_loader import load_profile, use_profile
+from modules.history_tracker import filter_applied, log_application
+
+def _applied_urls(all_matches) -> set[tuple]:
+    """
+    Applied set for this result set, read from the history once and then
+    kept in session_state (updated in place by "Mark as Applied").
+    Entries are (profile, url): multi-profile results are checked against
+    each profile's own history.
+    """
+    if "applied_urls" not in st.session_state:
+        by_profile = {}
+        for j in all_matches:
+            by_profile.setdefault(j.get("profile"), []).append(j)
+        applied = set()
+        for profile, jobs in by_profile.items():
+            with use_profile(profile):
+                applied |= {(profile, url) for url in filter_applied(
+                    [j["url"] for j in jobs],
+                    [j.get("job_key") for j in jobs],
+                    [j.get("desc_fp") for j in jobs],
+                )}
+        st.session_state["applied_urls"] = applied
+    return st.session_state["applied_urls"]
+
+
+PAGE_SIZE = 20
+
+
+def _results_csv(all_matches) -> bytes:
+    """CSV export, built once per result set (run id + size) and kept as bytes."""
+    key = (st.session_state.get("run_id"), len(all_matches))
+    cached = st.session_state.get("results_csv")
+    if cached is None or cached[0] != key:
+        data = pd.DataFrame(all_matches).to_csv(index=False).encode("utf-8")
+        st.session_state["results_csv"] = cached = (key, data)
+    return cached[1]
+
 
-PROFILE = load_profile()
 def render_job_results(all_matches, debug_mode):
-    results_df = pd.DataFrame(all_matches)
+    """
+    One page of result cards; every card is its own fragment, so
+    "Mark as Applied" / "Regenerate" / "Send" only rerun that card.
+    """
+    _applied_urls(all_matches)
 
-    for idx, job in enumerate(all_matches):
-        applied = has_already_applied(job["url"])
-        
-        st.markdown(f"**{job['title']}** at **{job['company']}**  ")
-        st.markdown(f"\U0001F4CD Location: {job['location']}")
-        st.markdown(f"🌐 Platform: {job['platform']}")
-        st.markdown(f"🌐 Url: {job['url']}")
-        st.markdown(f"🌐 Email (if available): {job['email']}")
+    n_pages = max(1, -(-len(all_matches) // PAGE_SIZE))
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1,
+                           key="results_page")
+    start = (page - 1) * PAGE_SIZE
+    for idx in range(start, min(start + PAGE_SIZE, len(all_matches))):
+        _render_card(idx, all_matches[idx])
+
+    st.download_button("\U0001F4E5 Download Results CSV", data=_results_csv(all_matches),
+                       file_name="job_results.csv", mime="text/csv")
+
+
+@st.fragment
+def _render_card(idx, job):
+    # regenerate / mark applied / send as the candidate this match was found for
+    with use_profile(job.get("profile")):
+        _render_card_body(idx, job)
+
+
+def _render_card_body(idx, job):
+    applied_urls = st.session_state["applied_urls"]
+    applied = (job.get("profile"), job["url"]) in applied_urls
+    st.markdown(f"**{job['title']}** at **{job['company']}**  ")
+    if job.get("profile"):
+        st.markdown(f"👤 Profile: {job['profile']}")
+    st.markdown(f"\U0001F4CD Location: {job['location']}")
+    st.markdown(f"🌐 Platform: {job['platform']}")
+    st.markdown(f"🌐 Url: {job['url']}")
+    other_urls = [u for u in job.get("source_urls") or [] if u != job["url"]]
+    if other_urls:
+        st.markdown("🔁 Also posted at: " + ", ".join(other_urls))
+    st.markdown(f"🌐 Email (if available): {job['email']}")
+    if job.get("folder"):
         st.markdown(f"\U0001F4C1 Folder: `{job['folder']}`")
-        st.markdown(f"\u2B50 Match Score: {job.get('score', 'N/A')}/10")
+    else:
+        st.markdown("\U0001F4C1 No documents – outside the run's document budget")
+    st.markdown(f"\u2B50 Match Score: {job.get('score', 'N/A')}/10")
 
-        if st.button("(Re)generate Cover Letter", key=f"regen_en_{idx}"):
-            from modules.cl_generator import generate_cover_letter, save_to_pdf
-        
-            new_letter = generate_cover_letter(
-                job["title"],
-                job["company"],
-                job["location"],
+    if job.get("folder") and st.button("(Re)generate Cover Letter", key=f"regen_en_{idx}"):
+        from modules.cl_generator import generate_cover_letter, save_to_pdf
+    
+        new_letter = generate_cover_letter(
+            job["title"],
+            job["company"],
+            job["location"],
+        )
+        if new_letter:
+            save_to_pdf(job, new_letter, job["folder"])
+            st.success("Regenerated CL in English")
+            st.rerun(scope="fragment")           
+    
+    if applied:
+        st.success("Already marked as applied")
+    else:
+        if st.button("Mark as Applied", key=f"mark_applied_{idx}"):
+            log_application(
+                url=job["url"],
+                title=job["title"],
+                company=job["company"],
+                location=job["location"],
+                platform=job["platform"],
+                job_key=job.get("job_key"),
+                desc_fp=job.get("desc_fp"),
             )
-            if new_letter:
-                save_to_pdf(job, new_letter, job["folder"])
-                st.success("Regenerated CL in English")
-                st.rerun()           
-        
-        if applied:
-            st.success("Already marked as applied")
+            applied_urls.add((job.get("profile"), job["url"]))
+            st.success("Marked as applied")
+            st.rerun(scope="fragment")
+    
+    email_val = job.get("email", "")
+    if not job.get("folder"):
+        st.markdown("📤 No Manual Send Option Available (no documents)")
+    elif email_val and not pd.isna(email_val) and str(email_val).strip().lower() != "nan":
+        emails = [e.strip() for e in str(email_val).replace(";", ",").split(",") if e.strip()]
+        if len(emails) > 1:
+            st.markdown("Multiple Emails Found")
+            selected_email = st.selectbox("Choose email address to send to:", emails, key=f"email_select_{idx}")
         else:
-            if st.button("Mark as Applied", key=f"mark_applied_{idx}"):
-                log_application(
-                    url=job["url"],
-                    title=job["title"],
-                    company=job["company"],
-                    location=job["location"],
-                    platform=job["platform"],
-                )
-                st.success("Marked as applied")
-                st.rerun()
+            selected_email = emails[0]
         
-        email_val = job.get("email", "")
-        if email_val and not pd.isna(email_val) and str(email_val).strip().lower() != "nan":
-            emails = [e.strip() for e in str(email_val).replace(";", ",").split(",") if e.strip()]
-            if len(emails) > 1:
-                st.markdown("Multiple Emails Found")
-                selected_email = st.selectbox("Choose email address to send to:", emails, key=f"email_select_{idx}")
-            else:
-                selected_email = emails[0]
-            
-            st.markdown("### 📤 Manual Send Options")
-            sent_key = f"sent_{job['title']}_{job['company']}_{idx}"
-            sent = st.session_state.get(sent_key)
-            if sent:
-                st.success(f"Sent to {sent['email']} on {sent['timestamp']}")
-            else:
-                clicked = st.button("Send selected applications", key=f"send_btn_{idx}")
-                if clicked:
+        st.markdown("### 📤 Manual Send Options")
+        sent_key = f"sent_{job['title']}_{job['company']}_{idx}"
+        sent = st.session_state.get(sent_key)
+        if sent:
+            st.success(f"Sent to {sent['email']} on {sent['timestamp']}")
+        else:
+            clicked = st.button("Send selected applications", key=f"send_btn_{idx}")
+            if clicked:
+                
+                with st.spinner("Sending..."):
                     
-                    with st.spinner("Sending..."):
+                    candidate_name = (load_profile() or {}).get("name", "Your Name")
+                    from_address = st.session_state.get("from_address", "")
+                    app_password = st.session_state.get("app_password", "")
+                    smtp_server = st.session_state.get("smtp_server", "")
+                    smtp_port = int(st.session_state.get("smtp_port", 587))
+                    
+                    if not (from_address and app_password and smtp_server and smtp_port):
+                        st.error("Please enter your SMTP credentials in the sidebar before sending.")
+                    else:
+        
+                        attachments = [
+                            os.path.join(job['folder'], 'CV_Custom.pdf'),
+                            os.path.join(job['folder'], 'Cover_Letter.pdf'),
+                        ]
                         
-                        candidate_name = PROFILE.get("name", "Your Name")
-                        from_address = st.session_state.get("from_address", "")
-                        app_password = st.session_state.get("app_password", "")
-                        smtp_server = st.session_state.get("smtp_server", "")
-                        smtp_port = int(st.session_state.get("smtp_port", 587))
+                        missing = [p for p in attachments if not os.path.isfile(p)]
+                        if missing:
+                            st.error(f"Missing {', '.join(os.path.basename(m) for m in missing)} for {job['title']}")
                         
-                        if not (from_address and app_password and smtp_server and smtp_port):
-                            st.error("Please enter your SMTP credentials in the sidebar before sending.")
                         else:
-            
-                            attachments = [
-                                os.path.join(job['folder'], 'CV_Custom.pdf'),
-                                os.path.join(job['folder'], 'Cover_Letter.pdf'),
-                            ]
-                            
-                            missing = [p for p in attachments if not os.path.isfile(p)]
-                            if missing:
-                                st.error(f"Missing {', '.join(os.path.basename(m) for m in missing)} for {job['title']}")
-                            
-                            else:
-                                try:
-                                    
-                                    success, status = send_application_email(
-                                        to_address=selected_email,
-                                        subject=f"Application: {job['title']} at {job['company']}",
-                                        body_text=(
-                                            "Dear Hiring Team,\n\n"
-                                            "Please find attached my CV and cover letter for your review.\n\n"
-                                            f"Best regards,\n{candidate_name}"
-                                        ),
-                                        attachments=attachments,
-                                        from_address=from_address,
-                                        app_password=app_password,
-                                        smtp_server=smtp_server,
-                                        smtp_port=smtp_port,
-                                    )
-                                    
-                                    if success:
-                                        st.session_state[sent_key] = {
-                                            "email": selected_email,
-                                            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                            "status": status   # you can also save the status if you want
-                                        }
-                                        st.rerun()
-                                        # st.success(f"{job['title']} → Sent ({status})")
-                                    else:
-                                        st.error(f"{job['title']} → Failed ({status})")
-                                except Exception as e:
-                                    st.error(f"❌ Error sending {job['title']}: {e}")  
-            
-        else:
-            st.markdown("📤 No Manual Send Option Available (no email found)")                                                                                                                                                                  
-        st.markdown("---")                                                
-
-    
-    csv_path = os.path.join(tempfile.gettempdir(), "job_results.csv")
-    results_df.to_csv(csv_path, index=False)
-    with open(csv_path, "rb") as f:
-        st.download_button("\U0001F4E5 Download Results CSV", data=f, file_name="job_results.csv", mime="text/csv")
+                            try:
+                                
+                                success, status = send_application_email(
+                                    to_address=selected_email,
+                                    subject=f"Application: {job['title']} at {job['company']}",
+                                    body_text=(
+                                        "Dear Hiring Team,\n\n"
+                                        "Please find attached my CV and cover letter for your review.\n\n"
+                                        f"Best regards,\n{candidate_name}"
+                                    ),
+                                    attachments=attachments,
+                                    from_address=from_address,
+                                    app_password=app_password,
+                                    smtp_server=smtp_server,
+                                    smtp_port=smtp_port,
+                                )
+                                
+                                if success:
+                                    st.session_state[sent_key] = {
+                                        "email": selected_email,
+                                        "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                        "status": status   # you can also save the status if you want
+                                    }
+                                    st.rerun(scope="fragment")
+                                    # st.success(f"{job['title']} → Sent ({status})")
+                                else:
+                                    st.error(f"{job['title']} → Failed ({status})")
+                            except Exception as e:
+                                st.error(f"❌ Error sending {job['title']}: {e}")  
+        
+    else:
+        st.markdown("📤 No Manual Send Option Available (no email found)")                                                                                                                                                                  
+    st.markdown("---")
 
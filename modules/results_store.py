@@ -0,0 +1,177 @@
+# ------------------ modules/results_store.py ------------------
+"""
+Columnar store for every scraped batch.
+
+Postings are appended to a Parquet dataset under results/store/, hive-
+partitioned by platform and scrape date:
+
+    results/store/platform=Linkedin/scrape_date=2025-06-01/part-<uuid>-0.parquet
+
+The schema is derived from `scrapers.models.JobPosting` plus the search
+context (keyword, search_location, scraped_at), so types survive the round
+trip. `query()` prunes partitions by platform / date and filters keywords
+inside the files, which keeps months of history cheap to read.
+`compact()` merges the small per-search files of one partition.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import fields
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:       # pyarrow not installed
+    pa = None
+
+from scrapers.models import JobPosting
+
+log = logging.getLogger(__name__)
+
+STORE_ROOT = Path("results/store")
+PARTITIONS = ["platform", "scrape_date"]
+
+
+def _arrow_type(name: str):
+    if name == "emails":
+        return pa.list_(pa.string())
+    if name == "easy_apply":
+        return pa.bool_()
+    return pa.string()
+
+
+def schema():
+    """JobPosting fields + search context + partition columns."""
+    cols = [pa.field(f.name, _arrow_type(f.name)) for f in fields(JobPosting)]
+    cols += [
+        pa.field("keyword", pa.string()),
+        pa.field("search_location", pa.string()),
+        pa.field("scraped_at", pa.timestamp("s", tz="UTC")),
+        pa.field("platform", pa.string()),
+        pa.field("scrape_date", pa.string()),
+    ]
+    return pa.schema(cols)
+
+
+def _emails(value) -> list[str] | None:
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value] or None
+    if isinstance(value, str) and value.strip():
+        return [e.strip() for e in value.replace(";", ",").split(",") if e.strip()]
+    return None
+
+
+def _str(value) -> str | None:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return str(value)
+
+
+def to_table(df: pd.DataFrame, *, platform: str, keyword: str, location: str):
+    """Project a scraper DataFrame (LinkedIn or JobSpy columns) onto the store schema."""
+    n = len(df)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def col(name, *fallbacks):
+        for c in (name, *fallbacks):
+            if c in df.columns:
+                return df[c].tolist()
+        return [None] * n
+
+    data = {
+        "title": [_str(v) for v in col("title")],
+        "company": [_str(v) for v in col("company")],
+        "location": [_str(v) for v in col("location")],
+        "job_id": [_str(v) for v in col("job_id", "id")],
+        "job_url": [_str(v) for v in col("job_url")],
+        "listed_at": [_str(v) for v in col("listed_at", "date_posted")],
+        "description": [_str(v) for v in col("description")],
+        "emails": [_emails(v) for v in col("emails")],
+        "easy_apply": [bool(v) if isinstance(v, bool) else False for v in col("easy_apply")],
+        "keyword": [keyword] * n,
+        "search_location": [location] * n,
+        "scraped_at": [now] * n,
+        "platform": [platform] * n,
+        "scrape_date": [now.date().isoformat()] * n,
+    }
+    return pa.Table.from_pydict(data, schema=schema())
+
+
+def append(df: pd.DataFrame, *, platform: str, keyword: str, location: str,
+           root: str | Path = STORE_ROOT) -> Path | None:
+    """Append one scraped batch; returns the partition directory written to."""
+    if df.empty:
+        return None
+    if pa is None:
+        log.warning("pyarrow not installed; scraped batch not stored.")
+        return None
+    table = to_table(df, platform=platform, keyword=keyword, location=location)
+    root = Path(root)
+    pq.write_to_dataset(
+        table,
+        root_path=str(root),
+        partition_cols=PARTITIONS,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+    )
+    return root / f"platform={platform}" / f"scrape_date={table['scrape_date'][0].as_py()}"
+
+
+def _dataset(root: str | Path):
+    return ds.dataset(str(root), format="parquet", partitioning="hive", schema=schema())
+
+
+def query(
+    *,
+    platforms: list[str] | str | None = None,
+    since: date | str | None = None,
+    until: date | str | None = None,
+    keywords: list[str] | str | None = None,
+    columns: list[str] | None = None,
+    root: str | Path = STORE_ROOT,
+) -> pd.DataFrame:
+    """Read postings across runs; platform/date filters only open matching partitions."""
+    if pa is None:
+        raise RuntimeError("pyarrow is required to query the results store")
+    if not Path(root).exists():
+        return pd.DataFrame(columns=columns or schema().names)
+
+    expr = None
+
+    def _and(e):
+        nonlocal expr
+        expr = e if expr is None else expr & e
+
+    if platforms:
+        _and(ds.field("platform").isin([platforms] if isinstance(platforms, str) else list(platforms)))
+    if since:
+        _and(ds.field("scrape_date") >= str(since))
+    if until:
+        _and(ds.field("scrape_date") <= str(until))
+    if keywords:
+        _and(ds.field("keyword").isin([keywords] if isinstance(keywords, str) else list(keywords)))
+
+    return _dataset(root).to_table(columns=columns, filter=expr).to_pandas()
+
+
+def compact(platform: str, scrape_date: str, root: str | Path = STORE_ROOT) -> int:
+    """Merge a partition's small files into one; returns the number of files merged."""
+    part = Path(root) / f"platform={platform}" / f"scrape_date={scrape_date}"
+    files = sorted(part.glob("*.parquet"))
+    if len(files) < 2:
+        return 0
+    file_schema = pa.schema([f for f in schema() if f.name not in PARTITIONS])
+    table = pa.concat_tables([pq.read_table(f, schema=file_schema) for f in files])
+    tmp = part / f"compact-{uuid.uuid4().hex}.parquet.tmp"
+    pq.write_table(table, tmp)
+    # merged file in place before the inputs go: a concurrent query (or a
+    # crash) in between can see rows twice, but the partition is never empty
+    tmp.rename(part / f"part-{uuid.uuid4().hex}-0.parquet")
+    for f in files:
+        f.unlink()
+    return len(files)
@@ -0,0 +1,203 @@
+# ------------------ modules/run_journal.py ------------------
+"""
+Checkpoint journal of a search run, so a crashed / cancelled / failed run
+can be resumed without redoing finished work.
+
+results/runs/<run_id>/journal.jsonl – append-only, one record per line,
+flushed and fsync'ed as it is written:
+
+    {"type": "run",   "spec": {...}}
+    {"type": "batch", "unit": [platform, location, term], "n": 12}
+    {"type": "score", "key": job_key, "score": 8, "reasoning": "...", "stamp": "..."}
+    {"type": "match", "key": job_key, "match": {...}}
+    {"type": "unit",  "unit": [platform, location, term], "keys": [job_key, ...]}
+
+plus results/runs/<run_id>/batches/<unit>.pkl, the postings of a grid cell
+as they were after identity / applied / dedup filtering (re-running that
+filter would drop them: they are already recorded for this run).
+
+Running the same run id again (`search_jobs.resume()`, `app.cli --resume`)
+skips finished grid cells, reuses the saved batch instead of scraping,
+the journaled scores instead of calling the LLM, and the generated
+documents whose folder still exists. A torn last line (crash mid-write)
+is cut off when the journal is opened, so the next record starts on a
+line of its own.
+
+In multi-profile runs the unit gets the profile name appended and job
+keys are stored as "<profile>/<job_key>" (the active profile, see
+`config.profile_loader.use_profile`), since every candidate has its own
+scores and documents.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from config.profile_loader import active_profile
+
+log = logging.getLogger(__name__)
+
+RUNS_DIR = Path("results/runs")
+JOURNAL = "journal.jsonl"
+
+
+def _k(job_key: str) -> str:
+    profile = active_profile()
+    return job_key if profile is None else f"{profile}/{job_key}"
+
+
+def _unit_id(unit) -> str:
+    return hashlib.sha1("\x1f".join(unit).lower().encode()).hexdigest()[:16]
+
+
+class RunJournal:
+    def __init__(self, run_id: str, root: str | Path = RUNS_DIR):
+        self.run_id = run_id
+        self.dir = Path(root) / run_id
+        self.path = self.dir / JOURNAL
+        self._lock = threading.Lock()
+        self.spec: dict | None = None
+        self._scores: dict[str, tuple[int, str, str | None]] = {}
+        self._matches: dict[str, dict] = {}
+        self._units: dict[tuple, list[str]] = {}
+        self._batches: set[tuple] = set()
+        self._load()
+
+    # ---------------- reading ----------------
+    def _load(self) -> None:
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return
+        if data and not data.endswith(b"\n"):
+            keep = data.rfind(b"\n") + 1
+            log.warning("dropping a torn last record of %s (%d bytes)", self.path, len(data) - keep)
+            with open(self.path, "r+b") as fh:
+                fh.truncate(keep)
+            data = data[:keep]
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                log.warning("skipping a damaged line in %s", self.path)
+                continue
+            kind = rec.get("type")
+            if kind == "run":
+                self.spec = rec["spec"]
+            elif kind == "batch":
+                self._batches.add(tuple(rec["unit"]))
+            elif kind == "score":
+                self._scores[rec["key"]] = (rec["score"], rec["reasoning"], rec.get("stamp"))
+            elif kind == "match":
+                self._matches[rec["key"]] = rec["match"]
+            elif kind == "unit":
+                self._units[tuple(rec["unit"])] = rec["keys"]
+
+    @property
+    def resumed(self) -> bool:
+        return self.spec is not None
+
+    def unit_matches(self, unit) -> list[dict] | None:
+        """Matches of a finished grid cell, None if it has to (re)run."""
+        keys = self._units.get(tuple(unit))
+        if keys is None:
+            return None
+        return [self._matches[k] for k in keys if k in self._matches]
+
+    def batch(self, unit) -> pd.DataFrame | None:
+        """Prepared postings saved for a grid cell, if it got that far."""
+        if tuple(unit) not in self._batches:
+            return None
+        try:
+            with open(self.dir / "batches" / f"{_unit_id(unit)}.pkl", "rb") as fh:
+                return pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError) as exc:
+            log.warning("checkpointed batch for %s unreadable (%s) – scraping again", unit, exc)
+            return None
+
+    def apply_scores(self, jobs_df: pd.DataFrame, stamp: str | None = None) -> pd.DataFrame:
+        """
+        Fill `prior_score` / `prior_reasoning` from journaled scores with the
+        current `stamp` (see `utils.score_stamp`), so they aren't asked again.
+        """
+        if jobs_df.empty or not self._scores:
+            return jobs_df
+        hits = [self._scores.get(_k(k)) for k in jobs_df["job_key"]]
+        hits = [h if h and h[2] == stamp else None for h in hits]
+        if not any(hits):
+            return jobs_df
+        jobs_df = jobs_df.copy()
+        old_s = jobs_df["prior_score"] if "prior_score" in jobs_df else [None] * len(jobs_df)
+        old_r = jobs_df["prior_reasoning"] if "prior_reasoning" in jobs_df else [None] * len(jobs_df)
+        jobs_df["prior_score"] = [h[0] if h else s for h, s in zip(hits, old_s)]
+        jobs_df["prior_reasoning"] = [h[1] if h else r for h, r in zip(hits, old_r)]
+        return jobs_df
+
+    def match(self, job_key: str) -> dict | None:
+        """Journaled match whose documents are still on disk."""
+        m = self._matches.get(_k(job_key))
+        if m is not None and os.path.isdir(m.get("folder", "")):
+            return m
+        return None
+
+    # ---------------- writing ----------------
+    def _append(self, rec: dict) -> None:
+        line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+                fh.flush()
+                os.fsync(fh.fileno())
+
+    def start(self, spec: dict) -> None:
+        if self.spec is None:
+            self.spec = spec
+            self._append({"type": "run", "spec": spec})
+        elif self.spec != spec:
+            log.warning("run %s resumed with a different spec – finished cells keep their old results",
+                        self.run_id)
+
+    def save_batch(self, unit, jobs_df: pd.DataFrame) -> None:
+        folder = self.dir / "batches"
+        folder.mkdir(parents=True, exist_ok=True)
+        tmp = folder / f".{_unit_id(unit)}.pkl.tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(jobs_df, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, folder / f"{_unit_id(unit)}.pkl")
+        self._batches.add(tuple(unit))
+        self._append({"type": "batch", "unit": list(unit), "n": len(jobs_df)})
+
+    def record_score(self, job_key: str, score: int, reasoning: str, stamp: str | None = None) -> None:
+        key = _k(job_key)
+        if self._scores.get(key) == (score, reasoning, stamp):
+            return
+        self._scores[key] = (score, reasoning, stamp)
+        self._append({"type": "score", "key": key, "score": score, "reasoning": reasoning, "stamp": stamp})
+
+    def record_match(self, match: dict) -> None:
+        key = _k(match["job_key"])
+        self._matches[key] = match
+        self._append({"type": "match", "key": key, "match": match})
+
+    def finish_unit(self, unit, matches: list[dict]) -> None:
+        keys = [_k(m["job_key"]) for m in matches]
+        self._units[tuple(unit)] = keys
+        self._append({"type": "unit", "unit": list(unit), "keys": keys})
+
+    def close(self, completed: bool) -> None:
+        """After a complete run the saved batches are no longer needed."""
+        if completed:
+            shutil.rmtree(self.dir / "batches", ignore_errors=True)
+
+
+def exists(run_id: str, root: str | Path = RUNS_DIR) -> bool:
+    return (Path(root) / run_id / JOURNAL).is_file()
@@ -0,0 +1,105 @@
+# ------------------ modules/scrape_cache.py ------------------
+"""
+On-disk TTL cache of raw scrape results.
+
+One entry per (platform, keyword, location, hours_old bucket, easy-apply
+flag), so adding a keyword only scrapes that keyword, and changing the
+score threshold / generation options re-scores cached postings instead
+of re-driving a browser. Entries are pickled DataFrames under
+results/scrape_cache/ and expire after SCRAPE_CACHE_TTL_H hours
+(env, default 6; 0 disables the cache).
+
+`hours_old` is rounded up to whole days: a 30 h and a 48 h search share
+an entry (the cached batch is a superset of what the shorter window
+would return, give or take the boundary).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import pickle
+import time
+from pathlib import Path
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = Path("results/scrape_cache")
+HOURS_BUCKET = 24
+
+
+def ttl_seconds() -> float:
+    return float(os.getenv("SCRAPE_CACHE_TTL_H", "6")) * 3600
+
+
+def _bucket(hours_old: int | None) -> int | None:
+    if not hours_old:
+        return None
+    return math.ceil(hours_old / HOURS_BUCKET) * HOURS_BUCKET
+
+
+def cache_key(platform: str, keyword: str, location: str, hours_old: int | None,
+              easy_apply: bool = False) -> str:
+    raw = json.dumps([
+        platform.lower(), keyword.strip().lower(), location.strip().lower(),
+        _bucket(hours_old), bool(easy_apply),
+    ])
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+def _path(key: str, root: Path) -> Path:
+    return Path(root) / f"{key}.pkl"
+
+
+def get(platform: str, keyword: str, location: str, hours_old: int | None,
+        easy_apply: bool = False, *, limit: int | None = None,
+        ttl_s: float | None = None, root: str | Path = CACHE_DIR) -> pd.DataFrame | None:
+    """Cached batch, or None when missing / expired / smaller than `limit` asked for."""
+    ttl_s = ttl_seconds() if ttl_s is None else ttl_s
+    if ttl_s <= 0:
+        return None
+    path = _path(cache_key(platform, keyword, location, hours_old, easy_apply), root)
+    try:
+        if time.time() - path.stat().st_mtime > ttl_s:
+            return None
+        with open(path, "rb") as fh:
+            entry = pickle.load(fh)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError) as exc:
+        if not isinstance(exc, FileNotFoundError):
+            log.warning("Unreadable scrape cache entry %s: %s", path.name, exc)
+        return None
+    # an earlier scrape asked for fewer results than we want now → miss
+    if limit and entry["limit"] < limit and len(entry["df"]) >= entry["limit"]:
+        return None
+    df = entry["df"]
+    return df.head(limit) if limit else df
+
+
+def put(df: pd.DataFrame, platform: str, keyword: str, location: str,
+        hours_old: int | None, easy_apply: bool = False, *, limit: int | None = None,
+        root: str | Path = CACHE_DIR) -> None:
+    if ttl_seconds() <= 0:
+        return
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    path = _path(cache_key(platform, keyword, location, hours_old, easy_apply), root)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        pickle.dump({"df": df, "limit": limit or len(df), "scraped_at": time.time()}, fh,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def purge(*, ttl_s: float | None = None, root: str | Path = CACHE_DIR) -> int:
+    """Delete expired entries (all entries with ttl_s=0); returns how many."""
+    ttl_s = ttl_seconds() if ttl_s is None else ttl_s
+    now, removed = time.time(), 0
+    for path in Path(root).glob("*.pkl"):
+        if now - path.stat().st_mtime > ttl_s:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -0,0 +1,207 @@
+# ------------------ modules/scraper_pool.py ------------------
+"""
+Process-wide pool of scraper instances (one browser each), shared by
+every dashboard session, search job and grid thread.
+
+    with POOL.lease("linkedin", headless=False) as scraper:
+        df = scraper.scrape(keyword=..., location=..., limit=...)
+
+A leased scraper belongs to one caller until it is returned, so two
+searches never drive the same page. Each platform gets at most
+SCRAPER_MAX_PER_PLATFORM instances (env, default 2; LinkedIn 1, since
+every window shares one logged-in account and cookie file – override
+with SCRAPER_MAX_<PLATFORM>, e.g. SCRAPER_MAX_LINKEDIN=2); further
+callers wait for a free one, up to SCRAPER_LEASE_TIMEOUT_S (default
+1800 s). An instance is closed once it has sat idle SCRAPER_IDLE_S
+(default 600 s), after a scrape raised (its browser may be in any state),
+and for all of them – leased ones included – by `close_all()`.
+Headed and headless instances are not interchangeable: a lease only
+reuses an idle instance of the mode it asks for, and closes an idle one
+of the other mode when that is what keeps it under the cap.
+
+The CLI and the worker call `close_all()` when they are done. Otherwise it
+runs from `atexit`. By then `concurrent.futures` takes no new work, so a
+scraper can no longer close its browser on its own thread. Its executor
+is shut down instead, and the browser ends with the process.
+"""
+from __future__ import annotations
+
+import atexit
+import contextlib
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX = 2
+PLATFORM_MAX = {"linkedin": 1}
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def max_instances(platform: str) -> int:
+    env = os.getenv(f"SCRAPER_MAX_{platform.upper()}") or os.getenv("SCRAPER_MAX_PER_PLATFORM")
+    if env:
+        return max(1, int(env))
+    return PLATFORM_MAX.get(platform, DEFAULT_MAX)
+
+
+def _close(platform: str, scraper) -> None:
+    close = getattr(scraper, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception as exc:            # noqa: BLE001 – a dead browser must not block the others
+        log.warning("closing a %s scraper failed: %s", platform, exc)
+        executor = getattr(scraper, "_executor", None)
+        if executor is not None:        # e.g. at interpreter exit: don't leave its thread waiting
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ScraperPool:
+    def __init__(self, factory=None, *, idle_s: float | None = None, lease_timeout_s: float | None = None):
+        self._factory = factory or self._from_registry
+        self.idle_s = _env_float("SCRAPER_IDLE_S", 600) if idle_s is None else idle_s
+        self.lease_timeout_s = (_env_float("SCRAPER_LEASE_TIMEOUT_S", 1800)
+                                if lease_timeout_s is None else lease_timeout_s)
+        self._cond = threading.Condition()
+        self._idle: dict[str, list[tuple[object, float, bool]]] = {}  # platform → [(scraper, returned at, headless)], LIFO
+        self._busy: dict[str, int] = {}                          # platform → leased + being created
+        self._leased: dict[int, tuple[str, object, bool]] = {}    # id(scraper) → (platform, scraper, headless)
+        self._closed = False
+        self._reaper: threading.Thread | None = None
+
+    @staticmethod
+    def _from_registry(platform: str, headless: bool):
+        from scrapers.registry import REGISTRY
+
+        return REGISTRY[platform](headless=headless)
+
+    # ---------------- leasing ----------------
+    def acquire(self, platform: str, *, headless: bool = False, timeout: float | None = None):
+        """An idle instance, a new one while under the cap, else wait for a return."""
+        platform = platform.lower()
+        timeout = self.lease_timeout_s if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        stale = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("scraper pool is closed")
+                idle = self._idle.setdefault(platform, [])
+                same = [i for i, (_, _, h) in enumerate(idle) if h == headless]
+                if same:
+                    scraper, _, _ = idle.pop(same[-1])  # most recently used: warmest browser
+                    self._busy[platform] = self._busy.get(platform, 0) + 1
+                    self._leased[id(scraper)] = (platform, scraper, headless)
+                    return scraper
+                if self._busy.get(platform, 0) + len(idle) < max_instances(platform):
+                    self._busy[platform] = self._busy.get(platform, 0) + 1
+                    break
+                if idle:                                # only the other mode is idle: replace the oldest
+                    stale = idle.pop(0)[0]
+                    self._busy[platform] = self._busy.get(platform, 0) + 1
+                    break
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise TimeoutError(
+                        f"no {platform} scraper free after {timeout:g} s "
+                        f"({max_instances(platform)} in use)"
+                    )
+                log.info("waiting for a free %s scraper (%d in use)", platform, self._busy[platform])
+                self._cond.wait(left)
+        if stale is not None:
+            _close(platform, stale)
+        try:                                            # browser start-up outside the lock
+            scraper = self._factory(platform, headless)
+        except BaseException:
+            with self._cond:
+                self._busy[platform] -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._leased[id(scraper)] = (platform, scraper, headless)
+        return scraper
+
+    def release(self, platform: str, scraper, *, broken: bool = False) -> None:
+        """Return a leased scraper; `broken` ones are closed instead of reused."""
+        platform = platform.lower()
+        with self._cond:
+            self._busy[platform] -= 1
+            leased = self._leased.pop(id(scraper), None)
+            if leased is None:
+                return                                  # already closed by close_all()
+            keep = not broken and not self._closed
+            if keep:
+                self._idle.setdefault(platform, []).append((scraper, time.monotonic(), leased[2]))
+                self._start_reaper()
+            self._cond.notify_all()
+        if not keep:
+            _close(platform, scraper)
+
+    @contextlib.contextmanager
+    def lease(self, platform: str, *, headless: bool = False, timeout: float | None = None):
+        scraper = self.acquire(platform, headless=headless, timeout=timeout)
+        try:
+            yield scraper
+        except BaseException:
+            self.release(platform, scraper, broken=True)
+            raise
+        self.release(platform, scraper)
+
+    # ---------------- housekeeping ----------------
+    def evict_idle(self) -> int:
+        """Close instances idle for longer than `idle_s`; returns how many."""
+        cutoff = time.monotonic() - self.idle_s
+        expired = []
+        with self._cond:
+            for platform, idle in self._idle.items():
+                expired += [(platform, s) for s, t, _ in idle if t <= cutoff]
+                idle[:] = [item for item in idle if item[1] > cutoff]
+        for platform, scraper in expired:
+            log.info("closing a %s scraper idle for over %.0f s", platform, self.idle_s)
+            _close(platform, scraper)
+        return len(expired)
+
+    def _start_reaper(self) -> None:
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap, name="scraper-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed or not any(self._idle.values()):
+                    self._reaper = None
+                    return
+                self._cond.wait(max(self.idle_s / 2, 1.0))
+            self.evict_idle()
+
+    def close_all(self) -> None:
+        """Close every instance, idle or leased (shutdown); the pool hands out no more."""
+        with self._cond:
+            self._closed = True
+            instances = [(p, s) for p, items in self._idle.items() for s, _, _ in items]
+            instances += [(p, s) for p, s, _ in self._leased.values()]
+            self._idle.clear()
+            self._leased.clear()
+            self._cond.notify_all()
+        for platform, scraper in instances:
+            _close(platform, scraper)
+
+    def stats(self) -> dict[str, dict]:
+        with self._cond:
+            names = set(self._idle) | set(self._busy)
+            return {
+                p: {"idle": len(self._idle.get(p, [])), "leased": self._busy.get(p, 0), "max": max_instances(p)}
+                for p in sorted(names)
+            }
+
+
+POOL = ScraperPool()
+atexit.register(POOL.close_all)
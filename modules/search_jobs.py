@@ -0,0 +1,404 @@
+# ------------------ modules/search_jobs.py ------------------
+"""
+Search runs as background jobs.
+
+`run_grid()` runs one platform × location × keyword grid (what the
+dashboard used to do inline). `submit()` starts it on a process-wide
+worker thread and returns a job id; the Streamlit script only polls
+`get_job(id)` for progress, so closing or reloading the tab doesn't stop
+the run and the script-runner thread is never blocked.
+
+Every job keeps a list of progress events ("scraped", "scored",
+"generated", "failed"), the matches found so far, and an ETA. Its state is
+mirrored to results/jobs/<id>.json (at most once a second), so a finished
+run can still be opened after the server restarts – a run that was still
+going at that point comes back as "interrupted".
+
+Every run is checkpointed in results/runs/<run_id>/journal.jsonl
+(`modules.run_journal`); `resume(job_id)` runs a failed, cancelled or
+interrupted job again under the same id and only does what is missing.
+
+With a document budget (`SearchSpec.max_documents` / `max_per_company`)
+the grid is scored first and CV / CL are generated afterwards, only for
+the best matches of the whole run ("shortlisted" events in between).
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from modules.llm_metrics import METRICS
+from modules import ollama_runtime, artifact_store, run_journal, model_routing
+
+log = logging.getLogger(__name__)
+
+JOBS_DIR = Path("results/jobs")
+RESULTS_FOLDER = "results"
+MAX_EVENTS = 200            # events kept per job (counters cover the rest)
+_FLUSH_EVERY_S = 1.0
+
+
+@dataclass
+class SearchSpec:
+    """Everything one search run needs; JSON-serialisable."""
+
+    platforms: list[str]
+    locations: list[str]
+    terms: list[str]
+    hours_old: int
+    results_wanted: int = 10
+    score_threshold: int = 7
+    generate_cv: bool = True
+    generate_cl: bool = True
+    debug: bool = False
+    easy_apply: bool = False
+    prefilter: int = 0
+    use_cache: bool = True
+    concurrency: int = 1            # platforms scraped/scored side by side
+    headless: bool = True           # scraper browsers without a window (cron / workers have no display)
+    profiles: list[str] = field(default_factory=list)   # multi-profile mode: names in config/profiles/
+    max_documents: int = 0          # CV / CL only for the N best matches of the run (per profile); 0 = all
+    max_per_company: int = 0        # at most N of those per company; 0 = no cap
+
+    @property
+    def budgeted(self) -> bool:
+        return self.max_documents > 0 or self.max_per_company > 0
+
+    @property
+    def units(self) -> list[tuple[str, str, str]]:
+        return [(p, l, t) for p in self.platforms for l in self.locations for t in self.terms]
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _unique_matches(matches: list[dict]) -> list[dict]:
+    """One match per (profile, job_key): two cells of a grid can find the same posting."""
+    seen = set()
+    out = []
+    for m in matches:
+        k = (m.get("profile"), m.get("job_key"))
+        if k not in seen:
+            seen.add(k)
+            out.append(m)
+    return out
+
+
+# --------------------------------------------------------------------- #
+#  grid runner (no Streamlit – also used by the CLI)
+# --------------------------------------------------------------------- #
+def run_grid(spec: SearchSpec, progress=None, *, run_id: str | None = None) -> tuple[list[dict], str]:
+    """
+    Run the whole search grid; returns (matches, run_id).
+    `progress(event, **data)` additionally receives "unit_started" /
+    "unit_done" (platform, location, term) around every grid cell.
+
+    Passing the `run_id` of an earlier, unfinished run resumes it from its
+    journal: finished cells only replay their matches.
+
+    With `spec.concurrency` > 1 the platforms run on separate threads; the
+    cells of one platform stay sequential. Scrapers are leased from
+    `modules.scraper_pool`, so concurrent runs never share a browser.
+
+    With `spec.budgeted` every cell only scores; the matches of the whole
+    grid are then ranked (`job_processing.select_top`) and documents are
+    generated for the selected ones, after a "generating" (n) event. The
+    matches left out are still returned, with `folder` None and `deferred`.
+
+    The LLM routes are resolved once, at the start (`model_routing.use_routes`):
+    another dashboard session changing the engine or per-task models does
+    not switch them under a running job.
+    """
+    with model_routing.use_routes(model_routing.snapshot(profiles=spec.profiles)):
+        return _run_grid(spec, progress, run_id)
+
+
+def _run_grid(spec: SearchSpec, progress, run_id: str | None) -> tuple[list[dict], str]:
+    from modules.job_processing import (
+        search_and_process_jobs, select_top, generate_shortlisted, without_documents,
+    )
+
+    def emit(event, **data):
+        if progress is not None:
+            progress(event, **data)
+
+    def run_units(units):
+        found = []
+        for platform, location, term in units:
+            emit("unit_started", platform=platform, location=location, term=term)
+            found.extend(search_and_process_jobs(
+                platform, term, location, spec.hours_old, spec.results_wanted,
+                score_threshold=spec.score_threshold,
+                generate_cv=spec.generate_cv,
+                generate_cl=spec.generate_cl,
+                debug=spec.debug,
+                ea_application=spec.easy_apply,
+                prefilter=spec.prefilter,
+                use_cache=spec.use_cache,
+                headless=spec.headless,
+                progress=progress,
+                journal=journal,
+                profiles=spec.profiles,
+                defer_generation=spec.budgeted,
+            ))
+            emit("unit_done", platform=platform, location=location, term=term)
+        return found
+
+    all_matches = []
+    tasks = ["score"] + ["keywords"] * spec.generate_cv + ["cover_letter"] * spec.generate_cl
+    ollama_models = model_routing.ollama_models(tasks)
+    use_ollama = bool(ollama_models)
+
+    with METRICS.run(run_id) as run_id:
+        journal = run_journal.RunJournal(run_id, os.path.join(RESULTS_FOLDER, "runs"))
+        if journal.resumed:
+            log.info("resuming run %s from its journal", run_id)
+        journal.start(asdict(spec))
+        if use_ollama:
+            # preload once and keep the routed models resident for the whole grid
+            ollama_runtime.start_session(
+                ollama_models,
+                tasks=[t for t, r in model_routing.routes(tasks).items() if r.backend == "ollama"],
+                expected_minutes=len(spec.units) * spec.results_wanted * 0.25,
+            )
+        try:
+            by_platform: dict[str, list] = {}
+            for unit in spec.units:
+                by_platform.setdefault(unit[0], []).append(unit)
+            workers = max(1, min(spec.concurrency, len(by_platform)))
+            if workers == 1:
+                all_matches = run_units(spec.units)
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grid") as pool:
+                    # copy_context: the worker threads keep this run's METRICS tag
+                    futures = [
+                        pool.submit(contextvars.copy_context().run, run_units, units)
+                        for units in by_platform.values()
+                    ]
+                    for fut in futures:
+                        all_matches.extend(fut.result())
+            all_matches = _unique_matches(all_matches)
+            if spec.budgeted:
+                selected = select_top(all_matches, spec.max_documents, spec.max_per_company)
+                log.info("document budget: %d of %d matches selected", len(selected), len(all_matches))
+                emit("generating", n=sum(1 for m in selected if m.get("deferred")), shortlisted=len(all_matches))
+                generated = generate_shortlisted(
+                    selected,
+                    generate_cv=spec.generate_cv,
+                    generate_cl=spec.generate_cl,
+                    debug=spec.debug,
+                    ea_application=spec.easy_apply,
+                    progress=progress,
+                    journal=journal,
+                )
+                # the budget only limits generation: the other matches stay, without documents
+                done = {(m.get("profile"), m["job_key"]): m for m in generated}
+                all_matches = [
+                    done.get((m.get("profile"), m["job_key"]))
+                    or (without_documents(m, spec.debug, spec.easy_apply) if m.get("deferred") else m)
+                    for m in all_matches
+                ]
+        finally:
+            if use_ollama:
+                ollama_runtime.end_session()
+        cells = [u + ((p,) if p else ()) for u in spec.units for p in (spec.profiles or [None])]
+        journal.close(completed=all(journal.unit_matches(c) is not None for c in cells))
+
+    # per-run LLM / stage timings next to the generated documents
+    METRICS.write_report(run_id, os.path.join(RESULTS_FOLDER, "runs", run_id))
+    # drop CV / CL blobs no job folder points to any more
+    artifact_store.gc(RESULTS_FOLDER)
+    return all_matches, run_id
+
+
+# --------------------------------------------------------------------- #
+#  background jobs
+# --------------------------------------------------------------------- #
+@dataclass
+class SearchJob:
+    id: str
+    spec: SearchSpec
+    status: str = "queued"          # queued | running | done | failed | cancelled | interrupted
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    units_total: int = 0
+    units_done: int = 0
+    unit_rows: int = 0              # postings to score in the current grid cell
+    unit_scored: int = 0
+    counts: dict = field(default_factory=lambda: {"scraped": 0, "scored": 0, "generated": 0, "failed": 0})
+    events: list = field(default_factory=list)
+    matches: list = field(default_factory=list)
+    current: str = ""
+    error: str | None = None
+    run_id: str | None = None
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._flushed = 0.0
+
+    # ---- views for the UI ----
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    @property
+    def fraction(self) -> float:
+        if not self.units_total:
+            return 0.0
+        within = self.unit_scored / self.unit_rows if self.unit_rows else 0.0
+        return min(1.0, (self.units_done + min(within, 1.0)) / self.units_total)
+
+    @property
+    def eta_s(self) -> float | None:
+        """Seconds left, extrapolated from the grid cells (and rows) done so far."""
+        f = self.fraction
+        if not self.started or f <= 0 or not self.active:
+            return None
+        return (time.time() - self.started) * (1 - f) / f
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = asdict(self)
+        data["fraction"], data["eta_s"] = self.fraction, self.eta_s
+        return data
+
+    def matches_so_far(self) -> list[dict]:
+        with self._lock:
+            return list(self.matches)
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    # ---- progress sink ----
+    def on_event(self, event: str, **data) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+        with self._lock:
+            if event == "unit_started":
+                self.current = f"{data['platform']} · {data['location']} · {data['term']}"
+                self.unit_rows = self.unit_scored = 0
+            elif event == "unit_done":
+                self.units_done += 1
+            else:
+                if event == "scraped":              # once per profile in multi-profile runs
+                    self.unit_rows += data.get("n", 0)
+                    self.counts["scraped"] += data.get("n", 0)
+                elif event == "scored":
+                    self.unit_scored += 1
+                    self.counts["scored"] += 1
+                elif event == "generated":
+                    self.matches.append(data["match"])
+                    self.counts["generated"] += 1
+                    data = {"title": data["match"]["title"], "company": data["match"]["company"]}
+                elif event == "failed":
+                    self.counts["failed"] += 1
+                elif event == "shortlisted":
+                    self.counts["shortlisted"] = self.counts.get("shortlisted", 0) + 1
+                elif event == "generating":
+                    self.current = f"Generating documents for the best {data['n']} match(es)"
+                self.events.append({"t": round(time.time(), 1), "event": event, **data})
+                del self.events[:-MAX_EVENTS]
+        self._flush()
+
+    # ---- persistence ----
+    def _flush(self, force: bool = False) -> None:
+        now = time.time()
+        if not force and now - self._flushed < _FLUSH_EVERY_S:
+            return
+        self._flushed = now
+        JOBS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = JOBS_DIR / f".{self.id}.json.tmp"
+        tmp.write_text(json.dumps(self.snapshot(), default=str), encoding="utf-8")
+        os.replace(tmp, JOBS_DIR / f"{self.id}.json")
+
+    @classmethod
+    def load(cls, job_id: str) -> "SearchJob | None":
+        path = JOBS_DIR / f"{job_id}.json"
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        data.pop("fraction", None)
+        data.pop("eta_s", None)
+        data["spec"] = SearchSpec(**data["spec"])
+        job = cls(**data)
+        if job.active:
+            job.status = "interrupted"          # the process running it is gone
+        return job
+
+
+_JOBS: dict[str, SearchJob] = {}
+_JOBS_LOCK = threading.Lock()
+# runs of all dashboard sessions side by side, up to SEARCH_JOB_WORKERS (env, default 2); more
+# are queued. Each run leases its browsers from modules.scraper_pool (capped per platform).
+_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, int(os.getenv("SEARCH_JOB_WORKERS", "2"))),
+                               thread_name_prefix="search-job")
+
+
+def _run(job: SearchJob) -> None:
+    if job._cancel.is_set():                    # cancelled while still queued
+        job.status, job.finished = "cancelled", time.time()
+        job._flush(force=True)
+        return
+    job.status, job.started = "running", time.time()
+    job.units_total = len(job.spec.units)
+    job.run_id = job.id
+    job._flush(force=True)
+    try:
+        matches, job.run_id = run_grid(job.spec, job.on_event, run_id=job.id)
+        if job.spec.budgeted:               # + the matches outside the document budget
+            with job._lock:
+                job.matches = matches
+        job.status = "done"
+    except JobCancelled:
+        job.status = "cancelled"
+    except Exception as exc:                    # noqa: BLE001 – surfaced in the UI
+        log.exception("search job %s failed", job.id)
+        job.status, job.error = "failed", f"{type(exc).__name__}: {exc}"
+    finally:
+        job.finished = time.time()
+        job._flush(force=True)
+
+
+def submit(spec: SearchSpec, *, job_id: str | None = None) -> str:
+    """Queue a search; returns its job id."""
+    job = SearchJob(id=job_id or uuid.uuid4().hex[:12], spec=spec)
+    with _JOBS_LOCK:
+        _JOBS[job.id] = job
+    job._flush(force=True)
+    _EXECUTOR.submit(_run, job)
+    return job.id
+
+
+def resume(job_id: str) -> str:
+    """Run an unfinished job again under its own id; finished work is taken from its journal."""
+    job = get_job(job_id)
+    if job is None:
+        raise KeyError(job_id)
+    if job.active:
+        return job_id
+    return submit(job.spec, job_id=job_id)
+
+
+def get_job(job_id: str) -> SearchJob | None:
+    """Live job of this process, else the last state saved on disk."""
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+    return job or SearchJob.load(job_id)
+
+
+def cancel(job_id: str) -> None:
+    job = get_job(job_id)
+    if job is not None:
+        job.cancel()
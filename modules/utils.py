@@ -5,18 +5,19 @@ Dependencies: ollama, langdetect
 """
 import os
 import re
+import sys
+import time
 import logging
+from dataclasses import asdict
 
-import streamlit as st
-from config.profile_loader import load_profile
-from modules.prompts import CV_KEYWORD_EXTRACTION_PROMPT, SCORE_JOB_MATCH_PROMPT
+from modules.prompts import keyword_messages, score_job_match_messages, prompt_text
+from modules.local_scorer import local_score, local_keywords
+from modules.llm_metrics import METRICS, LLMCall, COLD_LOAD_S
+from modules.llm_limits import guard_for, retrying
+from modules import ollama_runtime
+from modules.model_routing import route
+from config.profile_loader import profile_version
 
-RAW_PROFILE = load_profile() or {}
-PROFILE = {
-    "background": RAW_PROFILE.get("background", ""),
-    "skills": RAW_PROFILE.get("skills", []),
-    "objective": RAW_PROFILE.get("objective", "")
-}
 log = logging.getLogger(__name__)
 
 
@@ -41,27 +42,168 @@ def load_search_terms(file_path: str) -> list[str]:
 #  L L M  helpers
 # --------------------------------------------------------------------- #
 
-def llm_chat(messages: list[dict], model: str):
+# Completion caps per task (tokens). Scoring only needs "<int> – <one sentence>",
+# so anything beyond that is a justification nobody reads but we still pay for.
+MAX_TOKENS = {
+    "score": 60,
+    "keywords": 120,
+    "cover_letter": 900,
+}
+
+
+def llm_chat(
+    messages: list[dict],
+    model: str,
+    *,
+    task: str | None = None,
+    backend: str | None = None,
+    max_tokens: int | None = None,
+    stop=None,
+):
     """
     Dispatch either to Ollama or OpenAI v1.x API, returning a dict
-    with {"message": {"content": ...}}.
+    with {"message": {"content": ...}, "metrics": {...}}.
+
+    The completion is streamed. `stop(text_so_far) -> bool` lets the caller
+    end the generation as soon as it has what it needs; `max_tokens` defaults
+    to MAX_TOKENS[task]. Every call is recorded in `llm_metrics.METRICS`.
+
+    Calls are paced by the backend's shared rate limiter and retried with
+    jittered backoff on 429 / timeouts (see `modules.llm_limits`); once the
+    backend's circuit breaker is open this raises `BackendUnavailable`.
+    `backend` defaults to LLM_BACKEND; callers pass their task's route
+    (`modules.model_routing`).
     """
-    backend = os.getenv("LLM_BACKEND", "ollama")
+    backend = backend or os.getenv("LLM_BACKEND", "ollama")
+    if max_tokens is None:
+        max_tokens = MAX_TOKENS.get(task)
 
-    if backend == "openai":
-        # New 1.0+ interface
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", ""))
-        resp = client.chat.completions.create(
-            model=model,
-            messages=messages
-        )
-        return {"message": {"content": resp.choices[0].message.content}}
+    guard = guard_for(backend)
+    for attempt in retrying(backend):
+        with attempt:
+            guard.before_call()
+            try:
+                resp = _chat_once(backend, messages, model, task, max_tokens, stop)
+            except Exception as exc:
+                guard.on_failure(exc)
+                raise
+            guard.on_success()
+            return resp
 
+
+def _chat_once(backend, messages, model, task, max_tokens, stop) -> dict:
+    """One streamed round-trip, recorded in METRICS whatever happens."""
+    call = LLMCall(backend=backend, model=model, task=task)
+    if backend == "openai":
+        pieces = _openai_stream(model, messages, max_tokens, call)
     else:
-        # Your existing Ollama logic
-        import ollama
-        return ollama.chat(model=model, messages=messages)
+        pieces = _ollama_stream(model, messages, max_tokens, call, task)
+
+    content, n_pieces = "", 0
+    t0 = time.perf_counter()
+    try:
+        for piece in pieces:
+            if piece and call.ttft_s is None:
+                call.ttft_s = time.perf_counter() - t0
+            content += piece
+            n_pieces += 1
+            if stop is not None and stop(content):
+                call.stopped_early = True
+                break
+    except Exception as exc:
+        call.error = str(exc)
+        raise
+    finally:
+        # closing the stream drops the connection → the backend stops generating
+        pieces.close()
+        call.latency_s = time.perf_counter() - t0
+        if call.completion_tokens is None:
+            # stream cut before the backend reported usage: ~1 token per chunk
+            call.estimated = True
+            call.completion_tokens = n_pieces
+            call.prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        METRICS.record(call)
+
+    return {"message": {"content": content}, "metrics": asdict(call)}
+
+
+def _openai_stream(model: str, messages: list[dict], max_tokens: int | None, call: LLMCall):
+    # New 1.0+ interface
+    from openai import OpenAI
+    # no retries inside the SDK: llm_limits.retrying paces and counts every attempt
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", ""), max_retries=0)
+    extra = {"max_tokens": max_tokens} if max_tokens else {}
+    raw = client.chat.completions.with_raw_response.create(
+        model=model,
+        messages=messages,
+        stream=True,
+        stream_options={"include_usage": True},
+        **extra,
+    )
+    guard_for("openai").bucket.update_from_headers(raw.headers)
+    stream = raw.parse()
+    try:
+        for chunk in stream:
+            if chunk.usage:                       # final chunk, choices == []
+                call.prompt_tokens = chunk.usage.prompt_tokens
+                call.completion_tokens = chunk.usage.completion_tokens
+                details = getattr(chunk.usage, "prompt_tokens_details", None)
+                call.cached_tokens = getattr(details, "cached_tokens", None)
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+    finally:
+        stream.close()
+
+
+def _ollama_stream(model: str, messages: list[dict], max_tokens: int | None, call: LLMCall, task=None):
+    # Your existing Ollama logic
+    import ollama
+    options = {"num_ctx": ollama_runtime.num_ctx_for(task, messages, max_tokens)}
+    # Ollama doesn't report KV-cache reuse: guess it from the prefix shared with the
+    # model's previous prompt (kept if the stream is cut early). Only a hint – wrong
+    # whenever calls interleave – so it never goes into the measured `cached_tokens`
+    call.cached_tokens_est = ollama_runtime.shared_prefix_tokens(model, messages)
+    if max_tokens:
+        options["num_predict"] = max_tokens
+    stream = ollama.chat(
+        model=model,
+        messages=messages,
+        stream=True,
+        options=options,
+        keep_alive=ollama_runtime.keep_alive(),
+    )
+    try:
+        for chunk in stream:
+            if chunk.get("done"):                 # final chunk carries the eval stats (ns)
+                call.prompt_tokens = chunk.get("prompt_eval_count")
+                call.completion_tokens = chunk.get("eval_count")
+                call.load_s = (chunk.get("load_duration") or 0) / 1e9
+                call.prompt_eval_s = (chunk.get("prompt_eval_duration") or 0) / 1e9
+                call.eval_s = (chunk.get("eval_duration") or 0) / 1e9
+                if (call.load_s or 0) > COLD_LOAD_S:
+                    call.cached_tokens_est = 0    # just (re)loaded: nothing was cached
+            yield chunk["message"]["content"]
+    finally:
+        stream.close()
+
+
+def _score_stop(with_reasoning: bool):
+    """
+    Stop condition for `score_job_match`: the prompt asks for the integer
+    first, so stop right after it, or after the one justifying sentence
+    when the reasoning is going to be shown.
+    """
+    def stop(text: str) -> bool:
+        text = text.lstrip()
+        m = re.search(r"\d+", text[:40])
+        if not m or m.end() == len(text):      # "1" may still become "10"
+            return False
+        if not with_reasoning:
+            return True
+        tail = text[m.end():].lstrip(" \t\n/0123456789–—-:.,")
+        return bool(re.search(r"[.!?](?=\s)|\n", tail))
+
+    return stop
 
 
 def extract_keywords(job_desc: str, *, debug: bool = False) -> list[str]:
@@ -69,11 +211,14 @@ def extract_keywords(job_desc: str, *, debug: bool = False) -> list[str]:
     if not job_desc or len(job_desc.strip()) < 20:
         return []
 
-    prompt = CV_KEYWORD_EXTRACTION_PROMPT.format(job_desc=job_desc)
+    r = route("keywords")
+    if r.backend == "local":
+        return local_keywords(job_desc)
+
+    messages = keyword_messages(job_desc)
 
     try:
-        model = "gpt-3.5-turbo" if os.getenv("LLM_BACKEND")=="openai" else "llama3"
-        resp = llm_chat([{"role":"user","content":prompt}], model=model)
+        resp = llm_chat(messages, model=r.model, task="keywords", backend=r.backend)
 
         # allow comma **or** newline separated output
         content = resp["message"]["content"]
@@ -104,16 +249,63 @@ def extract_keywords(job_desc: str, *, debug: bool = False) -> list[str]:
             raise 
         return []
 
-def score_job_match(job_desc: str, *, debug: bool = False) -> tuple[int, str, str]:
+def _streamlit():
+    """
+    The streamlit module when called from a Streamlit script thread, else
+    None. Never imports it, so CLI / worker runs don't load Streamlit.
+    """
+    st = sys.modules.get("streamlit")
+    if st is None:
+        return None
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return st if get_script_run_ctx(suppress_warning=True) is not None else None
+    except Exception:
+        return None
+
+
+def _show_debug(title: str, text: str, *, error: bool = False) -> None:
+    """Debug output: in the dashboard when there is one, otherwise in the log."""
+    st = _streamlit()
+    if st is None:
+        (log.warning if error else log.info)("%s:\n%s", title, text)
+    elif error:
+        st.error(f"{title}: {text}")
+    else:
+        st.expander(title).code(text)
+
+
+def score_stamp() -> str:
+    """What a stored score depends on: the scoring route and the profile version."""
+    return f"{route('score')}|{profile_version()}"
+
+
+def score_job_match(job_desc: str, *, debug: bool = False) -> tuple[int, str, str, bool]:
     """
     Ask the LLM for a 0-10 suitability score.
-    Returns (score, reasoning, prompt)
+    Returns (score, reasoning, prompt, fell_back)
+
+    When scoring is routed to "local" (e.g. LLM_BACKEND=local), or if the
+    LLM call fails, the deterministic local scorer answers instead, so a
+    job is never dropped as "0". `fell_back` is True in the latter case:
+    such a score must not be stored as the posting's score.
     """
-    prompt = SCORE_JOB_MATCH_PROMPT.format(job_desc=job_desc)
+    r = route("score")
+    if r.backend == "local":
+        score, reasoning = local_score(job_desc)
+        return score, reasoning, "", False
+
+    messages = score_job_match_messages(job_desc)
+    prompt = prompt_text(messages)
 
     try:
-        model = "gpt-3.5-turbo" if os.getenv("LLM_BACKEND")=="openai" else "llama3"
-        resp = llm_chat([{"role":"user","content":prompt}], model=model)
+        resp = llm_chat(
+            messages,
+            model=r.model,
+            task="score",
+            backend=r.backend,
+            stop=_score_stop(with_reasoning=debug),
+        )
         content = resp["message"]["content"].strip()
 
         m = re.search(r"\bscore\s*[=:]?\s*(\d+)", content, flags=re.I) or \
@@ -122,14 +314,16 @@ def score_job_match(job_desc: str, *, debug: bool = False) -> tuple[int, str, st
         score = max(0, min(score, 10))        # allow genuine zero
 
         if debug:
-            st.expander("LLM score prompt / response").code(
-                f"### PROMPT\n{prompt}\n\n### RESPONSE\n{content}"
+            _show_debug(
+                "LLM score prompt / response",
+                f"### PROMPT\n{prompt}\n\n### RESPONSE\n{content}",
             )
 
-        return score, content, prompt
+        return score, content, prompt, False
 
     except Exception as exc:
         log.warning("⚠️ scoring failed: %s", exc)
         if debug:
-            st.error(f"LLM scoring error: {exc}")
-        return 0, f"[Error: {exc}]", prompt
+            _show_debug("LLM scoring error", str(exc), error=True)
+        score, reasoning = local_score(job_desc)
+        return score, f"[LLM error: {exc} → local fallback] {reasoning}", prompt, True
@@ -0,0 +1,360 @@
+# ------------------ modules/work_queue.py ------------------
+"""
+Shared task queue for running a search grid on several workers / hosts.
+
+Tasks ("scrape", "score", "generate" – see `modules.queue_runner`) carry a
+JSON payload and belong to a run. A worker `claim()`s a task under a lease,
+extends it with `heartbeat()` while working, then `complete()`s or
+`fail()`s it. A task whose lease runs out (worker crashed / lost) goes
+back to pending until `max_attempts` is used up, then it is failed.
+
+`put(..., task_id=...)` is idempotent: a task id that already exists is
+not queued again, so a retried task re-creating its children (with ids
+derived from its own, `task_id()`) doesn't duplicate them.
+
+Backends, picked by URL (`open_queue()`, env WORK_QUEUE_URL):
+
+• sqlite:///results/work_queue.sqlite  (default) – any number of worker
+  processes on one machine (or a filesystem with working locks).
+• redis://host:6379/0 – workers on several hosts. Needs the `redis`
+  package; any client with the redis-py API (e.g. fakeredis) can be
+  passed to `RedisQueue(client=...)` instead.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import redis
+    from redis.exceptions import WatchError
+except ImportError:       # redis not installed → SQLite only (or an injected client)
+    redis = None
+
+    class WatchError(Exception):
+        pass
+
+DEFAULT_URL = "sqlite:///results/work_queue.sqlite"
+LEASE_S = 300
+MAX_ATTEMPTS = 3
+
+
+@dataclass
+class Task:
+    id: str
+    run_id: str
+    kind: str
+    payload: dict
+    status: str = "pending"         # pending | leased | done | failed
+    attempts: int = 0
+    max_attempts: int = MAX_ATTEMPTS
+    owner: str | None = None
+    lease_expires: float | None = None
+    result: dict | list | None = None
+    error: str | None = None
+    created: float = field(default_factory=time.time)
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex
+
+
+def task_id(run_id: str, kind: str, *parts) -> str:
+    """Deterministic id of a task, from its run, kind and what identifies it within the run."""
+    key = json.dumps([run_id, kind, *parts], default=str, separators=(",", ":"))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+# --------------------------------------------------------------------- #
+#  SQLite
+# --------------------------------------------------------------------- #
+class SQLiteQueue:
+    """Queue table in one SQLite file; claims run in BEGIN IMMEDIATE transactions."""
+
+    def __init__(self, path: str | Path = "results/work_queue.sqlite"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id            TEXT PRIMARY KEY,
+                run_id        TEXT NOT NULL,
+                kind          TEXT NOT NULL,
+                payload       TEXT NOT NULL,
+                status        TEXT NOT NULL DEFAULT 'pending',
+                attempts      INTEGER NOT NULL DEFAULT 0,
+                max_attempts  INTEGER NOT NULL DEFAULT 3,
+                owner         TEXT,
+                lease_expires REAL,
+                result        TEXT,
+                error         TEXT,
+                created       REAL NOT NULL,
+                seq           INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS ix_tasks_claim ON tasks(status, kind, seq);
+            CREATE INDEX IF NOT EXISTS ix_tasks_run ON tasks(run_id, kind, status);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _task(row: sqlite3.Row) -> Task:
+        d = dict(row)
+        d.pop("seq", None)
+        d["payload"] = json.loads(d["payload"])
+        d["result"] = json.loads(d["result"]) if d["result"] is not None else None
+        return Task(**d)
+
+    def put(self, run_id: str, kind: str, payload: dict, *, max_attempts: int = MAX_ATTEMPTS,
+            task_id: str | None = None) -> str:
+        tid = task_id or _new_id()
+        self._conn().execute(
+            "INSERT OR IGNORE INTO tasks (id, run_id, kind, payload, max_attempts, created, seq) "
+            "VALUES (?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM tasks))",
+            (tid, run_id, kind, json.dumps(payload, default=str), max_attempts, time.time()),
+        )
+        return tid
+
+    def claim(self, worker: str, kinds: list[str] | None = None, lease_s: float = LEASE_S) -> Task | None:
+        conn, now = self._conn(), time.time()
+        kind_sql = f" AND kind IN ({', '.join('?' * len(kinds))})" if kinds else ""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # expired leases: retry, or give up after max_attempts
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+                "error = COALESCE(error, 'lease expired'), owner = NULL "
+                "WHERE status = 'leased' AND lease_expires < ?", (now,),
+            )
+            row = conn.execute(
+                f"SELECT id FROM tasks WHERE status = 'pending'{kind_sql} ORDER BY seq LIMIT 1",
+                list(kinds or []),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE id = ?", (worker, now + lease_s, row["id"]),
+            )
+            task = self._task(conn.execute("SELECT * FROM tasks WHERE id = ?", (row["id"],)).fetchone())
+            conn.execute("COMMIT")
+            return task
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def heartbeat(self, task_id: str, worker: str, lease_s: float = LEASE_S) -> bool:
+        cur = self._conn().execute(
+            "UPDATE tasks SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+            (time.time() + lease_s, task_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, task_id: str, worker: str, result=None) -> bool:
+        cur = self._conn().execute(
+            "UPDATE tasks SET status = 'done', result = ?, lease_expires = NULL "
+            "WHERE id = ? AND owner = ? AND status = 'leased'",
+            (json.dumps(result, default=str), task_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, task_id: str, worker: str, error: str, *, retry: bool = True) -> bool:
+        cur = self._conn().execute(
+            "UPDATE tasks SET status = CASE WHEN ? AND attempts < max_attempts THEN 'pending' ELSE 'failed' END, "
+            "error = ?, owner = NULL, lease_expires = NULL "
+            "WHERE id = ? AND owner = ? AND status = 'leased'",
+            (int(retry), error, task_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def tasks(self, run_id: str, kind: str | None = None, status: str | None = None) -> list[Task]:
+        sql, params = "SELECT * FROM tasks WHERE run_id = ?", [run_id]
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        return [self._task(r) for r in self._conn().execute(sql + " ORDER BY seq", params)]
+
+    def counts(self, run_id: str) -> dict[str, dict[str, int]]:
+        """{kind: {status: n}} for one run."""
+        out: dict[str, dict[str, int]] = {}
+        for r in self._conn().execute(
+            "SELECT kind, status, COUNT(*) FROM tasks WHERE run_id = ? GROUP BY kind, status", (run_id,)
+        ):
+            out.setdefault(r[0], {})[r[1]] = r[2]
+        return out
+
+
+# --------------------------------------------------------------------- #
+#  Redis
+# --------------------------------------------------------------------- #
+class RedisQueue:
+    """
+    Keys (under `prefix`): task:<id> hash, pending:<kind> list,
+    leases zset (id → expiry), run:<run_id> set of task ids, ids hash
+    (task id → run id, HSETNX makes `put` idempotent).
+    Claims are WATCH/MULTI transactions, so two workers never get the same task.
+    """
+
+    _FIELDS = ("run_id", "kind", "payload", "status", "attempts", "max_attempts",
+               "owner", "lease_expires", "result", "error", "created")
+    KINDS = ("scrape", "score", "generate")
+
+    def __init__(self, url: str | None = None, *, client=None, prefix: str = "jobbot:queue"):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("the `redis` package is required for a redis:// work queue")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.r = client
+        self.prefix = prefix
+
+    def _k(self, *parts) -> str:
+        return ":".join((self.prefix, *map(str, parts)))
+
+    @staticmethod
+    def _s(value):
+        return value.decode() if isinstance(value, bytes) else value
+
+    def _load(self, task_id: str) -> Task | None:
+        raw = {self._s(k): self._s(v) for k, v in self.r.hgetall(self._k("task", task_id)).items()}
+        if not raw:
+            return None
+        return Task(
+            id=task_id, run_id=raw["run_id"], kind=raw["kind"], payload=json.loads(raw["payload"]),
+            status=raw["status"], attempts=int(raw.get("attempts", 0)),
+            max_attempts=int(raw.get("max_attempts", MAX_ATTEMPTS)),
+            owner=raw.get("owner") or None,
+            lease_expires=float(raw["lease_expires"]) if raw.get("lease_expires") else None,
+            result=json.loads(raw["result"]) if raw.get("result") else None,
+            error=raw.get("error") or None, created=float(raw["created"]),
+        )
+
+    def put(self, run_id: str, kind: str, payload: dict, *, max_attempts: int = MAX_ATTEMPTS,
+            task_id: str | None = None) -> str:
+        tid = task_id or _new_id()
+        if not self.r.hsetnx(self._k("ids"), tid, run_id):
+            return tid                          # already queued (a retried parent)
+        pipe = self.r.pipeline()
+        pipe.hset(self._k("task", tid), mapping={
+            "run_id": run_id, "kind": kind, "payload": json.dumps(payload, default=str),
+            "status": "pending", "attempts": 0, "max_attempts": max_attempts,
+            "owner": "", "lease_expires": "", "result": "", "error": "", "created": time.time(),
+        })
+        pipe.sadd(self._k("run", run_id), tid)
+        pipe.rpush(self._k("pending", kind), tid)
+        pipe.execute()
+        return tid
+
+    def _reap(self) -> None:
+        """Requeue (or fail) tasks whose lease expired; ZREM decides who handles each one."""
+        for tid in self.r.zrangebyscore(self._k("leases"), "-inf", time.time()):
+            tid = self._s(tid)
+            if not self.r.zrem(self._k("leases"), tid):
+                continue                        # another worker got it
+            task = self._load(tid)
+            if task is None or task.status != "leased":
+                continue
+            if task.attempts >= task.max_attempts:
+                self.r.hset(self._k("task", tid), mapping={"status": "failed", "owner": "",
+                                                           "error": task.error or "lease expired"})
+            else:
+                self.r.hset(self._k("task", tid), mapping={"status": "pending", "owner": ""})
+                self.r.rpush(self._k("pending", task.kind), tid)
+
+    def claim(self, worker: str, kinds: list[str] | None = None, lease_s: float = LEASE_S) -> Task | None:
+        self._reap()
+        for kind in kinds or self.KINDS:
+            key = self._k("pending", kind)
+            with self.r.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(key)
+                        tid = pipe.lindex(key, 0)
+                        if tid is None:
+                            pipe.unwatch()
+                            break
+                        tid = self._s(tid)
+                        expires = time.time() + lease_s
+                        pipe.multi()
+                        pipe.lpop(key)
+                        pipe.zadd(self._k("leases"), {tid: expires})
+                        pipe.hset(self._k("task", tid), mapping={
+                            "status": "leased", "owner": worker, "lease_expires": expires,
+                        })
+                        pipe.hincrby(self._k("task", tid), "attempts", 1)
+                        pipe.execute()
+                        return self._load(tid)
+                    except WatchError:          # list changed under us – retry
+                        continue
+        return None
+
+    def _owned(self, task_id: str, worker: str) -> bool:
+        owner, status = self.r.hmget(self._k("task", task_id), "owner", "status")
+        return self._s(owner) == worker and self._s(status) == "leased"
+
+    def heartbeat(self, task_id: str, worker: str, lease_s: float = LEASE_S) -> bool:
+        if not self._owned(task_id, worker):
+            return False
+        expires = time.time() + lease_s
+        self.r.zadd(self._k("leases"), {task_id: expires}, xx=True)
+        self.r.hset(self._k("task", task_id), "lease_expires", expires)
+        return True
+
+    def complete(self, task_id: str, worker: str, result=None) -> bool:
+        if not self.r.zrem(self._k("leases"), task_id) or not self._owned(task_id, worker):
+            return False
+        self.r.hset(self._k("task", task_id), mapping={
+            "status": "done", "result": json.dumps(result, default=str), "lease_expires": "",
+        })
+        return True
+
+    def fail(self, task_id: str, worker: str, error: str, *, retry: bool = True) -> bool:
+        if not self.r.zrem(self._k("leases"), task_id) or not self._owned(task_id, worker):
+            return False
+        task = self._load(task_id)
+        if retry and task.attempts < task.max_attempts:
+            self.r.hset(self._k("task", task_id), mapping={"status": "pending", "owner": "", "error": error})
+            self.r.rpush(self._k("pending", task.kind), task_id)
+        else:
+            self.r.hset(self._k("task", task_id), mapping={"status": "failed", "owner": "", "error": error})
+        return True
+
+    def tasks(self, run_id: str, kind: str | None = None, status: str | None = None) -> list[Task]:
+        out = [self._load(self._s(t)) for t in self.r.smembers(self._k("run", run_id))]
+        out = [t for t in out if t and (not kind or t.kind == kind) and (not status or t.status == status)]
+        return sorted(out, key=lambda t: t.created)
+
+    def counts(self, run_id: str) -> dict[str, dict[str, int]]:
+        out: dict[str, dict[str, int]] = {}
+        for t in self.tasks(run_id):
+            out.setdefault(t.kind, {}).setdefault(t.status, 0)
+            out[t.kind][t.status] += 1
+        return out
+
+
+# --------------------------------------------------------------------- #
+def open_queue(url: str | None = None):
+    """Queue for `url` (or WORK_QUEUE_URL, default: SQLite under results/)."""
+    url = url or os.getenv("WORK_QUEUE_URL") or DEFAULT_URL
+    if url.startswith("sqlite:///"):
+        return SQLiteQueue(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisQueue(url)
+    raise ValueError(f"Unsupported work queue URL: {url}")
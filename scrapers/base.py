@@ -5,12 +5,16 @@ from __future__ import annotations
 import abc, os
 from pathlib import Path
 import pandas as pd
-from dataclasses import asdict, is_dataclass
+from dataclasses import is_dataclass
+
+from scrapers.batch import postings_to_frame, compact_frame
 
 
 class BaseScraper(abc.ABC):
     """Minimal common API – subclasses must implement scrape()."""
 
+    platform: str           # set by every subclass, used as registry key & store partition
+
     def __init__(self, *, headless: bool = True, output_dir: str | os.PathLike = "results"):
         self.headless   = headless
         self.output_dir = Path(output_dir)
@@ -29,18 +33,22 @@ class BaseScraper(abc.ABC):
     # ---------------- convenience helpers ----------------
     @staticmethod
     def _to_dataframe(postings: list) -> pd.DataFrame:
-        """Convert list[JobPosting] → pd.DataFrame"""
+        """Convert list[JobPosting] → compact pd.DataFrame (see scrapers.batch)"""
         if not postings:
             return pd.DataFrame()
-        rows = [
-            asdict(p) if is_dataclass(p) else vars(p)         # works with __slots__
-            for p in postings
-        ]
-        return pd.DataFrame(rows)
-
-    def _persist_dataframe(self, df: pd.DataFrame, *, name: str) -> Path:
-        """Save CSV to results/ and return its Path."""
-        csv_path = self.output_dir / f"{name}.csv"
-        df.to_csv(csv_path, index=False)
-        return csv_path
+        if is_dataclass(postings[0]):
+            return postings_to_frame(postings)
+        return compact_frame(pd.DataFrame([vars(p) for p in postings]))
+
+    def _persist_dataframe(self, df: pd.DataFrame, *, keyword: str, location: str) -> Path | None:
+        """Append the batch to the Parquet results store (results/store/) and return its partition."""
+        from modules import results_store
+
+        return results_store.append(
+            df,
+            platform=self.platform,
+            keyword=keyword,
+            location=location,
+            root=self.output_dir / "store",
+        )
 
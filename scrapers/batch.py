@@ -0,0 +1,254 @@
+# ----------------- scrapers/batch.py -----------------
+"""
+Compact DataFrame layout for scraped batches.
+
+• company / location are categoricals (a few hundred distinct values per
+  thousands of rows);
+• descriptions live in a `DescriptionArray`: every distinct text is stored
+  once, compressed (zstd when `zstandard` is installed, zlib otherwise),
+  in one shared byte buffer. Rows only hold an int32 code, so filtering,
+  `take`, `copy` and concatenation never touch the text; a description is
+  decompressed when it is read (`df["description"][i]`, `itertuples`, …).
+  Writes (`fillna`, `df.loc[…, "description"] = …`) re-pack the column;
+  factorizing and `.str` work on the decoded texts.
+• `postings_to_frame` builds the columns straight from the JobPosting
+  slots – no per-row dict.
+
+To pandas the description column is an ordinary extension column, so the
+rest of the pipeline (identity, dedup, archive, store) is unchanged.
+"""
+from __future__ import annotations
+
+import zlib
+from dataclasses import fields
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import (
+    ExtensionArray, ExtensionDtype, register_extension_dtype, take,
+)
+
+try:
+    import zstandard
+except ImportError:       # zstandard not installed → zlib
+    zstandard = None
+
+CATEGORICAL = ("company", "location")
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+
+# --------------------------------------------------------------------- #
+#  codec
+# --------------------------------------------------------------------- #
+class _Codec:
+    def __init__(self, name: str):
+        self.name = name
+        if name == "zstd":
+            self._c = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+            self._d = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data) if self.name == "zstd" else zlib.compress(data, ZLIB_LEVEL)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._d.decompress(data) if self.name == "zstd" else zlib.decompress(data)
+
+
+_CODECS: dict[str, _Codec] = {}
+
+
+def _codec(name: str | None = None) -> _Codec:
+    name = name or ("zstd" if zstandard is not None else "zlib")
+    if name not in _CODECS:
+        _CODECS[name] = _Codec(name)
+    return _CODECS[name]
+
+
+class _Buffer:
+    """Immutable side buffer: compressed distinct texts back to back."""
+
+    __slots__ = ("data", "offsets", "codec")
+
+    def __init__(self, data: bytes, offsets: np.ndarray, codec: str):
+        self.data = data
+        self.offsets = offsets          # int64[n_distinct + 1]
+        self.codec = codec
+
+    def get(self, i: int) -> str:
+        raw = self.data[self.offsets[i]:self.offsets[i + 1]]
+        return _codec(self.codec).decompress(raw).decode("utf-8")
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data) + self.offsets.nbytes
+
+
+def _pack(values: Iterable) -> tuple[np.ndarray, _Buffer]:
+    """Intern + compress `values` → (codes, buffer); NA → code -1."""
+    codec = _codec()
+    seen: dict[str, int] = {}
+    chunks: list[bytes] = []
+    codes = []
+    for v in values:
+        if v is None or (not isinstance(v, str) and pd.isna(v)):
+            codes.append(-1)
+            continue
+        v = str(v)
+        code = seen.get(v)
+        if code is None:
+            code = seen[v] = len(chunks)
+            chunks.append(codec.compress(v.encode("utf-8")))
+        codes.append(code)
+    offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in chunks], out=offsets[1:])
+    return np.asarray(codes, dtype=np.int32), _Buffer(b"".join(chunks), offsets, codec.name)
+
+
+# --------------------------------------------------------------------- #
+#  pandas extension type
+# --------------------------------------------------------------------- #
+@register_extension_dtype
+class DescriptionDtype(ExtensionDtype):
+    name = "description"
+    type = str
+    kind = "O"
+    na_value = None
+
+    @classmethod
+    def construct_array_type(cls):
+        return DescriptionArray
+
+
+class DescriptionArray(ExtensionArray):
+    """Interned, compressed strings with per-element lazy decompression."""
+
+    def __init__(self, codes: np.ndarray, buffer: _Buffer):
+        self._codes = codes
+        self._buf = buffer
+
+    # ---- construction ----
+    @classmethod
+    def _from_sequence(cls, scalars, *, dtype=None, copy=False):
+        if isinstance(scalars, cls):
+            return scalars.copy() if copy else scalars
+        return cls(*_pack(scalars))
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        return cls._from_sequence(values)
+
+    @classmethod
+    def _concat_same_type(cls, to_concat: Sequence["DescriptionArray"]):
+        first = to_concat[0]
+        if all(a._buf is first._buf for a in to_concat):
+            return cls(np.concatenate([a._codes for a in to_concat]), first._buf)
+        if len({a._buf.codec for a in to_concat}) > 1:
+            return cls._from_sequence([v for a in to_concat for v in a])
+        # merge buffers without decompressing: shift codes / offsets per part
+        data, offsets, codes = [], [np.zeros(1, dtype=np.int64)], []
+        base_code = base_off = 0
+        for a in to_concat:
+            data.append(a._buf.data)
+            offsets.append(a._buf.offsets[1:] + base_off)
+            codes.append(np.where(a._codes < 0, -1, a._codes + base_code).astype(np.int32))
+            base_code += len(a._buf.offsets) - 1
+            base_off += len(a._buf.data)
+        buf = _Buffer(b"".join(data), np.concatenate(offsets), first._buf.codec)
+        return cls(np.concatenate(codes), buf)
+
+    # ---- required interface ----
+    @property
+    def dtype(self) -> DescriptionDtype:
+        return DescriptionDtype()
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.nbytes + self._buf.nbytes
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            code = self._codes[item]
+            return None if code < 0 else self._buf.get(code)
+        item = pd.api.indexers.check_array_indexer(self, item) if not isinstance(item, slice) else item
+        return type(self)(self._codes[item], self._buf)
+
+    def __setitem__(self, key, value):
+        # the buffer is shared and immutable: decode, assign, re-pack this array only
+        if not isinstance(key, (int, np.integer, slice)):
+            key = pd.api.indexers.check_array_indexer(self, key)
+        if isinstance(value, DescriptionArray):
+            value = np.asarray(value, dtype=object)
+        values = np.asarray(self, dtype=object)
+        values[key] = value
+        self._codes, self._buf = _pack(values)
+
+    def __getattr__(self, name):
+        # `.str` methods: run them on the decoded texts as a plain object array
+        if name.startswith("_str_"):
+            return getattr(pd.array(np.asarray(self, dtype=object), dtype=object), name)
+        raise AttributeError(name)
+
+    def __iter__(self):
+        get = self._buf.get
+        for code in self._codes:
+            yield None if code < 0 else get(code)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(list(self), dtype=object)
+
+    def isna(self) -> np.ndarray:
+        return self._codes < 0
+
+    def take(self, indices, *, allow_fill=False, fill_value=None):
+        codes = take(self._codes, indices, allow_fill=allow_fill, fill_value=-1)
+        return type(self)(codes.astype(np.int32, copy=False), self._buf)
+
+    def copy(self):
+        return type(self)(self._codes.copy(), self._buf)     # buffer is immutable
+
+    def _values_for_factorize(self):
+        # codes are per buffer: equal texts from two buffers differ there
+        return np.asarray(self, dtype=object), None
+
+    def __eq__(self, other):
+        return np.asarray(self, dtype=object) == other
+
+
+# --------------------------------------------------------------------- #
+#  batch builders
+# --------------------------------------------------------------------- #
+def postings_to_frame(postings: list) -> pd.DataFrame:
+    """list[JobPosting] → compact DataFrame, one column at a time."""
+    if not postings:
+        return pd.DataFrame()
+    names = [f.name for f in fields(postings[0])]
+    cols = {}
+    for name in names:
+        values = [getattr(p, name) for p in postings]
+        if name == "description":
+            cols[name] = DescriptionArray._from_sequence(values)
+        elif name in CATEGORICAL:
+            cols[name] = pd.Categorical(values)
+        elif name == "easy_apply":
+            cols[name] = np.fromiter((bool(v) for v in values), dtype=bool, count=len(values))
+        else:
+            cols[name] = values
+    return pd.DataFrame(cols)
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Same layout for frames that come from elsewhere (e.g. JobSpy)."""
+    if df.empty:
+        return df
+    df = df.copy(deep=False)
+    for name in CATEGORICAL:
+        if name in df.columns and not isinstance(df[name].dtype, pd.CategoricalDtype):
+            df[name] = df[name].astype("category")
+    if "description" in df.columns and not isinstance(df["description"].dtype, DescriptionDtype):
+        df["description"] = DescriptionArray._from_sequence(df["description"].tolist())
+    return df
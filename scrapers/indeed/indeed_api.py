@@ -11,6 +11,7 @@ import pandas as pd
 from jobspy import scrape_jobs
 
 from scrapers.base import BaseScraper            # unchanged base.py
+from scrapers.batch import compact_frame
 
 
 class IndeedAPIScraper(BaseScraper):
@@ -54,11 +55,13 @@ class IndeedAPIScraper(BaseScraper):
         df = df.rename(columns=rename_map)
 
         # guarantee optional columns exist
-        for col in ("emails", "easy_apply"):
-            if col not in df.columns:
-                df[col] = None
+        if "emails" not in df.columns:
+            df["emails"] = None
+        if "easy_apply" not in df.columns:
+            df["easy_apply"] = False
+        df = compact_frame(df)
 
-        # save CSV via BaseScraper helper
-        self._persist_dataframe(df, name=f"indeedAPI_{keyword}_{location}")
+        # append to the results store via BaseScraper helper
+        self._persist_dataframe(df, keyword=keyword, location=location)
         return df
 
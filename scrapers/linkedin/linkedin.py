@@ -330,10 +330,8 @@ class LinkedinScraper(BaseScraper):
 
         df = self._to_dataframe(postings)
 
-        csv_path = self._persist_dataframe(
-            df, name=f"linkedin_{keyword}_{location}_{int(time.time())}"
-        )
-        log.info("[LinkedInScraper] Saved %d rows → %s", len(df), csv_path)
+        store_path = self._persist_dataframe(df, keyword=keyword, location=location)
+        log.info("[LinkedInScraper] Saved %d rows → %s", len(df), store_path)
         return df
     
 ##### -------------- INTERNAL (worker thread) (end) -------------- #####
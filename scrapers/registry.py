@@ -1,26 +1,86 @@
 # scrapers/registry.py
+"""
+platform name → scraper class, resolved lazily.
+
+Scraper modules pull in heavy dependencies (Playwright, JobSpy), so
+nothing is imported up front: on first access the package is scanned
+*statically* (ast) for classes declaring `platform = "..."`, and a
+scraper module is only imported when its platform is looked up.
+Listing platforms (`list(REGISTRY)`) imports nothing.
+"""
+import ast
 from importlib import import_module
 from pathlib import Path
-from typing import Dict, Type
+from typing import Dict, Iterator, Mapping, Tuple, Type
 from inspect import isclass
 
 from scrapers.base import BaseScraper
 
-REGISTRY: Dict[str, Type[BaseScraper]] = {}
-
 root = Path(__file__).parent
 
-for py in root.rglob("*.py"):
-    if py.name.startswith("_"):            # skip private helpers
-        continue
-    if py.stem in {"__init__", "base", "base_lazy", "models", "registry", "selectors"}:
-        continue
+_SKIP = {"__init__", "base", "base_lazy", "batch", "models", "registry", "selectors"}
+
+
+def _discover() -> Dict[str, Tuple[str, str]]:
+    """platform (lower-case) → (module, class name), without importing anything."""
+    found: Dict[str, Tuple[str, str]] = {}
+    for py in sorted(root.rglob("*.py")):
+        if py.name.startswith("_"):            # skip private helpers
+            continue
+        if py.stem in _SKIP:
+            continue
+
+        #       path  scrapers/linkedin/scraper.py  -> scrapers.linkedin.scraper
+        mod_name = ".".join(py.relative_to(root).with_suffix("").parts)
+        tree = ast.parse(py.read_text(encoding="utf-8"))
+        for node in tree.body:
+            if not (isinstance(node, ast.ClassDef) and node.bases):
+                continue
+            for stmt in node.body:
+                if (
+                    isinstance(stmt, ast.Assign)
+                    and any(isinstance(t, ast.Name) and t.id == "platform" for t in stmt.targets)
+                    and isinstance(stmt.value, ast.Constant)
+                    and isinstance(stmt.value.value, str)
+                ):
+                    found[stmt.value.value.lower()] = (f"scrapers.{mod_name}", node.name)
+    return found
+
+
+class _LazyRegistry(Mapping):
+    """Read-only mapping that imports a scraper module on first lookup."""
+
+    def __init__(self):
+        self._index: Dict[str, Tuple[str, str]] | None = None
+        self._loaded: Dict[str, Type[BaseScraper]] = {}
+
+    def _names(self) -> Dict[str, Tuple[str, str]]:
+        if self._index is None:
+            self._index = _discover()
+        return self._index
+
+    def __getitem__(self, platform: str) -> Type[BaseScraper]:
+        platform = platform.lower()
+        if platform not in self._loaded:
+            mod_name, cls_name = self._names()[platform]          # KeyError if unknown
+            obj = getattr(import_module(mod_name), cls_name)
+            if not (isclass(obj) and issubclass(obj, BaseScraper)):
+                raise KeyError(platform)
+            self._loaded[platform] = obj
+        return self._loaded[platform]
+
+    def __contains__(self, platform) -> bool:
+        return isinstance(platform, str) and platform.lower() in self._names()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names())
+
+    def __len__(self) -> int:
+        return len(self._names())
 
-    #       path  scrapers/linkedin/scraper.py  -> scrapers.linkedin.scraper
-    mod_name = ".".join(py.relative_to(root).with_suffix("").parts)
-    mod = import_module(f"scrapers.{mod_name}")
+    def refresh(self) -> None:
+        """Rescan (e.g. after adding a scraper module)."""
+        self._index = None
 
-    for obj in mod.__dict__.values():
-        if isclass(obj) and issubclass(obj, BaseScraper) and obj is not BaseScraper:
-            REGISTRY[obj.platform.lower()] = obj
 
+REGISTRY: Mapping[str, Type[BaseScraper]] = _LazyRegistry()
@@ -0,0 +1,45 @@
+"""Near-duplicate collapse: within a batch, and across calls of one run."""
+import pandas as pd
+import pytest
+
+from modules.dedup import DedupIndex
+
+DESC_A = "Design and run CFD simulations of turbomachinery with ANSYS Fluent and Python tooling."
+DESC_B = "Build FEA models of composite structures and automate load cases in Abaqus and Python."
+
+
+@pytest.fixture
+def index(tmp_path):
+    return DedupIndex(tmp_path / "dedup.sqlite")
+
+
+def _batch():
+    return pd.DataFrame({
+        "title": ["CFD Engineer", "CFD Engineer", "FEA Engineer"],
+        "company": ["Acme", "Acme", "Beta"],
+        "location": ["Paris", "Paris", "Lyon"],
+        "job_url": ["https://a/1", "https://b/1", "https://a/2"],
+        "description": [DESC_A, DESC_A, DESC_B],
+    })
+
+
+def test_duplicate_within_batch_is_dropped(index):
+    out = index.collapse(_batch(), run_id="R1")
+    assert list(out["title"]) == ["CFD Engineer", "FEA Engineer"]
+    assert out["source_urls"][0] == ["https://a/1", "https://b/1"]
+
+
+def test_same_run_again_keeps_the_postings(index):
+    # a resumed run / retried task collapses the same batch under the same run_id
+    first = index.collapse(_batch(), run_id="R1")
+    index.record_score(first["canonical_id"][0], 8, "good fit", "stamp")
+    again = index.collapse(_batch(), run_id="R1", stamp="stamp")
+    assert list(again["canonical_id"]) == list(first["canonical_id"])
+    assert again["prior_score"][0] == 8 and pd.isna(again["prior_score"][1])
+
+
+def test_prior_score_needs_the_current_stamp(index):
+    first = index.collapse(_batch(), run_id="R1")
+    index.record_score(first["canonical_id"][0], 8, "good fit", "old")
+    later = index.collapse(_batch(), run_id="R2", stamp="new")
+    assert later["prior_score"].isna().all()
@@ -0,0 +1,113 @@
+"""SQLite work queue: leases, retries, idempotent puts, concurrent claims."""
+import threading
+import time
+
+import pytest
+
+from modules.work_queue import SQLiteQueue, task_id
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteQueue(tmp_path / "queue.sqlite")
+
+
+def test_claim_complete(queue):
+    tid = queue.put("run", "score", {"n": 1})
+    task = queue.claim("w1")
+    assert (task.id, task.payload, task.attempts, task.status) == (tid, {"n": 1}, 1, "leased")
+    assert queue.claim("w2") is None
+    assert queue.complete(tid, "w1", {"ok": True})
+    assert queue.tasks("run", status="done")[0].result == {"ok": True}
+
+
+def test_expired_lease_is_requeued_then_failed(queue):
+    tid = queue.put("run", "score", {}, max_attempts=2)
+    assert queue.claim("w1", lease_s=0.01).attempts == 1
+    time.sleep(0.02)
+
+    retry = queue.claim("w2", lease_s=0.01)                # lease expired → back to pending
+    assert (retry.id, retry.attempts, retry.owner) == (tid, 2, "w2")
+    assert not queue.complete(tid, "w1")                   # the old owner lost it
+    time.sleep(0.02)
+
+    assert queue.claim("w3") is None                       # max_attempts used up
+    failed = queue.tasks("run", status="failed")
+    assert [t.id for t in failed] == [tid]
+    assert failed[0].error == "lease expired"
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    tid = queue.put("run", "score", {})
+    queue.claim("w1", lease_s=0.05)
+    for _ in range(3):
+        time.sleep(0.03)
+        assert queue.heartbeat(tid, "w1", lease_s=0.05)
+    assert queue.claim("w2") is None
+    assert queue.complete(tid, "w1")
+
+
+def test_fail_retries_until_max_attempts(queue):
+    tid = queue.put("run", "generate", {}, max_attempts=2)
+    queue.claim("w1")
+    assert queue.fail(tid, "w1", "boom")
+    assert queue.tasks("run")[0].status == "pending"
+    queue.claim("w1")
+    assert queue.fail(tid, "w1", "boom again")
+    task = queue.tasks("run")[0]
+    assert (task.status, task.error) == ("failed", "boom again")
+
+
+def test_fail_without_retry(queue):
+    tid = queue.put("run", "generate", {})
+    queue.claim("w1")
+    queue.fail(tid, "w1", "bad input", retry=False)
+    assert queue.tasks("run")[0].status == "failed"
+
+
+def test_put_with_task_id_is_idempotent(queue):
+    tid = task_id("run", "score", "parent", None, 0)
+    assert tid == task_id("run", "score", "parent", None, 0)
+    assert queue.put("run", "score", {"try": 1}, task_id=tid) == tid
+    assert queue.put("run", "score", {"try": 2}, task_id=tid) == tid
+    tasks = queue.tasks("run")
+    assert len(tasks) == 1 and tasks[0].payload == {"try": 1}
+
+
+def test_claims_follow_put_order_and_kinds(queue):
+    a = queue.put("run", "scrape", {})
+    b = queue.put("run", "score", {})
+    c = queue.put("run", "score", {})
+    assert queue.claim("w", kinds=["score"]).id == b
+    assert queue.claim("w").id == a
+    assert queue.claim("w").id == c
+
+
+def test_concurrent_claims_deliver_each_task_once(queue):
+    ids = {queue.put("run", "score", {"i": i}) for i in range(60)}
+    got, lock = [], threading.Lock()
+
+    def worker(name):
+        q = SQLiteQueue(queue.path)
+        while (task := q.claim(name)) is not None:
+            with lock:
+                got.append(task.id)
+            q.complete(task.id, name)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(got) == sorted(ids)
+    assert queue.counts("run") == {"score": {"done": 60}}
+
+
+def test_enqueue_search_twice_queues_each_cell_once(queue):
+    from modules.queue_runner import enqueue_search
+    from modules.search_jobs import SearchSpec
+
+    spec = SearchSpec(platforms=["indeedapi"], locations=["Paris", "Lyon"], terms=["data"], hours_old=24)
+    run_id = enqueue_search(spec, queue)
+    assert enqueue_search(spec, queue, run_id=run_id) == run_id
+    assert queue.counts(run_id) == {"scrape": {"pending": 2}}